@@ -8,14 +8,65 @@ from pydantic import BaseSettings, Field
 class ProcessorSettings(BaseSettings):
     camera_sources_raw: str = Field("", env="CAMERA_SOURCES")
     frame_poll_interval: float = Field(1.0, env="FRAME_POLL_INTERVAL")
+    adaptive_poll_enabled: bool = Field(False, env="ADAPTIVE_POLL_ENABLED")
+    adaptive_idle_poll_interval: float = Field(2.0, env="ADAPTIVE_IDLE_POLL_INTERVAL")
+    adaptive_motion_hold_seconds: float = Field(10.0, env="ADAPTIVE_MOTION_HOLD_SECONDS")
+    dedup_enabled: bool = Field(True, env="DEDUP_ENABLED")
+    dedup_hamming_threshold: int = Field(-1, env="DEDUP_HAMMING_THRESHOLD")
+    detection_workers: int = Field(1, env="DETECTION_WORKERS")
+    detection_batch_size: int = Field(1, env="DETECTION_BATCH_SIZE")
+    detection_batch_wait_ms: float = Field(50.0, env="DETECTION_BATCH_WAIT_MS")
+    detector_backend: str = Field("ultralytics", env="DETECTOR_BACKEND")
+    detector_imgsz: int = Field(640, env="DETECTOR_IMGSZ")
+    detector_screen_model_path: str = Field("", env="YOLO_SCREEN_MODEL_PATH")
+    detector_screen_low: float = Field(0.2, env="YOLO_SCREEN_LOW")
+    detector_screen_high: float = Field(0.6, env="YOLO_SCREEN_HIGH")
+    detection_roi_enabled: bool = Field(False, env="DETECTION_ROI_ENABLED")
+    detection_roi_padding: float = Field(0.25, env="DETECTION_ROI_PADDING")
+    detection_roi_min_size: int = Field(256, env="DETECTION_ROI_MIN_SIZE")
+    detection_roi_max_coverage: float = Field(0.4, env="DETECTION_ROI_MAX_COVERAGE")
+    tracking_enabled: bool = Field(False, env="TRACKING_ENABLED")
+    track_iou_threshold: float = Field(0.3, env="TRACK_IOU_THRESHOLD")
+    track_max_age_seconds: float = Field(10.0, env="TRACK_MAX_AGE_SECONDS")
+    track_min_hits: int = Field(1, env="TRACK_MIN_HITS")
+    track_keyframe_seconds: float = Field(30.0, env="TRACK_KEYFRAME_SECONDS")
+    track_best_margin: float = Field(0.1, env="TRACK_BEST_MARGIN")
+    detection_skip_enabled: bool = Field(False, env="DETECTION_SKIP_ENABLED")
+    detection_skip_max_interval: int = Field(8, env="DETECTION_SKIP_MAX_INTERVAL")
+    detection_startup_budget_seconds: float = Field(30.0, env="DETECTION_STARTUP_BUDGET_SECONDS")
+    cpu_threads_ingestion: int = Field(0, env="CPU_THREADS_INGESTION")
+    cpu_threads_detection: int = Field(0, env="CPU_THREADS_DETECTION")
+    cpu_threads_writer: int = Field(0, env="CPU_THREADS_WRITER")
+    cpu_threads_notifier: int = Field(0, env="CPU_THREADS_NOTIFIER")
+    cpu_affinity_ingestion: str = Field("", env="CPU_AFFINITY_INGESTION")
+    cpu_affinity_detection: str = Field("", env="CPU_AFFINITY_DETECTION")
+    cpu_affinity_writer: str = Field("", env="CPU_AFFINITY_WRITER")
+    cpu_affinity_notifier: str = Field("", env="CPU_AFFINITY_NOTIFIER")
     queue_size: int = Field(512, env="QUEUE_SIZE")
+    metrics_host: str = Field("127.0.0.1", env="METRICS_HOST")
+    metrics_port: int = Field(9100, env="METRICS_PORT")
+    trace_sample_rate: float = Field(0.01, env="TRACE_SAMPLE_RATE")
+    frame_queue_policy: str = Field("block", env="FRAME_QUEUE_POLICY")
+    frame_queue_per_camera: int = Field(0, env="FRAME_QUEUE_PER_CAMERA")
+    frame_pool_slots: int = Field(32, env="FRAME_POOL_SLOTS")
+    frame_pool_stall_seconds: int = Field(60, env="FRAME_POOL_STALL_SECONDS")
+    frame_pool_slot_bytes: int = Field(8 * 1024 * 1024, env="FRAME_POOL_SLOT_BYTES")
+    stream_reconnect_initial: float = Field(1.0, env="STREAM_RECONNECT_INITIAL")
+    stream_reconnect_max: float = Field(30.0, env="STREAM_RECONNECT_MAX")
+    stream_stale_seconds: float = Field(10.0, env="STREAM_STALE_SECONDS")
     motion_history: int = Field(200, env="MOTION_HISTORY")
     motion_kernel_size: int = Field(5, env="MOTION_KERNEL_SIZE")
     motion_min_area: int = Field(1500, env="MOTION_MIN_AREA")
     motion_debug_dir: str = Field("/data/motion_results", env="MOTION_DEBUG_DIR")
     motion_max_foreground_ratio: float = Field(0.1, env="MOTION_MAX_FOREGROUND_RATIO")
+    motion_max_width: int = Field(640, env="MOTION_MAX_WIDTH")
+    motion_decode_reduction: int = Field(2, env="MOTION_DECODE_REDUCTION")
+    motion_static_ratio: float = Field(0.001, env="MOTION_STATIC_RATIO")
+    camera_masks_raw: str = Field("", env="CAMERA_MASKS")
     media_root: str = Field("/data/media", env="MEDIA_ROOT")
     input_root: str = Field("/data/input", env="INPUT_ROOT")
+    ingest_state_dir: str = Field("/data/input/.camtelligence", env="INGEST_STATE_DIR")
+    ingest_use_inotify: bool = Field(True, env="INGEST_USE_INOTIFY")
     notification_debounce_seconds: int = Field(60, env="NOTIFICATION_DEBOUNCE_SECONDS")
     notifications_enabled: bool = Field(True, env="NOTIFICATIONS_ENABLED")
     telegram_bot_token: Optional[str] = Field(None, env="TELEGRAM_BOT_TOKEN")
@@ -0,0 +1,47 @@
+"""
+Inference backends for the YOLO detector. Each one lives in its own module and imports
+its runtime lazily, so only the selected backend's package has to be installed
+(requirements-onnxruntime.txt, requirements-openvino.txt).
+"""
+from importlib import import_module
+from typing import Optional, Sequence
+
+from .base import InferenceBackend
+
+BACKENDS = {
+    "ultralytics": ("ultralytics_backend", "UltralyticsBackend", "requirements.txt"),
+    "onnxruntime": ("onnx_backend", "OnnxRuntimeBackend", "requirements-onnxruntime.txt"),
+    "openvino": ("openvino_backend", "OpenVinoBackend", "requirements-openvino.txt"),
+}
+
+
+def create_backend(
+    name: str,
+    model_path: str,
+    conf_threshold: float,
+    iou_threshold: float,
+    classes: Optional[Sequence[int]] = None,
+    imgsz: int = 640,
+    threads: int = 0,
+) -> InferenceBackend:
+    try:
+        module_name, class_name, requirements = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown detector backend {name!r}; expected one of {sorted(BACKENDS)}") from None
+    try:
+        module = import_module(f".{module_name}", __name__)
+        return getattr(module, class_name)(
+            model_path,
+            conf_threshold,
+            iou_threshold,
+            classes=classes,
+            imgsz=imgsz,
+            threads=threads,
+        )
+    except ImportError as exc:
+        raise RuntimeError(
+            f"Detector backend {name!r} is not installed (pip install -r {requirements}): {exc}"
+        ) from exc
+
+
+__all__ = ["BACKENDS", "InferenceBackend", "create_backend"]
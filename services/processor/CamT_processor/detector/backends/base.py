@@ -0,0 +1,146 @@
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+LETTERBOX_FILL = 114
+
+
+class InferenceBackend:
+    """
+    Runs a YOLO detection model on BGR images. predict() returns one float32 array per
+    image with rows (x1, y1, x2, y2, score, class_id) in that image's pixel coordinates,
+    already filtered by confidence, classes and NMS.
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        model_path: str,
+        conf_threshold: float,
+        iou_threshold: float,
+        classes: Optional[Sequence[int]] = None,
+        imgsz: int = 640,
+        threads: int = 0,
+    ) -> None:
+        self.model_path = model_path
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.classes = list(classes) if classes is not None else None
+        self.imgsz = imgsz
+        self.threads = threads
+        # Output stride of the YOLO head; dynamic-shape models accept any multiple of it.
+        self.stride = 32
+
+    def predict(self, images: List[np.ndarray], size: Optional[int] = None) -> List[np.ndarray]:
+        """size overrides imgsz for this call; backends on a static-shape model ignore it."""
+        raise NotImplementedError
+
+
+def fixed_batches(images: List[np.ndarray], batch: int) -> List[Tuple[List[np.ndarray], int]]:
+    """
+    Split images into chunks of exactly batch images for a static-batch export, padding
+    the last chunk by repeating its final image; returns (chunk, number of real images).
+    """
+    chunks = []
+    for start in range(0, len(images), batch):
+        chunk = images[start : start + batch]
+        chunks.append((chunk + [chunk[-1]] * (batch - len(chunk)), len(chunk)))
+    return chunks
+
+
+def scaled_shape(image: np.ndarray, size: int) -> Tuple[int, int]:
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    return int(round(h * scale)), int(round(w * scale))
+
+
+def letterbox(
+    image: np.ndarray, size: int, target: Optional[Tuple[int, int]] = None
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize so the longer side is size, keeping aspect ratio, and pad centred to target
+    (height, width); square size x size by default, as static YOLO exports expect.
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_h, new_w = scaled_shape(image, size)
+    target_h, target_w = target or (size, size)
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (target_w - new_w) / 2, (target_h - new_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(LETTERBOX_FILL,) * 3
+    )
+    return padded, scale, (left, top)
+
+
+def preprocess(
+    images: List[np.ndarray], size: int, stride: int = 0
+) -> Tuple[np.ndarray, List[Tuple[float, Tuple[float, float]]]]:
+    """
+    BGR images -> NCHW float32 RGB blob in [0, 1], plus the letterbox transform of each
+    image. With a stride (dynamic-shape models) padding is only up to the next stride
+    multiple of the batch's largest image, e.g. 640x384 instead of 640x640 for 16:9 frames.
+    """
+    target = None
+    if stride > 0:
+        shapes = [scaled_shape(image, size) for image in images]
+        target = (
+            -(-max(h for h, _ in shapes) // stride) * stride,
+            -(-max(w for _, w in shapes) // stride) * stride,
+        )
+    padded, metas = [], []
+    for image in images:
+        boxed, scale, pad = letterbox(image, size, target)
+        padded.append(boxed)
+        metas.append((scale, pad))
+    blob = cv2.dnn.blobFromImages(padded, scalefactor=1.0 / 255.0, swapRB=True)
+    return blob, metas
+
+
+def postprocess(
+    output: np.ndarray,
+    metas: List[Tuple[float, Tuple[float, float]]],
+    shapes: List[Tuple[int, int]],
+    conf_threshold: float,
+    iou_threshold: float,
+    classes: Optional[Sequence[int]] = None,
+) -> List[np.ndarray]:
+    """
+    Decode raw YOLOv8 head output (batch, 4 + classes, anchors) with xywh boxes in
+    letterboxed pixels: confidence filter, class-aware NMS, and undo the letterbox.
+    """
+    results = []
+    for pred, (scale, (pad_x, pad_y)), (height, width) in zip(output, metas, shapes):
+        pred = pred.T
+        scores = pred[:, 4:]
+        if classes is not None:
+            keep_cols = np.zeros(scores.shape[1], dtype=bool)
+            keep_cols[[c for c in classes if c < scores.shape[1]]] = True
+            scores = np.where(keep_cols, scores, 0.0)
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        mask = confidences >= conf_threshold
+        if not mask.any():
+            results.append(np.zeros((0, 6), dtype=np.float32))
+            continue
+        boxes, confidences, class_ids = pred[mask, :4], confidences[mask], class_ids[mask]
+        # xywh centre -> top-left xywh for NMS
+        tl = boxes.copy()
+        tl[:, 0] -= tl[:, 2] / 2
+        tl[:, 1] -= tl[:, 3] / 2
+        keep = cv2.dnn.NMSBoxesBatched(
+            tl.tolist(), confidences.tolist(), class_ids.tolist(), conf_threshold, iou_threshold
+        )
+        keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+        tl, confidences, class_ids = tl[keep], confidences[keep], class_ids[keep]
+        x1 = np.clip((tl[:, 0] - pad_x) / scale, 0, width)
+        y1 = np.clip((tl[:, 1] - pad_y) / scale, 0, height)
+        x2 = np.clip((tl[:, 0] + tl[:, 2] - pad_x) / scale, 0, width)
+        y2 = np.clip((tl[:, 1] + tl[:, 3] - pad_y) / scale, 0, height)
+        results.append(np.stack([x1, y1, x2, y2, confidences, class_ids], axis=1).astype(np.float32))
+    return results
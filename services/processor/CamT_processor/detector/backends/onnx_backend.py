@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .base import InferenceBackend, fixed_batches, postprocess, preprocess
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPU session on a YOLO ONNX export (FP32 or INT8 QDQ)."""
+
+    name = "onnxruntime"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+        self.session = ort.InferenceSession(self.model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Static exports fix the batch and image size; dynamic ones take whatever we send.
+        batch, _, height, _ = model_input.shape
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        self.dynamic_shape = not isinstance(height, int)
+        if not self.dynamic_shape:
+            self.imgsz = height
+
+    def predict(self, images: List[np.ndarray], size: Optional[int] = None) -> List[np.ndarray]:
+        if not images:
+            return []
+        if self.fixed_batch is not None and len(images) != self.fixed_batch:
+            # A static export takes exactly its batch size: split, and pad the last chunk.
+            return [
+                result
+                for chunk, count in fixed_batches(images, self.fixed_batch)
+                for result in self.predict(chunk, size)[:count]
+            ]
+        if self.dynamic_shape:
+            blob, metas = preprocess(images, size or self.imgsz, self.stride)
+        else:
+            blob, metas = preprocess(images, self.imgsz)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        shapes = [image.shape[:2] for image in images]
+        return postprocess(output, metas, shapes, self.conf_threshold, self.iou_threshold, self.classes)
@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .base import InferenceBackend, fixed_batches, postprocess, preprocess
+
+
+class OpenVinoBackend(InferenceBackend):
+    """OpenVINO CPU plugin on an IR model (.xml next to its .bin), FP32 or INT8."""
+
+    name = "openvino"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        import openvino as ov
+
+        core = ov.Core()
+        model = core.read_model(self.model_path)
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if self.threads > 0:
+            config["INFERENCE_NUM_THREADS"] = self.threads
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.output = self.compiled.output(0)
+        shape = self.compiled.input(0).get_partial_shape()
+        self.fixed_batch = shape[0].get_length() if shape[0].is_static else None
+        self.dynamic_shape = not shape[2].is_static
+        if not self.dynamic_shape:
+            self.imgsz = shape[2].get_length()
+
+    def predict(self, images: List[np.ndarray], size: Optional[int] = None) -> List[np.ndarray]:
+        if not images:
+            return []
+        if self.fixed_batch is not None and len(images) != self.fixed_batch:
+            # A static export takes exactly its batch size: split, and pad the last chunk.
+            return [
+                result
+                for chunk, count in fixed_batches(images, self.fixed_batch)
+                for result in self.predict(chunk, size)[:count]
+            ]
+        if self.dynamic_shape:
+            blob, metas = preprocess(images, size or self.imgsz, self.stride)
+        else:
+            blob, metas = preprocess(images, self.imgsz)
+        output = self.compiled(blob)[self.output]
+        shapes = [image.shape[:2] for image in images]
+        return postprocess(output, metas, shapes, self.conf_threshold, self.iou_threshold, self.classes)
@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .base import InferenceBackend
+
+
+class UltralyticsBackend(InferenceBackend):
+    """ultralytics.YOLO on PyTorch weights (or anything else ultralytics can load)."""
+
+    name = "ultralytics"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        from ultralytics import YOLO
+
+        if self.threads > 0:
+            import torch
+
+            torch.set_num_threads(self.threads)
+        self.model = YOLO(self.model_path)
+
+    def predict(self, images: List[np.ndarray], size: Optional[int] = None) -> List[np.ndarray]:
+        results = self.model.predict(
+            source=list(images),
+            verbose=False,
+            imgsz=size or self.imgsz,
+            conf=self.conf_threshold,
+            iou=self.iou_threshold,
+            classes=self.classes,
+        )
+        if not results or len(results) != len(images):
+            return [np.zeros((0, 6), dtype=np.float32) for _ in images]
+        out = []
+        for res in results:
+            boxes = getattr(res, "boxes", None)
+            if boxes is None or boxes.data is None:
+                out.append(np.zeros((0, 6), dtype=np.float32))
+            else:
+                out.append(boxes.data.cpu().numpy().astype(np.float32))
+        return out
@@ -0,0 +1,133 @@
+"""
+One-shot conversion of the YOLO weights for the CPU inference backends.
+
+    python -m CamT_processor.detector.export --format onnx
+    python -m CamT_processor.detector.export --format openvino --int8 --calibration-dir /data/input/driveway
+
+Exports ONNX through ultralytics (dynamic batch, so micro-batching works), optionally
+quantizes it to INT8, and for OpenVINO converts the result to IR. INT8 uses static QDQ
+quantization when calibration images are given (preferably frames from the cameras the
+model will watch) and dynamic weight-only quantization otherwise. OpenVINO runs the
+QDQ model as INT8 directly, so both backends share one quantization path.
+"""
+import argparse
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import cv2
+
+from ..logging_utils import configure_logging
+from .backends.base import preprocess
+
+logger = logging.getLogger("processor.export")
+
+CALIBRATION_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+
+def export_onnx(model_path: str, output_dir: Path, imgsz: int) -> Path:
+    from ultralytics import YOLO
+
+    exported = Path(YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True))
+    target = output_dir / exported.name
+    if exported.resolve() != target.resolve():
+        shutil.move(str(exported), target)
+    return target
+
+
+def calibration_images(directory: str, limit: int) -> List[Path]:
+    paths = sorted(p for p in Path(directory).rglob("*") if p.suffix.lower() in CALIBRATION_SUFFIXES)
+    if len(paths) > limit:
+        step = len(paths) / float(limit)
+        paths = [paths[int(idx * step)] for idx in range(limit)]
+    return paths
+
+
+def quantize_int8(onnx_path: Path, calibration_dir: Optional[str], imgsz: int, limit: int) -> Path:
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared = onnx_path.with_name(f"{onnx_path.stem}_prep.onnx")
+    target = onnx_path.with_name(f"{onnx_path.stem}_int8.onnx")
+    # Symbolic shape inference cannot resolve the dynamic batch/size axes; ONNX shape inference is enough here.
+    quant_pre_process(str(onnx_path), str(prepared), skip_symbolic_shape=True)
+    try:
+        if not calibration_dir:
+            quantize_dynamic(str(prepared), str(target), weight_type=QuantType.QUInt8)
+            return target
+        images = calibration_images(calibration_dir, limit)
+        if not images:
+            raise SystemExit(f"No calibration images found under {calibration_dir}")
+
+        class _Frames(CalibrationDataReader):
+            def __init__(self, paths: List[Path], input_name: str) -> None:
+                self._iter: Iterator = iter(paths)
+                self._input_name = input_name
+
+            def get_next(self):
+                for path in self._iter:
+                    image = cv2.imread(str(path))
+                    if image is not None:
+                        return {self._input_name: preprocess([image], imgsz)[0]}
+                return None
+
+        import onnx
+
+        input_name = onnx.load(str(prepared), load_external_data=False).graph.input[0].name
+        quantize_static(
+            str(prepared),
+            str(target),
+            _Frames(images, input_name),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+        )
+        logger.info("Calibrated INT8 model", extra={"extra_payload": {"images": len(images)}})
+        return target
+    finally:
+        prepared.unlink(missing_ok=True)
+
+
+def convert_openvino(onnx_path: Path) -> Path:
+    import openvino as ov
+
+    target = onnx_path.with_name(f"{onnx_path.stem}_openvino") / f"{onnx_path.stem}.xml"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    ov.save_model(ov.convert_model(str(onnx_path)), str(target), compress_to_fp16=False)
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_model = Path(__file__).resolve().parent / "yolov8s.pt"
+    parser.add_argument("--model", default=os.getenv("YOLO_MODEL_PATH", str(default_model)), help="Source weights (.pt).")
+    parser.add_argument("--format", choices=("onnx", "openvino"), required=True)
+    parser.add_argument("--int8", action="store_true", help="Quantize to INT8.")
+    parser.add_argument("--calibration-dir", default=None, help="Images for static INT8 calibration.")
+    parser.add_argument("--calibration-limit", type=int, default=200)
+    parser.add_argument("--imgsz", type=int, default=int(os.getenv("DETECTOR_IMGSZ", "640")))
+    parser.add_argument("--output-dir", default=None, help="Default: next to the source weights.")
+    args = parser.parse_args()
+
+    configure_logging(os.getenv("LOG_LEVEL"))
+    output_dir = Path(args.output_dir or Path(args.model).resolve().parent)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = export_onnx(args.model, output_dir, args.imgsz)
+    if args.int8:
+        model = quantize_int8(model, args.calibration_dir, args.imgsz, args.calibration_limit)
+    backend = "onnxruntime"
+    if args.format == "openvino":
+        model = convert_openvino(model)
+        backend = "openvino"
+    logger.info(
+        "Exported detector model",
+        extra={"extra_payload": {"model": str(model), "env": {"DETECTOR_BACKEND": backend, "YOLO_MODEL_PATH": str(model)}}},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import json
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("processor.masks")
+
+Polygon = List[Tuple[float, float]]
+
+
+class CameraMask:
+    """
+    Where motion and detections count for one camera. Polygons are in normalised frame
+    coordinates (0-1, so they survive resolution changes): `exclude` areas are ignored,
+    and if any `include` zones are given, only they count. The mask is rasterised once
+    per image size and cached, as motion runs at a reduced size and YOLO at full size.
+    """
+
+    def __init__(self, exclude: Sequence[Polygon] = (), include: Sequence[Polygon] = ()) -> None:
+        self.exclude = [_polygon(points) for points in exclude]
+        self.include = [_polygon(points) for points in include]
+        self._rasters: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def raster(self, height: int, width: int) -> np.ndarray:
+        """uint8 mask of the given size: 255 where motion and detections count, 0 elsewhere."""
+        cached = self._rasters.get((height, width))
+        if cached is not None:
+            return cached
+        scale = np.array([width, height], dtype=np.float64)
+        if self.include:
+            mask = np.zeros((height, width), dtype=np.uint8)
+            cv2.fillPoly(mask, [np.round(p * scale).astype(np.int32) for p in self.include], 255)
+        else:
+            mask = np.full((height, width), 255, dtype=np.uint8)
+        if self.exclude:
+            cv2.fillPoly(mask, [np.round(p * scale).astype(np.int32) for p in self.exclude], 0)
+        self._rasters[(height, width)] = mask
+        return mask
+
+    def allows(self, boxes: Sequence[Tuple[int, int, int, int]], frame_shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Boolean mask over (x, y, w, h) boxes in frame pixels, judged by each box's
+        bottom-centre point: where a person stands or a vehicle touches the ground.
+        """
+        height, width = frame_shape[:2]
+        if not len(boxes):
+            return np.zeros(0, dtype=bool)
+        raster = self.raster(height, width)
+        arr = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        xs = np.clip(arr[:, 0] + arr[:, 2] // 2, 0, width - 1)
+        ys = np.clip(arr[:, 1] + arr[:, 3] - 1, 0, height - 1)
+        return raster[ys, xs] > 0
+
+
+def _polygon(points: Sequence[Sequence[float]]) -> np.ndarray:
+    polygon = np.asarray(points, dtype=np.float64)
+    if polygon.ndim != 2 or polygon.shape[1] != 2 or len(polygon) < 3:
+        raise ValueError(f"polygon needs at least three [x, y] points, got {points!r}")
+    if polygon.min() < 0 or polygon.max() > 1:
+        raise ValueError(f"polygon points must be normalised to 0-1, got {points!r}")
+    return polygon
+
+
+def parse_camera_masks(raw) -> Dict[str, CameraMask]:
+    """
+    Masks by camera from JSON (a string or already-decoded dict), e.g.
+    {"driveway": {"exclude": [[[0, 0], [0.3, 0], [0.3, 0.4], [0, 0.4]]], "include": []}}.
+    Cameras with invalid polygons are logged and left unmasked.
+    """
+    if not raw:
+        return {}
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as exc:
+            logger.warning("Ignoring invalid camera masks", extra={"extra_payload": {"error": str(exc)}})
+            return {}
+    if not isinstance(raw, dict):
+        logger.warning("Ignoring invalid camera masks", extra={"extra_payload": {"error": "expected an object keyed by camera"}})
+        return {}
+    masks: Dict[str, CameraMask] = {}
+    for camera, spec in raw.items():
+        try:
+            masks[camera] = CameraMask(exclude=spec.get("exclude") or (), include=spec.get("include") or ())
+        except (AttributeError, TypeError, ValueError) as exc:
+            logger.warning(
+                "Ignoring invalid camera mask",
+                extra={"extra_payload": {"camera": camera, "error": str(exc)}},
+            )
+    return masks
@@ -3,6 +3,8 @@ import logging
 import cv2
 import numpy as np
 
+from .masks import CameraMask
+
 logger = logging.getLogger("processor.movement")
 
 
@@ -10,6 +12,10 @@ class MovementDetector:
     """
     Per-camera motion detector mirroring the experimental background subtraction
     pipeline (KNN + threshold + morphology) with warmup and area gating.
+
+    Motion only gates YOLO, so the pipeline runs at reduced resolution (max_width)
+    and boxes are scaled back to frame coordinates. A cheap frame-difference check on
+    a tiny thumbnail skips the subtractor entirely for clearly static frames.
     """
 
     def __init__(
@@ -23,6 +29,12 @@ class MovementDetector:
         camera: str | None = None,
         max_foreground_ratio: float = 0.1,
         debug_dir: str | None = None,
+        max_width: int = 0,
+        static_ratio: float = 0.0,
+        static_pixel_delta: int = 12,
+        static_refresh: int = 10,
+        precheck_width: int = 160,
+        mask: CameraMask | None = None,
     ) -> None:
         self.subtractor = cv2.createBackgroundSubtractorKNN(history=history, detectShadows=False)
         self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
@@ -34,17 +46,52 @@ class MovementDetector:
         self.max_foreground_ratio = max_foreground_ratio
         self._frame_idx = 0
         self.debug_dir = debug_dir
+        self.max_width = max_width
+        self.static_ratio = static_ratio
+        self.static_pixel_delta = static_pixel_delta
+        self.static_refresh = max(1, static_refresh)
+        self.precheck_width = precheck_width
+        self._reference_thumb: np.ndarray | None = None
+        self._static_streak = 0
+        self._last_motion = False
+        self.static_skipped = 0
+        self.history = max(1, history)
+        self._applied = 0
+        self.mask = mask
 
-    def detect(self, image: np.ndarray) -> list[tuple[int, int, int, int]]:
+    def detect(self, image: np.ndarray, input_scale: float = 1.0) -> list[tuple[int, int, int, int]]:
+        """
+        Return motion boxes in frame coordinates. input_scale is the frame-to-image size
+        ratio when the caller already passes a reduced image (e.g. a reduced JPEG decode).
+        Accepts BGR or single-channel grayscale input.
+        """
         frame_idx = self._frame_idx
         self._frame_idx += 1
 
         # Convert to grayscale to keep the background model simple/intensity-only.
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        fg_mask = self.subtractor.apply(gray)
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        scale = input_scale
+        if self.max_width and gray.shape[1] > self.max_width:
+            factor = self.max_width / float(gray.shape[1])
+            gray = cv2.resize(gray, (self.max_width, max(1, round(gray.shape[0] * factor))), interpolation=cv2.INTER_AREA)
+            scale = input_scale / factor
+
+        if frame_idx >= self.warmup and self._is_static(gray):
+            self.static_skipped += 1
+            logger.debug(
+                "Skipping static frame before background subtraction",
+                extra={"extra_payload": {"camera": self.camera, "frame_idx": frame_idx}},
+            )
+            return []
+
+        fg_mask = self.subtractor.apply(gray, learningRate=self._learning_rate())
+        self._applied += 1
 
         # Binarize and clean up noise from the raw foreground map.
         _, fg_mask = cv2.threshold(fg_mask, self.threshold, 255, cv2.THRESH_BINARY)
+        if self.mask is not None:
+            # Excluded areas (trees, the road, a TV) never produce contours, so never trigger YOLO.
+            fg_mask = cv2.bitwise_and(fg_mask, self.mask.raster(*fg_mask.shape[:2]))
         fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self.kernel)
 
         # Guard: warmup frames are used only to build the background model.
@@ -66,20 +113,23 @@ class MovementDetector:
 
         contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
+        # Areas are configured in frame pixels; compare in frame pixels regardless of processing size.
+        area_scale = scale * scale
         boxes: list[tuple[int, int, int, int]] = []
         total_area = 0
         for cnt in contours:
-            area = cv2.contourArea(cnt)
+            area = cv2.contourArea(cnt) * area_scale
             # Ignore tiny blobs; they are usually noise.
             if area < self.min_area:
                 continue
             x, y, w, h = cv2.boundingRect(cnt)
-            boxes.append((int(x), int(y), int(w), int(h)))
+            boxes.append((int(x * scale), int(y * scale), int(round(w * scale)), int(round(h * scale))))
             total_area += int(area)
 
         # Declare motion only if the sum of kept contour areas crosses the threshold.
         motion = total_area >= self.area_threshold
 
+        self._last_motion = bool(motion and boxes)
         if motion and boxes:
             logger.debug(
                 "Motion detected",
@@ -92,3 +142,40 @@ class MovementDetector:
             extra={"extra_payload": {"camera": self.camera, "total_area": total_area, "frame_idx": frame_idx}},
         )
         return []
+
+    def _learning_rate(self) -> float:
+        """
+        KNN's automatic rate is fine while the model bootstraps, but it is derived from the
+        number of frames applied, which no longer tracks time once static frames are
+        skipped; after warmup pin it to the configured history instead.
+        """
+        if self.static_ratio <= 0 or self._applied < self.warmup:
+            return -1.0
+        return 1.0 / self.history
+
+    def _is_static(self, gray: np.ndarray) -> bool:
+        """
+        Compare a thumbnail against the last frame that went through the subtractor.
+        Comparing to that reference rather than the previous frame lets slow movement
+        accumulate until it is visible. Only quiet scenes are skipped: once motion is
+        seen, the subtractor runs until it reports none. Every static_refresh-th frame
+        still updates the background model so stopped objects get absorbed.
+        """
+        if self.static_ratio <= 0 or self._last_motion:
+            self._reference_thumb = None
+            return False
+        width = min(self.precheck_width, gray.shape[1])
+        height = max(1, round(gray.shape[0] * width / float(gray.shape[1])))
+        thumb = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+        reference = self._reference_thumb
+        if reference is not None and reference.shape == thumb.shape and self._static_streak + 1 < self.static_refresh:
+            diff = cv2.absdiff(thumb, reference)
+            if self.mask is not None:
+                diff = cv2.bitwise_and(diff, self.mask.raster(*diff.shape[:2]))
+            changed = cv2.countNonZero(cv2.threshold(diff, self.static_pixel_delta, 255, cv2.THRESH_BINARY)[1])
+            if changed < self.static_ratio * thumb.size:
+                self._static_streak += 1
+                return True
+        self._reference_thumb = thumb
+        self._static_streak = 0
+        return False
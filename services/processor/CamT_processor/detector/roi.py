@@ -0,0 +1,102 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+
+def _pad(box: Box, padding: float, min_size: int, width: int, height: int) -> Box:
+    x, y, w, h = box
+    grow = int(round(padding * max(w, h)))
+    x1, y1, x2, y2 = x - grow, y - grow, x + w + grow, y + h + grow
+    # Give small motion blobs enough context to be recognisable.
+    if x2 - x1 < min_size:
+        extra = min_size - (x2 - x1)
+        x1, x2 = x1 - extra // 2, x2 + extra - extra // 2
+    if y2 - y1 < min_size:
+        extra = min_size - (y2 - y1)
+        y1, y2 = y1 - extra // 2, y2 + extra - extra // 2
+    # Shift back inside the frame before clipping so regions near an edge keep their size.
+    if x1 < 0:
+        x1, x2 = 0, x2 - x1
+    if y1 < 0:
+        y1, y2 = 0, y2 - y1
+    if x2 > width:
+        x1, x2 = x1 - (x2 - width), width
+    if y2 > height:
+        y1, y2 = y1 - (y2 - height), height
+    x1, y1 = max(0, x1), max(0, y1)
+    return x1, y1, x2 - x1, y2 - y1
+
+
+def _intersects(a: Box, b: Box) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def _union(a: Box, b: Box) -> Box:
+    x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+    x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return x1, y1, x2 - x1, y2 - y1
+
+
+def merge_regions(regions: Sequence[Box]) -> List[Box]:
+    """Union overlapping regions until none overlap, so no object is inferred twice."""
+    merged = list(regions)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                if _intersects(merged[i], merged[j]):
+                    merged[i] = _union(merged[i], merged.pop(j))
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+def plan_regions(
+    motion_boxes: Sequence[Box],
+    frame_shape: Tuple[int, ...],
+    padding: float,
+    min_size: int,
+    max_coverage: float,
+) -> Optional[List[Box]]:
+    """
+    Regions of the frame to run the detector on, in frame pixels: motion boxes padded by
+    padding x their longer side, grown to at least min_size, clipped to the frame and
+    merged where they overlap. None means infer on the full frame, either because there
+    is no usable motion box or because the regions cover at least max_coverage of it.
+    """
+    height, width = frame_shape[:2]
+    regions = [_pad(box, padding, min_size, width, height) for box in motion_boxes if box[2] > 0 and box[3] > 0]
+    if not regions:
+        return None
+    regions = merge_regions(regions)
+    covered = sum(w * h for _, _, w, h in regions)
+    if covered >= max_coverage * width * height:
+        return None
+    return regions
+
+
+def motion_overlap(boxes: Sequence[Box], motion_boxes: Sequence[Box], threshold: float) -> np.ndarray:
+    """
+    Boolean mask over boxes: True where a single motion box covers at least threshold
+    of the box's area. Computed as one boxes x motion_boxes intersection matrix.
+    """
+    if not len(boxes) or not len(motion_boxes):
+        return np.zeros(len(boxes), dtype=bool)
+    det = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    motion = np.asarray(motion_boxes, dtype=np.float64).reshape(-1, 4)
+    motion = motion[(motion[:, 2] > 0) & (motion[:, 3] > 0)]
+    if not len(motion):
+        return np.zeros(len(det), dtype=bool)
+    inter_w = np.minimum(det[:, None, 0] + det[:, None, 2], motion[None, :, 0] + motion[None, :, 2]) - np.maximum(
+        det[:, None, 0], motion[None, :, 0]
+    )
+    inter_h = np.minimum(det[:, None, 1] + det[:, None, 3], motion[None, :, 1] + motion[None, :, 3]) - np.maximum(
+        det[:, None, 1], motion[None, :, 1]
+    )
+    covered = (inter_w > 0) & (inter_h > 0) & (inter_w * inter_h >= (det[:, 2] * det[:, 3] * threshold)[:, None])
+    return covered.any(axis=1) & (det[:, 2] > 0) & (det[:, 3] > 0)
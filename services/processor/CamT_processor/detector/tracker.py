@@ -0,0 +1,240 @@
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+TRACK_START = "start"
+TRACK_KEYFRAME = "keyframe"
+TRACK_BEST = "best"
+
+
+def _intersection(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise intersection areas of (N, 4) and (M, 4) xywh boxes."""
+    inter_w = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    inter_h = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    return np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N, 4) and (M, 4) xywh boxes."""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)))
+    inter = _intersection(a, b)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class _BoxFilter:
+    """
+    Constant-velocity Kalman filter over (cx, cy, w, h, vx, vy). Time steps are in seconds,
+    since frames reach the tracker at an irregular rate (polling, motion gating). Noise
+    scales with the box height, as in DeepSORT, so small and large objects track alike.
+    """
+
+    _H = np.hstack([np.eye(4), np.zeros((4, 2))])
+
+    def __init__(self, box: Box) -> None:
+        x, y, w, h = box
+        self.x = np.array([x + w / 2.0, y + h / 2.0, w, h, 0.0, 0.0])
+        scale = max(h, 1.0)
+        self.P = np.diag([(0.1 * scale) ** 2] * 4 + [(0.5 * scale) ** 2] * 2)
+
+    def predict(self, dt: float) -> None:
+        if dt <= 0:
+            return
+        F = np.eye(6)
+        F[0, 4] = F[1, 5] = dt
+        scale = max(self.x[3], 1.0)
+        q_pos, q_vel = (0.05 * scale) ** 2 * dt, (0.1 * scale) ** 2 * dt
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + np.diag([q_pos] * 4 + [q_vel] * 2)
+
+    def update(self, box: Box) -> None:
+        x, y, w, h = box
+        z = np.array([x + w / 2.0, y + h / 2.0, w, h])
+        R = np.eye(4) * (0.05 * max(h, 1.0)) ** 2
+        S = self._H @ self.P @ self._H.T + R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self._H @ self.x)
+        self.P = (np.eye(6) - K @ self._H) @ self.P
+
+    def box(self) -> np.ndarray:
+        cx, cy, w, h = self.x[:4]
+        w, h = max(w, 1.0), max(h, 1.0)
+        return np.array([cx - w / 2.0, cy - h / 2.0, w, h])
+
+
+class Track:
+    def __init__(self, box: Box, timestamp: float) -> None:
+        self.track_id = uuid.uuid4().hex
+        self.filter = _BoxFilter(box)
+        self.hits = 1
+        self.updated_at = timestamp
+        self.last_seen = timestamp
+        self.started = False
+        self.emitted_at: Optional[float] = None
+        self.best_score = 0.0
+
+    def predict(self, timestamp: float) -> np.ndarray:
+        self.filter.predict(timestamp - self.updated_at)
+        self.updated_at = max(self.updated_at, timestamp)
+        return self.filter.box()
+
+
+class Tracker:
+    """
+    SORT-style multi-object tracker for one camera and one object kind: Kalman-predicted
+    boxes are matched to new detections greedily by IoU (then by centre distance for the
+    leftovers), unmatched detections start tracks, and tracks unseen for max_age seconds
+    are dropped.
+
+    update() also decides which detections are worth sending downstream: a track's
+    first eligible detection (start), then one every keyframe_seconds (keyframe), plus any
+    whose score beats the best one sent so far for the track by best_margin (best; the
+    event writer updates the track's event with it rather than storing a new one).
+    Detections that are not eligible (e.g. no motion under them) still keep their track
+    alive but are never sent.
+    """
+
+    MIN_PROXIMITY = 0.25  # second-pass match: centres at most 3/4 of a box height apart
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_age: float = 10.0,
+        min_hits: int = 1,
+        keyframe_seconds: float = 30.0,
+        best_margin: float = 0.1,
+    ) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = max(1, min_hits)
+        self.keyframe_seconds = keyframe_seconds
+        self.best_margin = best_margin
+        self.tracks: List[Track] = []
+        # Whether the last update() matched every live track and started none.
+        self.stable = False
+
+    def update(
+        self,
+        boxes: Sequence[Box],
+        scores: Sequence[float],
+        timestamp: float,
+        eligible: Optional[Sequence[bool]] = None,
+    ) -> List[Tuple[str, Optional[str]]]:
+        """(track_id, event) for each detection, in order; event is None when it should not be sent."""
+        self.tracks = [track for track in self.tracks if timestamp - track.last_seen <= self.max_age]
+        if eligible is None:
+            eligible = [True] * len(boxes)
+        predicted = np.array([track.predict(timestamp) for track in self.tracks]).reshape(-1, 4)
+        det_boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        assigned: List[Optional[Track]] = [None] * len(boxes)
+        used_tracks: set = set()
+        # IoU first; then, for what is left, centre distance. At 1-2 fps a walking person
+        # can move further than its own width between frames, before its track has a
+        # velocity estimate, and IoU alone would start a new track every frame.
+        for scores_matrix, threshold in (
+            (iou_matrix(predicted, det_boxes), self.iou_threshold),
+            (self._proximity(predicted, det_boxes), self.MIN_PROXIMITY),
+        ):
+            for t_idx, d_idx in self._greedy(scores_matrix, threshold, used_tracks, assigned):
+                used_tracks.add(t_idx)
+                track = self.tracks[t_idx]
+                track.filter.update(boxes[d_idx])
+                track.hits += 1
+                track.last_seen = timestamp
+                assigned[d_idx] = track
+
+        self.stable = len(used_tracks) == len(self.tracks) and all(track is not None for track in assigned)
+        results: List[Tuple[str, Optional[str]]] = []
+        for idx, box in enumerate(boxes):
+            track = assigned[idx]
+            if track is None:
+                track = Track(box, timestamp)
+                self.tracks.append(track)
+            event = self._event(track, float(scores[idx]), timestamp) if eligible[idx] else None
+            results.append((track.track_id, event))
+        return results
+
+    def coverage(self, motion_boxes: Sequence[Box], timestamp: float) -> np.ndarray:
+        """For each motion box, the largest fraction of its area inside one predicted track box."""
+        motion = np.asarray(motion_boxes, dtype=np.float64).reshape(-1, 4)
+        live = [track for track in self.tracks if timestamp - track.last_seen <= self.max_age]
+        if not live or not len(motion):
+            return np.zeros(len(motion))
+        predicted = np.array([track.predict(timestamp) for track in live])
+        return _intersection(motion, predicted).max(axis=1) / np.maximum(motion[:, 2] * motion[:, 3], 1.0)
+
+    def propagate(self, motion_boxes: Sequence[Box], timestamp: float) -> None:
+        """
+        Advance tracks on a frame YOLO did not see. Each track takes the motion box that
+        covers most of it as a position measurement (its own size, re-centred on the motion
+        box) and stays alive; tracks with no motion under them are only predicted.
+        """
+        motion = np.asarray(motion_boxes, dtype=np.float64).reshape(-1, 4)
+        live = [track for track in self.tracks if timestamp - track.last_seen <= self.max_age]
+        if not live or not len(motion):
+            return
+        predicted = np.array([track.predict(timestamp) for track in live])
+        overlap = _intersection(predicted, motion)
+        for track, box, row in zip(live, predicted, overlap):
+            best = int(row.argmax())
+            if row[best] <= 0:
+                continue
+            mx, my, mw, mh = motion[best]
+            w, h = box[2], box[3]
+            track.filter.update((mx + mw / 2.0 - w / 2.0, my + mh / 2.0 - h / 2.0, w, h))
+            track.last_seen = timestamp
+
+    @staticmethod
+    def _greedy(matrix: np.ndarray, threshold: float, used_tracks: set, assigned: list) -> List[Tuple[int, int]]:
+        """Best-first pairs above threshold among unused tracks and unassigned detections."""
+        pairs: List[Tuple[int, int]] = []
+        if not matrix.size:
+            return pairs
+        used_dets = {idx for idx, track in enumerate(assigned) if track is not None}
+        taken = set(used_tracks)
+        order = np.dstack(np.unravel_index(np.argsort(-matrix, axis=None), matrix.shape))[0]
+        for t_idx, d_idx in order.tolist():
+            if matrix[t_idx, d_idx] < threshold:
+                break
+            if t_idx in taken or d_idx in used_dets:
+                continue
+            taken.add(t_idx)
+            used_dets.add(d_idx)
+            pairs.append((t_idx, d_idx))
+        return pairs
+
+    @staticmethod
+    def _proximity(tracks: np.ndarray, dets: np.ndarray) -> np.ndarray:
+        """
+        1 - centre distance / track height for similar-sized boxes (area ratio within 2x),
+        else 0; a detection one box height away scores 0.
+        """
+        if not len(tracks) or not len(dets):
+            return np.zeros((len(tracks), len(dets)))
+        dx = (dets[None, :, 0] + dets[None, :, 2] / 2) - (tracks[:, None, 0] + tracks[:, None, 2] / 2)
+        dy = (dets[None, :, 1] + dets[None, :, 3] / 2) - (tracks[:, None, 1] + tracks[:, None, 3] / 2)
+        scale = np.maximum(tracks[:, 3], 1.0)[:, None]
+        closeness = 1.0 - np.hypot(dx, dy) / scale
+        area_ratio = (dets[None, :, 2] * dets[None, :, 3]) / np.maximum(tracks[:, None, 2] * tracks[:, None, 3], 1.0)
+        similar = (area_ratio >= 0.5) & (area_ratio <= 2.0)
+        return np.where(similar, np.clip(closeness, 0.0, None), 0.0)
+
+    def _event(self, track: Track, score: float, timestamp: float) -> Optional[str]:
+        if not track.started:
+            if track.hits < self.min_hits:
+                return None
+            track.started = True
+            event = TRACK_START
+        elif track.emitted_at is not None and timestamp - track.emitted_at >= self.keyframe_seconds:
+            event = TRACK_KEYFRAME
+        elif score >= track.best_score + self.best_margin:
+            event = TRACK_BEST
+        else:
+            return None
+        track.emitted_at = timestamp
+        track.best_score = max(track.best_score, score)
+        return event
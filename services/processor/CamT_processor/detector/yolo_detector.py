@@ -1,13 +1,14 @@
+import math
 import os
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 import logging
 
 from ..dto import Detection
-from ..image_ops import crop, encode_jpeg
-from ultralytics import YOLO
+from .backends import create_backend
 
 logger = logging.getLogger("processor.yolo")
 
@@ -24,6 +25,52 @@ COCO_CLASS_NAMES = (
 
 PERSON_CLASS_ID = 0
 VEHICLE_CLASS_IDS = {1, 2, 3, 5, 6, 7}  # bicycle, car, motorbike, bus, train, truck
+ROI_SIZE_STEP = 64  # region crops are inferred at a multiple of this, so a batch has few distinct sizes
+
+
+def split_detections(
+    rows: np.ndarray, image_shape: tuple[int, ...], min_vehicle_confidence: float
+) -> dict[str, list[Detection]]:
+    """
+    Backend rows (x1, y1, x2, y2, score, class_id) -> person and vehicle Detections, with
+    the class, confidence and bounds checks done as array operations over all rows.
+    """
+    detections: dict[str, list[Detection]] = {"persons": [], "vehicles": []}
+    if not len(rows):
+        return detections
+    cls_ids = rows[:, 5].astype(np.int64)
+    scores = rows[:, 4]
+    widths = rows[:, 2] - rows[:, 0]
+    heights = rows[:, 3] - rows[:, 1]
+    # Same bounds as image_ops.crop: boxes whose crop would be empty are dropped.
+    img_h, img_w = image_shape[:2]
+    x0 = np.maximum(0, np.round(rows[:, 0]))
+    y0 = np.maximum(0, np.round(rows[:, 1]))
+    non_empty = (np.minimum(img_w, x0 + np.round(widths)) > x0) & (np.minimum(img_h, y0 + np.round(heights)) > y0)
+    is_person = (cls_ids == PERSON_CLASS_ID) & non_empty
+    is_vehicle = np.isin(cls_ids, list(VEHICLE_CLASS_IDS)) & (scores >= min_vehicle_confidence) & non_empty
+    bboxes = np.stack([rows[:, 0], rows[:, 1], widths, heights], axis=1).astype(np.int64).tolist()
+    score_list = scores.tolist()
+    # Crops are encoded later, by the writers, only for detections that survive filtering.
+    for target, mask in (("persons", is_person), ("vehicles", is_vehicle)):
+        detections[target] = [
+            Detection(bbox=tuple(bboxes[idx]), score=score_list[idx]) for idx in np.flatnonzero(mask).tolist()
+        ]
+    return detections
+
+
+@dataclass
+class CascadeStats:
+    frames: int = 0
+    escalated: int = 0
+    screen_confident: int = 0
+    screen_empty: int = 0
+
+    def summary(self) -> dict:
+        return {
+            **asdict(self),
+            "escalation_rate": round(self.escalated / self.frames, 3) if self.frames else 0.0,
+        }
 
 
 class CocoYoloDetector:
@@ -33,6 +80,12 @@ class CocoYoloDetector:
         conf_threshold: Optional[float] = None,
         iou_threshold: Optional[float] = None,
         min_vehicle_confidence: Optional[float] = None,
+        backend: Optional[str] = None,
+        imgsz: Optional[int] = None,
+        screen_model_path: Optional[str] = None,
+        screen_low: Optional[float] = None,
+        screen_high: Optional[float] = None,
+        threads: int = 0,
     ) -> None:
         default_model = Path(__file__).resolve().parent / "yolov8s.pt"
         self.model_path = model_path or os.getenv("YOLO_MODEL_PATH", str(default_model))
@@ -41,52 +94,134 @@ class CocoYoloDetector:
         self.min_vehicle_confidence = (
             min_vehicle_confidence if min_vehicle_confidence is not None else float(os.getenv("YOLO_VEHICLE_CONF", "0.3"))
         )
-        self.model = YOLO(self.model_path)
+        self.backend_name = backend or os.getenv("DETECTOR_BACKEND", "ultralytics")
+        self.imgsz = imgsz if imgsz is not None else int(os.getenv("DETECTOR_IMGSZ", "640"))
+        self.threads = threads
+        self.backend = self._create_backend(self.model_path, self.conf_threshold)
+        # Cascade: a small screening model sees every frame; this (larger) model only the uncertain ones.
+        self.screen_model_path = screen_model_path if screen_model_path is not None else os.getenv("YOLO_SCREEN_MODEL_PATH", "")
+        self.screen_low = screen_low if screen_low is not None else float(os.getenv("YOLO_SCREEN_LOW", "0.2"))
+        self.screen_high = screen_high if screen_high is not None else float(os.getenv("YOLO_SCREEN_HIGH", "0.6"))
+        self.screen_backend = (
+            self._create_backend(self.screen_model_path, min(self.screen_low, self.conf_threshold))
+            if self.screen_model_path
+            else None
+        )
+        self.cascade_stats = CascadeStats()
         logger.debug(
             "YOLO detector initialized",
             extra={
                 "extra_payload": {
+                    "backend": self.backend_name,
                     "model_path": self.model_path,
                     "conf_threshold": self.conf_threshold,
                     "iou_threshold": self.iou_threshold,
                     "min_vehicle_confidence": self.min_vehicle_confidence,
+                    "screen_model_path": self.screen_model_path or None,
                 }
             },
         )
 
+    def _create_backend(self, model_path: str, conf_threshold: float):
+        return create_backend(
+            self.backend_name,
+            model_path,
+            conf_threshold,
+            self.iou_threshold,
+            classes=[PERSON_CLASS_ID, *sorted(VEHICLE_CLASS_IDS)],
+            imgsz=self.imgsz,
+            threads=self.threads,
+        )
+
+    def warmup(self) -> None:
+        """One inference per loaded model, so the first real frames do not pay for lazy allocations."""
+        blank = [np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)]
+        for backend in filter(None, (self.screen_backend, self.backend)):
+            backend.predict(blank)
+
     def predict(self, image: np.ndarray) -> dict[str, list[Detection]]:
-        results = self.model.predict(source=image, verbose=False, conf=self.conf_threshold, iou=self.iou_threshold)
-        if not results:
-            return {"persons": [], "vehicles": []}
-        res = results[0]
-        if not hasattr(res, "boxes") or res.boxes is None:
-            return {"persons": [], "vehicles": []}
-
-        detections: dict[str, list[Detection]] = {"persons": [], "vehicles": []}
-
-        for box in res.boxes:
-            cls_id = int(box.cls.item())
-            conf = float(box.conf.item())
-            if cls_id == PERSON_CLASS_ID:
-                target = "persons"
-            elif cls_id in VEHICLE_CLASS_IDS:
-                if conf < self.min_vehicle_confidence:
-                    continue
-                target = "vehicles"
+        return self.predict_batch([image])[0]
+
+    def predict_batch(
+        self,
+        images: list[np.ndarray],
+        regions: Optional[Sequence[Optional[Sequence[tuple[int, int, int, int]]]]] = None,
+    ) -> list[dict[str, list[Detection]]]:
+        """
+        Run batched inference and return the detections of each image, in order, in image
+        coordinates. regions optionally gives, per image, (x, y, w, h) crops to infer on
+        instead of the whole image (None for the full image). Crops are inferred at their
+        native resolution, rounded up to ROI_SIZE_STEP and capped at imgsz, and inputs of
+        the same size share one backend call.
+
+        In cascade mode the screening model runs first. Images where it finds nothing
+        above screen_low, or only candidates at or above screen_high, keep its result;
+        images with a candidate in between go through the main model as one batch.
+        """
+        if not images:
+            return []
+        if regions is None:
+            regions = [None] * len(images)
+        if self.screen_backend is None:
+            rows = self._infer(self.backend, images, regions)
+        else:
+            rows = self._cascade(images, regions)
+        return [self._parse(image_rows, image) for image_rows, image in zip(rows, images)]
+
+    def _cascade(self, images: list[np.ndarray], regions: Sequence) -> list[np.ndarray]:
+        rows = self._infer(self.screen_backend, images, regions)
+        stats = self.cascade_stats
+        escalate = []
+        for idx, image_rows in enumerate(rows):
+            scores = image_rows[:, 4]
+            stats.frames += 1
+            if ((scores >= self.screen_low) & (scores < self.screen_high)).any():
+                escalate.append(idx)
+            elif (scores >= self.screen_high).any():
+                stats.screen_confident += 1
             else:
+                stats.screen_empty += 1
+            rows[idx] = image_rows[scores >= self.conf_threshold]
+        if escalate:
+            stats.escalated += len(escalate)
+            refined = self._infer(self.backend, [images[idx] for idx in escalate], [regions[idx] for idx in escalate])
+            for idx, image_rows in zip(escalate, refined):
+                rows[idx] = image_rows
+        return rows
+
+    def _infer(self, backend, images: list[np.ndarray], regions: Sequence) -> list[np.ndarray]:
+        """Backend rows for each image in image coordinates, with regions inferred as crops."""
+        inputs: list[tuple[int, int, int, np.ndarray, Optional[int]]] = []  # image index, x, y, input, size
+        for idx, (image, image_regions) in enumerate(zip(images, regions)):
+            if not image_regions:
+                inputs.append((idx, 0, 0, image, None))
                 continue
+            for x, y, w, h in image_regions:
+                inputs.append((idx, x, y, image[y : y + h, x : x + w], self._region_size(w, h)))
+
+        groups: dict[Optional[int], list[int]] = {}
+        for pos, (_, _, _, _, size) in enumerate(inputs):
+            groups.setdefault(size, []).append(pos)
+        outputs: list[np.ndarray] = [np.zeros((0, 6), dtype=np.float32)] * len(inputs)
+        for size, positions in groups.items():
+            results = backend.predict([inputs[pos][3] for pos in positions], size=size)
+            for pos, rows in zip(positions, results):
+                outputs[pos] = rows
+
+        per_image: list[list[np.ndarray]] = [[] for _ in images]
+        for (idx, x, y, _, _), rows in zip(inputs, outputs):
+            if len(rows) and (x or y):
+                rows = rows.copy()
+                rows[:, [0, 2]] += x
+                rows[:, [1, 3]] += y
+            per_image[idx].append(rows)
+        return [np.concatenate(rows) for rows in per_image]
+
+    def _region_size(self, width: int, height: int) -> int:
+        return min(self.imgsz, max(1, math.ceil(max(width, height) / ROI_SIZE_STEP)) * ROI_SIZE_STEP)
 
-            x1, y1, x2, y2 = box.xyxy[0].tolist()
-            w = x2 - x1
-            h = y2 - y1
-            cropped = crop(image, (x1, y1, w, h))
-            detections[target].append(
-                Detection(
-                    bbox=(int(x1), int(y1), int(w), int(h)),
-                    score=conf,
-                    crop_bytes=encode_jpeg(cropped),
-                )
-            )
+    def _parse(self, rows: np.ndarray, image: np.ndarray) -> dict[str, list[Detection]]:
+        detections = split_detections(rows, image.shape, self.min_vehicle_confidence)
         logger.debug(
             "YOLO detections",
             extra={
@@ -1,50 +1,108 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 
 BoundingBox = Tuple[int, int, int, int]
 
+# Pipeline stages a frame passes, in order; see LatencyTrace.
+TRACE_STAGES = ("captured", "enqueued", "dequeued", "motion", "inferred", "committed", "notified")
+
+
+def utc_epoch(captured_at: datetime) -> float:
+    """Epoch seconds of a capture time; the pipeline's datetimes are naive UTC, not local time."""
+    return captured_at.replace(tzinfo=timezone.utc).timestamp()
+
 
 @dataclass(frozen=True)
 class PoisonPill:
     reason: str = "shutdown"
 
 
+@dataclass(frozen=True)
+class FrameRef:
+    """
+    Handle to a frame stored in a shared-memory FramePool slot. Raw BGR frames carry
+    their array shape; encoded image bytes (JPEG/PNG from file sources) have no shape.
+    """
+
+    slot: int
+    size: int
+    shape: Optional[Tuple[int, int, int]] = None
+
+    @property
+    def is_raw(self) -> bool:
+        return self.shape is not None
+
+
+@dataclass(frozen=True)
+class LatencyTrace:
+    """
+    Wall-clock time (epoch seconds) at which a frame reached each of TRACE_STAGES, 0.0
+    for stages it has not reached. Kept as a flat tuple so it adds a few floats to each
+    message; every stage returns a new trace with mark().
+    """
+
+    stamps: Tuple[float, ...] = ()
+
+    def mark(self, stage: str, at: Optional[float] = None) -> LatencyTrace:
+        stamps = list(self.stamps) + [0.0] * (len(TRACE_STAGES) - len(self.stamps))
+        stamps[TRACE_STAGES.index(stage)] = time.time() if at is None else at
+        return LatencyTrace(tuple(stamps))
+
+    def at(self, stage: str) -> Optional[float]:
+        index = TRACE_STAGES.index(stage)
+        stamp = self.stamps[index] if index < len(self.stamps) else 0.0
+        return stamp or None
+
+    def stage_ms(self) -> Dict[str, float]:
+        """Milliseconds each reached stage took since the previous reached one, plus the capture-to-last total."""
+        reached = [(stage, stamp) for stage, stamp in zip(TRACE_STAGES, self.stamps) if stamp]
+        spans = {stage: round((stamp - prev) * 1000, 1) for (_, prev), (stage, stamp) in zip(reached, reached[1:])}
+        if len(reached) > 1:
+            spans["total"] = round((reached[-1][1] - reached[0][1]) * 1000, 1)
+        return spans
+
+
 @dataclass(frozen=True)
 class FrameJob:
     frame_id: UUID
     camera: str
     captured_at: datetime
-    image_bytes: bytes
+    frame: FrameRef
+    trace: LatencyTrace = field(default_factory=LatencyTrace, compare=False)
 
 
 @dataclass(frozen=True)
 class Detection:
+    """
+    A YOLO box in frame pixels. crop_bytes is left empty by detection; writers encode the
+    crop from the frame. With tracking on, track_id groups detections of the same object
+    and track_event says why this one was sent (start, keyframe or best).
+    """
+
     bbox: BoundingBox
     score: float
-    crop_bytes: bytes
+    crop_bytes: Optional[bytes] = None
+    track_id: Optional[str] = None
+    track_event: Optional[str] = None
 
 
 @dataclass(frozen=True)
-class PersonDetections:
-    frame_id: UUID
-    camera: str
-    captured_at: datetime
-    frame_bytes: bytes
-    persons: List[Detection] = field(default_factory=list)
-
+class FrameDetections:
+    """Everything worth storing from one frame, sent to the event writer as one message."""
 
-@dataclass(frozen=True)
-class VehicleDetections:
     frame_id: UUID
     camera: str
     captured_at: datetime
-    frame_bytes: bytes
+    frame: FrameRef
+    persons: List[Detection] = field(default_factory=list)
     vehicles: List[Detection] = field(default_factory=list)
+    trace: LatencyTrace = field(default_factory=LatencyTrace, compare=False)
 
 
 @dataclass(frozen=True)
@@ -54,4 +112,7 @@ class NotificationJob:
     occurred_at: datetime
     crop_path: Optional[str]
     event_id: Optional[UUID] = None
+    frame_id: Optional[UUID] = None
+    trace: LatencyTrace = field(default_factory=LatencyTrace, compare=False)
+    trace_id: Optional[UUID] = None  # stored latency_trace record the notifier completes
 
@@ -4,9 +4,25 @@ import cv2
 import numpy as np
 
 
-def decode_image(image_bytes: bytes) -> np.ndarray:
+_REDUCED_COLOR = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+_REDUCED_GRAYSCALE = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def decode_image(image_bytes: bytes, reduction: int = 1, grayscale: bool = False) -> np.ndarray:
+    """
+    Decode image bytes. reduction (2, 4 or 8) lets libjpeg decode straight to a
+    smaller size, which is much cheaper than a full decode followed by a resize.
+    """
     array = np.frombuffer(image_bytes, dtype=np.uint8)
-    return cv2.imdecode(array, cv2.IMREAD_COLOR)
+    if reduction in _REDUCED_COLOR:
+        flag = _REDUCED_GRAYSCALE[reduction] if grayscale else _REDUCED_COLOR[reduction]
+    else:
+        flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+    return cv2.imdecode(array, flag)
 
 
 def encode_jpeg(image: np.ndarray) -> bytes:
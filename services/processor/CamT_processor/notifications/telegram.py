@@ -1,5 +1,6 @@
 import logging
 import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from multiprocessing import Event, Process, Queue
@@ -7,9 +8,14 @@ from pathlib import Path
 from typing import Dict, Optional
 
 import httpx
+from ct_core import get_session
+from ct_core.models import JobRecord
 
-from ..dto import NotificationJob, PoisonPill
+from ..dto import LatencyTrace, NotificationJob, PoisonPill
 from ..logging_utils import configure_logging
+from ..pipeline.cpu import CpuBudget, apply_cpu_budget
+from ..pipeline.latency import LatencyRecorder, is_sampled, trace_payload
+from ..pipeline.metrics import MetricsShard
 
 logger = logging.getLogger("processor.notifications")
 
@@ -38,29 +44,56 @@ class TelegramNotifier:
 
 
 class NotificationWorker(Process):
-    def __init__(self, queue: Queue, stop_event: Event, settings: Optional[TelegramSettings]):
+    def __init__(
+        self,
+        queue: Queue,
+        stop_event: Event,
+        settings: Optional[TelegramSettings],
+        producers: int = 1,
+        cpu_budget: Optional[CpuBudget] = None,
+        metrics: Optional[MetricsShard] = None,
+        trace_sample_rate: float = 0.0,
+        stats_interval: float = 30.0,
+    ):
         super().__init__(daemon=True)
         self.queue = queue
         self.stop_event = stop_event
         self.settings = settings
+        self.producers = max(1, producers)
+        self.cpu_budget = cpu_budget
+        self.metrics = metrics or MetricsShard()
         self.notifier = TelegramNotifier(settings) if settings else None
         self._last_sent: Dict[str, datetime] = {}
+        self.trace_sample_rate = trace_sample_rate
+        self.stats_interval = stats_interval
+        self.latency = LatencyRecorder()
+        self._last_stats = time.monotonic()
 
     def run(self) -> None:
         configure_logging(os.getenv("LOG_LEVEL"))
+        apply_cpu_budget(self.cpu_budget)
+        pills = 0
         while not self.stop_event.is_set():
             job = self.queue.get()
             if isinstance(job, PoisonPill):
-                break
+                pills += 1
+                if pills >= self.producers:
+                    break
+                continue
             if not self.notifier:
                 continue
             if self._should_skip(job):
+                self.metrics.inc("camtelligence_notifications_total", label="debounced")
                 continue
             try:
                 self._deliver(job)
                 self._last_sent[job.camera] = datetime.utcnow()
+                self.metrics.inc("camtelligence_notifications_total", label="sent")
+                self._record_latency(job)
             except Exception as exc:  # pragma: no cover - best effort
+                self.metrics.inc("camtelligence_notifications_total", label="failed")
                 logger.error("Failed to send notification", extra={"extra_payload": {"error": str(exc)}})
+            self._maybe_log_latency()
 
     def _should_skip(self, job: NotificationJob) -> bool:
         last = self._last_sent.get(job.camera)
@@ -68,6 +101,43 @@ class NotificationWorker(Process):
             return False
         return (datetime.utcnow() - last) < timedelta(seconds=self.settings.debounce_seconds)  # type: ignore[arg-type]
 
+    def _record_latency(self, job: NotificationJob) -> None:
+        trace = job.trace.mark("notified")
+        captured = trace.at("captured")
+        if captured is not None:
+            self.metrics.observe("camtelligence_frame_latency_seconds", trace.at("notified") - captured, label="notified")
+        self.latency.record(job.camera, trace)
+        if job.frame_id is not None and is_sampled(job.frame_id, self.trace_sample_rate):
+            logger.info(
+                "Latency trace",
+                extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), **trace_payload(trace)}},
+            )
+        if job.trace_id is not None:
+            self._complete_stored_trace(job, trace)
+
+    def _complete_stored_trace(self, job: NotificationJob, trace: LatencyTrace) -> None:
+        """Extend the trace the event writer stored up to the commit through the first notification of its frame."""
+        try:
+            with get_session() as session:
+                with session.begin():
+                    record = session.get(JobRecord, job.trace_id)
+                    if record is None or "notified" in (record.payload or {}).get("stamps", {}):
+                        return
+                    record.payload = {**record.payload, **trace_payload(trace)}
+        except Exception as exc:
+            logger.warning(
+                "Failed to store latency trace",
+                extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "error": str(exc)}},
+            )
+
+    def _maybe_log_latency(self) -> None:
+        now = time.monotonic()
+        if now - self._last_stats < self.stats_interval:
+            return
+        self._last_stats = now
+        for camera, stages in self.latency.summary().items():
+            logger.info("Latency stats", extra={"extra_payload": {"camera": camera, "through": "notified", **stages}})
+
     def _deliver(self, job: NotificationJob) -> None:
         if job.event_type == "vehicle":
             title = "Vehicle detected"
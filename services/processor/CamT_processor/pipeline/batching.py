@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass
+class BatchStats:
+    batch_size: int
+    batches: int = 0
+    frames: int = 0
+    infer_seconds: float = 0.0
+    latency_seconds: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.infer_seconds if self.infer_seconds > 0 else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.latency_seconds / self.frames if self.frames else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "frames": self.frames,
+            "infer_ms_per_batch": round(self.infer_seconds / self.batches * 1000, 1) if self.batches else 0.0,
+            "infer_frames_per_second": round(self.frames_per_second, 2),
+            "avg_latency_ms": round(self.avg_latency * 1000, 1),
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+        }
+
+
+class BatchStatsRecorder:
+    """
+    Per-batch-size inference counters. Latency is measured per frame from the moment it
+    passed the motion gate until its batch's predictions came back, so it includes the
+    time spent waiting for the batch to fill.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[int, BatchStats] = {}
+
+    def record(self, infer_seconds: float, latencies: List[float]) -> None:
+        size = len(latencies)
+        stats = self._stats.setdefault(size, BatchStats(batch_size=size))
+        stats.batches += 1
+        stats.frames += size
+        stats.infer_seconds += infer_seconds
+        stats.latency_seconds += sum(latencies)
+        stats.max_latency = max(stats.max_latency, max(latencies, default=0.0))
+
+    def snapshot(self) -> List[BatchStats]:
+        return [BatchStats(**vars(stats)) for _, stats in sorted(self._stats.items())]
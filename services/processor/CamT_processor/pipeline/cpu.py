@@ -0,0 +1,149 @@
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+
+logger = logging.getLogger("processor.cpu")
+
+# Read by OpenMP / BLAS runtimes when they first start their thread pools in this process.
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+ROLES = ("ingestion", "detection", "writer", "notifier")
+
+# Continuous software decode of 1080p H.264 at camera frame rates: streams one core keeps up with.
+STREAMS_PER_CORE = 4
+
+
+@dataclass(frozen=True)
+class CpuBudget:
+    threads: int = 0  # intra-op threads for torch / OpenCV / the inference runtime; 0 leaves the library default
+    cpus: Optional[Tuple[int, ...]] = None  # affinity; None keeps the inherited one
+
+    def summary(self) -> dict:
+        return {"threads": self.threads or None, "cpus": list(self.cpus) if self.cpus is not None else None}
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on (the container's cpuset, not the host's core count)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(raw: str) -> Optional[Tuple[int, ...]]:
+    """ "0-3,6" -> (0, 1, 2, 3, 6); empty -> None (pick automatically)."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    cpus = set()
+    for part in raw.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        elif part:
+            cpus.add(int(part))
+    if not cpus:
+        raise ValueError(f"empty CPU list {raw!r}")
+    return tuple(sorted(cpus))
+
+
+def _split(cpus: Sequence[int], parts: int) -> List[Tuple[int, ...]]:
+    """Contiguous, near-equal chunks; the first ones take the remainder."""
+    size, extra = divmod(len(cpus), parts)
+    chunks, start = [], 0
+    for idx in range(parts):
+        end = start + size + (1 if idx < extra else 0)
+        chunks.append(tuple(cpus[start:end]))
+        start = end
+    return chunks
+
+
+def plan_cpu_budgets(
+    detection_workers: int,
+    cpus: Optional[Sequence[int]] = None,
+    threads: Optional[Dict[str, int]] = None,
+    affinity: Optional[Dict[str, Optional[Tuple[int, ...]]]] = None,
+    stream_cameras: int = 0,
+) -> Dict[str, CpuBudget]:
+    """
+    CpuBudget per process name (ingestion, detection-N, event_writer, notifier).
+    Inference and stream decoding are the CPU-heavy work. When there are enough cores,
+    a shared set is put aside for ingestion, the event writer and the notifier: about one
+    core in eight (at least one) plus one per STREAMS_PER_CORE stream cameras, whose
+    readers decode continuously, leaving at least one core per detection worker. The
+    rest is split into disjoint sets, one per detection worker, each running as many
+    inference threads as it has cores. With fewer cores nothing is pinned and the
+    detection workers share all but one core. The light roles run single-threaded
+    OpenCV either way.
+
+    `threads` and `affinity` override the defaults per role (see ROLES); a detection
+    affinity is split between the detection workers.
+    """
+    cpus = list(cpus if cpus is not None else available_cpus())
+    workers = max(1, detection_workers)
+    threads = {role: count for role, count in (threads or {}).items() if count and count > 0}
+    affinity = {role: cpus_ for role, cpus_ in (affinity or {}).items() if cpus_}
+
+    if len(cpus) >= workers + 2:
+        decode_cores = -(-max(0, stream_cameras) // STREAMS_PER_CORE)
+        io_count = min(max(1, len(cpus) // 8) + decode_cores, len(cpus) - workers)
+        io_cpus: Optional[Tuple[int, ...]] = tuple(cpus[:io_count])
+        detection_cpus: List[Optional[Tuple[int, ...]]] = list(_split(cpus[len(io_cpus) :], workers))
+    else:
+        io_cpus = None
+        detection_cpus = [None] * workers
+    if "detection" in affinity:
+        chosen = affinity["detection"]
+        # Fewer CPUs than workers: they all share the set rather than some getting none.
+        detection_cpus = list(_split(chosen, workers)) if len(chosen) >= workers else [chosen] * workers
+    default_detection_threads = max(1, (len(cpus) - 1) // workers)
+
+    def light(role: str) -> CpuBudget:
+        return CpuBudget(threads=threads.get(role, 1), cpus=affinity.get(role, io_cpus))
+
+    budgets = {"ingestion": light("ingestion")}
+    for idx, worker_cpus in enumerate(detection_cpus):
+        budgets[f"detection-{idx}"] = CpuBudget(
+            threads=threads.get("detection", len(worker_cpus) if worker_cpus else default_detection_threads),
+            cpus=worker_cpus,
+        )
+    budgets["event_writer"] = light("writer")
+    budgets["notifier"] = light("notifier")
+    return budgets
+
+
+def apply_cpu_budget(budget: Optional[CpuBudget]) -> None:
+    """
+    Called first thing in a worker's run(), in the child process: pins every thread the
+    process already has (pool threads started at import included; threads started later
+    inherit the mask) and caps OpenCV, torch and OpenMP/BLAS thread pools. Runtimes that
+    take an explicit thread count (ONNX Runtime, OpenVINO) get budget.threads from the
+    detector as well.
+    """
+    if budget is None:
+        return
+    if budget.cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            tids = [int(tid) for tid in os.listdir("/proc/self/task")]
+        except OSError:
+            tids = [0]
+        for tid in tids:
+            try:
+                os.sched_setaffinity(tid, budget.cpus)
+            except OSError as exc:
+                logger.warning(
+                    "Could not set CPU affinity",
+                    extra={"extra_payload": {"cpus": list(budget.cpus), "error": str(exc)}},
+                )
+                break
+    if budget.threads > 0:
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(budget.threads)
+        cv2.setNumThreads(budget.threads)
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            torch.set_num_threads(budget.threads)
@@ -0,0 +1,86 @@
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..image_ops import decode_image
+
+HASH_SIZE = 16  # dHash grid; 16x16 gradient bits per frame
+
+
+@dataclass
+class DedupStats:
+    camera: str
+    frames: int = 0
+    exact_dropped: int = 0
+    near_dropped: int = 0
+
+
+def perceptual_hash(image: np.ndarray, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """
+    Difference hash: sign of the horizontal gradient on a (hash_size+1) x hash_size
+    thumbnail, packed into bytes. Large frames are subsampled first so the resize stays cheap.
+    """
+    step = max(1, image.shape[1] // (16 * (hash_size + 1)))
+    if step > 1:
+        image = np.ascontiguousarray(image[::step, ::step])
+    thumb = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if thumb.ndim == 3:
+        thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+    return np.packbits(thumb[:, 1:] > thumb[:, :-1])
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> int:
+    return int(np.unpackbits(np.bitwise_xor(a, b)).sum())
+
+
+class FrameDeduplicator:
+    """
+    Drops frames that repeat the last frame forwarded for the same camera: byte-identical
+    frames by content hash (no decode needed), and, when hamming_threshold >= 0,
+    near-identical ones by perceptual hash within that many bits. The perceptual check
+    is off by default: the 16x16 hash barely changes when a small object moves across a
+    static scene, so it would drop frames with real motion before the motion gate sees
+    them. When it is on, at most max_near_drops frames in a row are dropped as near, so
+    a slow approach still reaches detection every few frames.
+    """
+
+    def __init__(self, hamming_threshold: int = -1, max_near_drops: int = 4) -> None:
+        self.hamming_threshold = hamming_threshold
+        self.max_near_drops = max(0, max_near_drops)
+        self._last: Dict[str, Tuple[int, Optional[np.ndarray]]] = {}
+        self._near_run: Dict[str, int] = {}
+        self._stats: Dict[str, DedupStats] = {}
+
+    def check(self, camera: str, data, shape: Optional[Tuple[int, int, int]] = None) -> Optional[str]:
+        """
+        Return "exact" or "near" if the frame duplicates the previous one for camera,
+        otherwise None (and remember it). data is raw BGR when shape is given, else encoded bytes.
+        """
+        stats = self._stats.setdefault(camera, DedupStats(camera=camera))
+        stats.frames += 1
+        digest = zlib.crc32(memoryview(data).cast("B"))
+        previous = self._last.get(camera)
+        if previous is not None and previous[0] == digest:
+            stats.exact_dropped += 1
+            return "exact"
+
+        phash = None
+        if self.hamming_threshold >= 0:
+            image = data if shape is not None else decode_image(data, reduction=8, grayscale=True)
+            if image is not None:
+                phash = perceptual_hash(image)
+        if phash is not None and previous is not None and previous[1] is not None:
+            run = self._near_run.get(camera, 0)
+            if run < self.max_near_drops and hamming(phash, previous[1]) <= self.hamming_threshold:
+                self._near_run[camera] = run + 1
+                stats.near_dropped += 1
+                return "near"
+        self._near_run[camera] = 0
+        self._last[camera] = (digest, phash)
+        return None
+
+    def stats(self) -> Dict[str, DedupStats]:
+        return {name: DedupStats(**vars(stats)) for name, stats in self._stats.items()}
@@ -1,172 +1,491 @@
 import logging
 import os
 import time
+from dataclasses import asdict, dataclass, replace
 from multiprocessing import Event, Process, Queue
+from queue import Empty
+from typing import Optional
 
+import numpy as np
+
+from ..detector.masks import CameraMask
 from ..detector.movement_detector import MovementDetector
+from ..detector.roi import motion_overlap, plan_regions
+from ..detector.tracker import Tracker
 from ..detector.yolo_detector import CocoYoloDetector
-from ..dto import PersonDetections, PoisonPill, VehicleDetections
+from ..dto import FrameDetections, FrameJob, PoisonPill, utc_epoch
 from ..image_ops import decode_image
 from ..logging_utils import configure_logging
+from .batching import BatchStatsRecorder
+from .cpu import CpuBudget, apply_cpu_budget
+from .feedback import MotionFeedback
+from .frame_pool import FramePool
+from .frame_queue import CameraFrameQueue
+from .metrics import MetricsShard
+from .sharding import FrameRouter
 
 logger = logging.getLogger("processor.detection")
 
 
+@dataclass
+class _GatedFrame:
+    """A motion-positive frame waiting for its YOLO batch; it keeps its frame-pool reference until then."""
+
+    job: FrameJob
+    image: np.ndarray
+    motion_boxes: list[tuple[int, int, int, int]]
+    gated_at: float
+
+
+@dataclass
+class _SkipState:
+    """Per-camera YOLO cadence when tracks are stable: run every `interval` motion frames."""
+
+    since_yolo: int = 0
+    interval: int = 1
+
+
 class DetectionWorker(Process):
     def __init__(
         self,
-        frame_queue: Queue,
-        person_queue: Queue,
-        vehicle_queue: Queue,
+        frame_queue: CameraFrameQueue,
+        detections_queue: Queue,
         stop_event: Event,
+        frame_pool: FramePool,
         motion_history: int,
         motion_kernel_size: int,
         motion_min_area: int,
         motion_debug_dir: str,
         motion_max_foreground_ratio: float,
+        motion_feedback: Optional[MotionFeedback] = None,
+        motion_max_width: int = 0,
+        motion_static_ratio: float = 0.0,
+        motion_decode_reduction: int = 1,
+        router: Optional[FrameRouter] = None,
+        worker_index: int = 0,
+        batch_size: int = 1,
+        batch_wait_ms: float = 0.0,
+        stats_interval: float = 30.0,
+        detector_backend: Optional[str] = None,
+        detector_imgsz: Optional[int] = None,
+        roi_enabled: bool = False,
+        roi_padding: float = 0.25,
+        roi_min_size: int = 256,
+        roi_max_coverage: float = 0.4,
+        tracking_enabled: bool = False,
+        track_iou_threshold: float = 0.3,
+        track_max_age: float = 10.0,
+        track_min_hits: int = 1,
+        track_keyframe_seconds: float = 30.0,
+        track_best_margin: float = 0.1,
+        skip_enabled: bool = False,
+        skip_max_interval: int = 8,
+        skip_min_coverage: float = 0.5,
+        startup_budget_seconds: float = 0.0,
+        camera_masks: Optional[dict[str, CameraMask]] = None,
+        screen_model_path: Optional[str] = None,
+        screen_low: Optional[float] = None,
+        screen_high: Optional[float] = None,
+        cpu_budget: Optional[CpuBudget] = None,
+        metrics: Optional[MetricsShard] = None,
     ):
         super().__init__(daemon=True)
         self.frame_queue = frame_queue
-        self.person_queue = person_queue
-        self.vehicle_queue = vehicle_queue
+        self.detections_queue = detections_queue
         self.stop_event = stop_event
-        self.yolo = CocoYoloDetector()
+        self.frame_pool = frame_pool
+        # The model is loaded in run(), in the child: building it here would load it in the
+        # supervisor and pickle it across the spawn on every (re)start.
+        self.detector_backend = detector_backend
+        self.detector_imgsz = detector_imgsz
+        self.screen_model_path = screen_model_path
+        self.screen_low = screen_low
+        self.screen_high = screen_high
+        self.cpu_budget = cpu_budget
+        self.metrics = metrics or MetricsShard()
+        self.yolo: Optional[CocoYoloDetector] = None
+        self.startup_budget_seconds = startup_budget_seconds
+        self._created_at = time.time()
         self.motion_history = motion_history
         self.motion_kernel_size = motion_kernel_size
         self.motion_min_area = motion_min_area
         self.motion_debug_dir = motion_debug_dir
         self.motion_max_foreground_ratio = motion_max_foreground_ratio
+        self.motion_feedback = motion_feedback
+        self.motion_max_width = motion_max_width
+        self.motion_static_ratio = motion_static_ratio
+        self.motion_decode_reduction = motion_decode_reduction
+        self.router = router
+        self.worker_index = worker_index
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000.0
+        self.stats_interval = stats_interval
+        self.roi_enabled = roi_enabled
+        self.roi_padding = max(0.0, roi_padding)
+        self.roi_min_size = max(0, roi_min_size)
+        self.roi_max_coverage = roi_max_coverage
+        self._roi_counts = {"roi_frames": 0, "full_frames": 0, "regions": 0, "frame_pixels": 0, "region_pixels": 0}
+        self.tracking_enabled = tracking_enabled
+        self.track_iou_threshold = track_iou_threshold
+        self.track_max_age = track_max_age
+        self.track_min_hits = track_min_hits
+        self.track_keyframe_seconds = track_keyframe_seconds
+        self.track_best_margin = track_best_margin
+        self.cam_trackers: dict[tuple[str, str], Tracker] = {}
+        self._track_counts = {"detections": 0, "sent": 0, "yolo_skipped": 0}
+        self.skip_enabled = skip_enabled and tracking_enabled
+        self.skip_max_interval = max(1, skip_max_interval)
+        self.skip_min_coverage = skip_min_coverage
+        self.cam_skip: dict[str, _SkipState] = {}
+        self._batch_stats = BatchStatsRecorder()
+        self._last_stats = time.monotonic()
         self.cam_buffers: dict[str, MovementDetector] = {}
         self.cam_buffers_init: dict[str, bool] = {}
         self._last_queue_warn = 0.0
         self._queue_warn_interval = 5.0  # seconds
         self.motion_overlap_threshold = 0.1  # motion must cover at least 10% of a YOLO box
+        self.camera_masks = camera_masks or {}
 
 
     def run(self) -> None:
         configure_logging(os.getenv("LOG_LEVEL"))
-        logger.info("Detection worker started")
-        while not self.stop_event.is_set():
-            job = self.frame_queue.get()
-            if isinstance(job, PoisonPill):
-                self._fanout_poison()
-                break
-            self._maybe_warn_queue_backpressure(job.camera)
-            motion_boxes = []
-            try:
-                image = decode_image(job.image_bytes)
-
-                # Run motion detection first
-                if job.camera in self.cam_buffers:
-                    
-                    motion_detector = self.cam_buffers[job.camera]
-                    motion_boxes = motion_detector.detect(image)
-                    
-                    # If no motion detected, skip this frame
-                    if not motion_boxes:
-                        logger.debug(
-                            "Skipped frame due to no motion",
-                            extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id)}},
-                        )
-                        continue
-                else: # First frame, initialize only and run motion detection next time
-                    debug_dir = self.motion_debug_dir if logger.isEnabledFor(logging.DEBUG) else None
-                    motion_detector = MovementDetector(
-                        history=self.motion_history,
-                        kernel_size=self.motion_kernel_size,
-                        min_area=self.motion_min_area,
-                        debug_dir=debug_dir,
-                        camera=job.camera,
-                        max_foreground_ratio=self.motion_max_foreground_ratio,
-                    )
-                    self.cam_buffers[job.camera] = motion_detector
-                    
-                # Now run YOLO detection
-                predictions = self.yolo.predict(image)
-            
-            except Exception:
-                logger.exception(
-                    "Detection failed",
-                    extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id)}},
-                )
-                predictions = None
-                image = None
-                continue
+        apply_cpu_budget(self.cpu_budget)
+        logger.info("Detection worker started", extra={"extra_payload": {"worker": self.worker_index}})
+        self._log_startup(self._load_detector())
+        if self.router is not None:
+            self.router.mark(self.worker_index, True)
+        # Motion-positive frames, possibly from several cameras, collect here until the batch
+        # is full or the oldest one has waited batch_wait; then they share one YOLO call.
+        pending: list[_GatedFrame] = []
+        deadline = 0.0
+        try:
+            while not self.stop_event.is_set():
+                timeout = max(0.0, deadline - time.monotonic()) if pending else None
+                try:
+                    job = self.frame_queue.get(timeout=timeout)
+                except Empty:
+                    job = None
+                if isinstance(job, PoisonPill):
+                    break
+                if job is not None:
+                    self.frame_pool.adopt(job.frame)
+                    gated = self._gate_job(job)
+                    if gated is not None:
+                        if not pending:
+                            deadline = gated.gated_at + self.batch_wait
+                        pending.append(gated)
+                if pending and (len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                    batch, pending = pending, []
+                    self._infer_batch(batch)
+                self._maybe_log_batch_stats()
+            if pending:
+                self._infer_batch(pending)
+        finally:
+            if self.router is not None:
+                self.router.mark(self.worker_index, False)
+        # Exactly one pill per worker: writers count them to know when every producer is done.
+        self._fanout_poison()
 
-            persons_raw = predictions.get("persons") if predictions else []
-            vehicles_raw = predictions.get("vehicles") if predictions else []
+    def _load_detector(self) -> dict[str, float]:
+        """Load the model and run one warm-up inference; returns the time each step took."""
+        timings = {"spawn_seconds": time.time() - self._created_at}
+        started = time.monotonic()
+        self.yolo = CocoYoloDetector(
+            backend=self.detector_backend,
+            imgsz=self.detector_imgsz,
+            screen_model_path=self.screen_model_path,
+            screen_low=self.screen_low,
+            screen_high=self.screen_high,
+            threads=self.cpu_budget.threads if self.cpu_budget is not None else 0,
+        )
+        loaded = time.monotonic()
+        timings["model_load_seconds"] = loaded - started
+        # First inference pays for lazy allocations and kernel selection; do it before frames arrive.
+        self.yolo.warmup()
+        timings["warmup_seconds"] = time.monotonic() - loaded
+        timings["startup_seconds"] = time.time() - self._created_at
+        return timings
 
-            persons = self._filter_by_motion_overlap(persons_raw, motion_boxes)
-            vehicles = self._filter_by_motion_overlap(vehicles_raw, motion_boxes)
+    def _log_startup(self, timings: dict[str, float]) -> None:
+        payload = {
+            "worker": self.worker_index,
+            "backend": self.yolo.backend_name if self.yolo is not None else None,
+            **{key: round(value, 3) for key, value in timings.items()},
+        }
+        if 0 < self.startup_budget_seconds < timings["startup_seconds"]:
+            logger.warning(
+                "Detection worker startup exceeded budget",
+                extra={"extra_payload": {**payload, "budget_seconds": self.startup_budget_seconds}},
+            )
+        else:
+            logger.info("Detection worker ready", extra={"extra_payload": payload})
 
-            if persons:
-                self._safe_put(
-                    self.person_queue,
-                    PersonDetections(
-                        frame_id=job.frame_id,
-                        camera=job.camera,
-                        captured_at=job.captured_at,
-                        frame_bytes=job.image_bytes,
-                        persons=persons,
-                    ),
-                )
+    def _gate_job(self, job: FrameJob) -> Optional[_GatedFrame]:
+        """Run the motion gate; frames that do not pass are released here."""
+        self._maybe_warn_queue_backpressure(job.camera)
+        try:
+            # Run motion detection first, on a reduced image where possible
+            motion_detector = self._motion_detector_for(job.camera)
+            motion_image, motion_scale, image = self._motion_input(job)
+            motion_boxes = motion_detector.detect(motion_image, input_scale=motion_scale)
+            motion_done = time.time()
+
+            # If no motion detected (or still warming up), skip this frame
+            if not motion_boxes:
                 logger.debug(
-                    "Enqueued person detections",
-                    extra={
-                        "extra_payload": {
-                            "camera": job.camera,
-                            "frame_id": str(job.frame_id),
-                            "count": len(persons),
-                        }
-                    },
-                )
-            if vehicles:
-                self._safe_put(
-                    self.vehicle_queue,
-                    VehicleDetections(
-                        frame_id=job.frame_id,
-                        camera=job.camera,
-                        captured_at=job.captured_at,
-                        frame_bytes=job.image_bytes,
-                        vehicles=vehicles,
-                    ),
+                    "Skipped frame due to no motion",
+                    extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id)}},
                 )
-                logger.debug(
-                    "Enqueued vehicle detections",
+                self.frame_pool.release(job.frame)
+                self.metrics.inc("camtelligence_frames_motion_skipped_total")
+                return None
+            if self.motion_feedback is not None:
+                self.motion_feedback.report_motion(job.camera)
+            if self.skip_enabled and self._propagate_tracks(job, motion_boxes):
+                self.frame_pool.release(job.frame)
+                self.metrics.inc("camtelligence_frames_track_skipped_total")
+                return None
+
+            # YOLO runs on the full-resolution frame
+            if image is None:
+                image = self.frame_pool.image(job.frame)
+        except Exception:
+            logger.exception(
+                "Detection failed",
+                extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id)}},
+            )
+            self.frame_pool.release(job.frame)
+            return None
+        job = replace(job, trace=job.trace.mark("motion", motion_done))
+        return _GatedFrame(job=job, image=image, motion_boxes=motion_boxes, gated_at=time.monotonic())
+
+    def _infer_batch(self, batch: list[_GatedFrame]) -> None:
+        started = time.monotonic()
+        try:
+            try:
+                regions = [self._regions_for(item) for item in batch] if self.roi_enabled else None
+                predictions = self.yolo.predict_batch([item.image for item in batch], regions)
+            except Exception:
+                logger.exception(
+                    "Detection failed",
                     extra={
                         "extra_payload": {
-                            "camera": job.camera,
-                            "frame_id": str(job.frame_id),
-                            "count": len(vehicles),
+                            "batch_size": len(batch),
+                            "frames": [{"camera": item.job.camera, "frame_id": str(item.job.frame_id)} for item in batch],
                         }
                     },
                 )
-        self._fanout_poison()
+                return
+            finished = time.monotonic()
+            inferred_at = time.time()
+            self._batch_stats.record(finished - started, [finished - item.gated_at for item in batch])
+            self.metrics.observe("camtelligence_yolo_batch_seconds", finished - started)
+            self.metrics.inc("camtelligence_frames_inferred_total", len(batch))
+            for item, frame_predictions in zip(batch, predictions):
+                job = replace(item.job, trace=item.job.trace.mark("inferred", inferred_at))
+                self._dispatch(job, frame_predictions, item.motion_boxes, item.image.shape)
+        finally:
+            # Outbound messages retained their own references; drop the one ingestion handed us.
+            for item in batch:
+                self.frame_pool.release(item.job.frame)
+
+    def _regions_for(self, item: _GatedFrame) -> Optional[list[tuple[int, int, int, int]]]:
+        """Motion regions to run YOLO on, or None for the full frame (see plan_regions)."""
+        regions = plan_regions(
+            item.motion_boxes,
+            item.image.shape,
+            padding=self.roi_padding,
+            min_size=self.roi_min_size,
+            max_coverage=self.roi_max_coverage,
+        )
+        height, width = item.image.shape[:2]
+        counts = self._roi_counts
+        counts["frame_pixels"] += width * height
+        if regions is None:
+            counts["full_frames"] += 1
+            counts["region_pixels"] += width * height
+        else:
+            counts["roi_frames"] += 1
+            counts["regions"] += len(regions)
+            counts["region_pixels"] += sum(w * h for _, _, w, h in regions)
+        return regions
+
+    def _dispatch(
+        self,
+        job: FrameJob,
+        predictions: dict,
+        motion_boxes: list[tuple[int, int, int, int]],
+        frame_shape: tuple[int, ...],
+    ) -> None:
+        persons_raw = self._apply_mask(job.camera, predictions.get("persons") if predictions else [], frame_shape)
+        vehicles_raw = self._apply_mask(job.camera, predictions.get("vehicles") if predictions else [], frame_shape)
+
+        if self.tracking_enabled:
+            persons = self._track(job, "persons", persons_raw, motion_boxes)
+            vehicles = self._track(job, "vehicles", vehicles_raw, motion_boxes)
+            if self.skip_enabled:
+                self._update_skip_interval(job.camera)
+        else:
+            persons = self._filter_by_motion_overlap(persons_raw, motion_boxes)
+            vehicles = self._filter_by_motion_overlap(vehicles_raw, motion_boxes)
+
+        if persons or vehicles:
+            self._send_detections(
+                self.detections_queue,
+                FrameDetections(
+                    frame_id=job.frame_id,
+                    camera=job.camera,
+                    captured_at=job.captured_at,
+                    frame=job.frame,
+                    persons=persons,
+                    vehicles=vehicles,
+                    trace=job.trace,
+                ),
+            )
+            logger.debug(
+                "Enqueued frame detections",
+                extra={
+                    "extra_payload": {
+                        "camera": job.camera,
+                        "frame_id": str(job.frame_id),
+                        "persons": len(persons),
+                        "vehicles": len(vehicles),
+                    }
+                },
+            )
+
+    def _apply_mask(self, camera: str, detections, frame_shape: tuple[int, ...]):
+        """Drop detections standing in a masked-out area of the camera (see CameraMask.allows)."""
+        mask = self.camera_masks.get(camera)
+        if mask is None or not detections:
+            return detections
+        allowed = mask.allows([det.bbox for det in detections], frame_shape).tolist()
+        return [det for det, ok in zip(detections, allowed) if ok]
+
+    def _track(self, job: FrameJob, kind: str, detections, motion_boxes: list[tuple[int, int, int, int]]):
+        """
+        Feed every detection of this kind to the camera's tracker, so objects that sit still
+        keep their track, and return the ones worth sending: motion must overlap them and
+        the tracker must want them (track start, keyframe or a better-scoring crop).
+        """
+        tracker = self.cam_trackers.get((job.camera, kind))
+        if tracker is None:
+            if not detections:
+                return []
+            tracker = Tracker(
+                iou_threshold=self.track_iou_threshold,
+                max_age=self.track_max_age,
+                min_hits=self.track_min_hits,
+                keyframe_seconds=self.track_keyframe_seconds,
+                best_margin=self.track_best_margin,
+            )
+            self.cam_trackers[(job.camera, kind)] = tracker
+        bboxes = [det.bbox for det in detections]
+        moving = motion_overlap(bboxes, motion_boxes, self.motion_overlap_threshold).tolist()
+        decisions = tracker.update(bboxes, [det.score for det in detections], utc_epoch(job.captured_at), moving)
+        selected = [
+            replace(det, track_id=track_id, track_event=event)
+            for det, (track_id, event) in zip(detections, decisions)
+            if event is not None
+        ]
+        self._track_counts["detections"] += sum(moving)
+        self._track_counts["sent"] += len(selected)
+        return selected
+
+    def _propagate_tracks(self, job: FrameJob, motion_boxes: list[tuple[int, int, int, int]]) -> bool:
+        """
+        Decide whether this motion frame can skip YOLO. It can while the camera is within
+        its current interval since the last YOLO run and every motion box lies mostly
+        inside a predicted track (nothing new has appeared); the tracks are then moved
+        along with the motion boxes instead. Unexplained motion resets the interval.
+        """
+        state = self.cam_skip.setdefault(job.camera, _SkipState())
+        trackers = [
+            tracker
+            for kind in ("persons", "vehicles")
+            if (tracker := self.cam_trackers.get((job.camera, kind))) is not None and tracker.tracks
+        ]
+        if not trackers or state.since_yolo + 1 >= state.interval:
+            return False
+        timestamp = utc_epoch(job.captured_at)
+        coverage = np.max([tracker.coverage(motion_boxes, timestamp) for tracker in trackers], axis=0)
+        if (coverage < self.skip_min_coverage).any():
+            state.interval = 1
+            return False
+        for tracker in trackers:
+            tracker.propagate(motion_boxes, timestamp)
+        state.since_yolo += 1
+        self._track_counts["yolo_skipped"] += 1
+        return True
+
+    def _update_skip_interval(self, camera: str) -> None:
+        """After a YOLO run: widen the interval while every track is re-confirmed, else go back to every frame."""
+        state = self.cam_skip.setdefault(camera, _SkipState())
+        trackers = [tracker for kind in ("persons", "vehicles") if (tracker := self.cam_trackers.get((camera, kind)))]
+        stable = bool(trackers) and all(tracker.stable for tracker in trackers) and any(tracker.tracks for tracker in trackers)
+        state.interval = min(self.skip_max_interval, state.interval * 2) if stable else 1
+        state.since_yolo = 0
+
+    def _motion_detector_for(self, camera: str) -> MovementDetector:
+        motion_detector = self.cam_buffers.get(camera)
+        if motion_detector is None:
+            debug_dir = self.motion_debug_dir if logger.isEnabledFor(logging.DEBUG) else None
+            motion_detector = MovementDetector(
+                history=self.motion_history,
+                kernel_size=self.motion_kernel_size,
+                min_area=self.motion_min_area,
+                debug_dir=debug_dir,
+                camera=camera,
+                max_foreground_ratio=self.motion_max_foreground_ratio,
+                max_width=self.motion_max_width,
+                static_ratio=self.motion_static_ratio,
+                mask=self.camera_masks.get(camera),
+            )
+            self.cam_buffers[camera] = motion_detector
+        return motion_detector
+
+    def _motion_input(self, job: FrameJob) -> tuple[np.ndarray, float, Optional[np.ndarray]]:
+        """
+        Image for motion detection, its frame-to-image scale, and the full frame if it
+        was already materialised. Encoded frames are decoded straight to reduced
+        grayscale so static frames never pay for a full decode.
+        """
+        if job.frame.is_raw or self.motion_decode_reduction not in (2, 4, 8):
+            image = self.frame_pool.image(job.frame)
+            return image, 1.0, image
+        reduced = decode_image(self.frame_pool.view(job.frame), reduction=self.motion_decode_reduction, grayscale=True)
+        return reduced, float(self.motion_decode_reduction), None
 
     def _fanout_poison(self) -> None:
         try:
-            self.person_queue.put_nowait(PoisonPill())
-            self.vehicle_queue.put_nowait(PoisonPill())
+            self.detections_queue.put_nowait(PoisonPill())
         except Exception:
             pass
 
-    def _safe_put(self, queue: Queue, item) -> None:
+    def _send_detections(self, queue: Queue, item) -> None:
+        # The writer owns one reference to the shared frame and releases it when done.
+        self.frame_pool.retain(item.frame)
+        if self._safe_put(queue, item):
+            self.frame_pool.disown(item.frame)
+        else:
+            self.frame_pool.release(item.frame)
+
+    def _safe_put(self, queue: Queue, item) -> bool:
         while not self.stop_event.is_set():
             try:
                 queue.put(item, timeout=0.5)
-                return
+                return True
             except Exception:
                 continue
+        return False
 
     def _filter_by_motion_overlap(self, detections, motion_boxes: list[tuple[int, int, int, int]]):
         """Keep YOLO detections only if motion overlaps >= threshold of their area."""
         if not detections or not motion_boxes:
             return []
-        filtered = []
-        for det in detections:
-            if self._has_motion_overlap(det.bbox, motion_boxes):
-                filtered.append(det)
-        if detections and filtered != detections:
+        keep = motion_overlap([det.bbox for det in detections], motion_boxes, self.motion_overlap_threshold)
+        filtered = [det for det, kept in zip(detections, keep.tolist()) if kept]
+        if len(filtered) != len(detections):
             logger.debug(
                 "Filtered detections by motion overlap",
                 extra={
@@ -179,30 +498,45 @@ class DetectionWorker(Process):
             )
         return filtered
 
-    def _has_motion_overlap(self, bbox: tuple[int, int, int, int], motion_boxes: list[tuple[int, int, int, int]]) -> bool:
-        x1, y1, w, h = bbox
-        if w <= 0 or h <= 0:
-            return False
-        x2 = x1 + w
-        y2 = y1 + h
-        det_area = float(w * h)
-        threshold_area = det_area * self.motion_overlap_threshold
-
-        for mx, my, mw, mh in motion_boxes:
-            if mw <= 0 or mh <= 0:
-                continue
-            mx2 = mx + mw
-            my2 = my + mh
-
-            inter_w = min(x2, mx2) - max(x1, mx)
-            inter_h = min(y2, my2) - max(y1, my)
-            if inter_w <= 0 or inter_h <= 0:
-                continue
-
-            inter_area = inter_w * inter_h
-            if inter_area >= threshold_area:
-                return True
-        return False
+    def _maybe_log_batch_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._last_stats < self.stats_interval:
+            return
+        self._last_stats = now
+        for stats in self._batch_stats.snapshot():
+            logger.info("Detection batch stats", extra={"extra_payload": {"worker": self.worker_index, **stats.summary()}})
+        for queue_stats in self.frame_queue.stats():
+            logger.info("Frame queue stats", extra={"extra_payload": {"worker": self.worker_index, **asdict(queue_stats)}})
+        if self.yolo is not None and self.yolo.screen_backend is not None and self.yolo.cascade_stats.frames:
+            logger.info(
+                "Detection cascade stats",
+                extra={"extra_payload": {"worker": self.worker_index, **self.yolo.cascade_stats.summary()}},
+            )
+        if self.tracking_enabled and self._track_counts["detections"]:
+            logger.info(
+                "Tracking stats",
+                extra={
+                    "extra_payload": {
+                        "worker": self.worker_index,
+                        **self._track_counts,
+                        "active_tracks": sum(len(tracker.tracks) for tracker in self.cam_trackers.values()),
+                    }
+                },
+            )
+        counts = self._roi_counts
+        if self.roi_enabled and counts["frame_pixels"]:
+            logger.info(
+                "Detection ROI stats",
+                extra={
+                    "extra_payload": {
+                        "worker": self.worker_index,
+                        "roi_frames": counts["roi_frames"],
+                        "full_frames": counts["full_frames"],
+                        "regions": counts["regions"],
+                        "inferred_pixel_ratio": round(counts["region_pixels"] / counts["frame_pixels"], 3),
+                    }
+                },
+            )
 
     def _maybe_warn_queue_backpressure(self, camera: str) -> None:
         """Warn if the frame queue is filling faster than we process."""
@@ -213,7 +547,7 @@ class DetectionWorker(Process):
             qsize = self.frame_queue.qsize()
         except Exception:
             return
-        maxsize = getattr(self.frame_queue, "_maxsize", 0) or 0
+        maxsize = getattr(self.frame_queue, "capacity", 0) or 0
         if maxsize > 0:
             threshold = max(1, int(maxsize * 0.7))
         else:
@@ -1,9 +1,13 @@
 import logging
 import os
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
 from uuid import UUID
 from datetime import datetime
 from multiprocessing import Event, Process, Queue
-from typing import Optional
+from typing import List, Optional, Sequence
 
 from sqlalchemy.exc import IntegrityError
 from psycopg2 import DatabaseError
@@ -11,11 +15,17 @@ from psycopg2 import DatabaseError
 from ct_core import engine, get_session
 from ct_core.models import EventType, JobRecord, JobStatus, MediaAsset, MediaType, Notification, NotificationStatus, PersonEvent, VehicleEvent
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 
-from ..dto import NotificationJob, PersonDetections, PoisonPill, VehicleDetections
+from ..detector.tracker import TRACK_BEST, TRACK_START
+from ..dto import Detection, FrameDetections, FrameRef, LatencyTrace, NotificationJob, PoisonPill
+from ..image_ops import crop, encode_jpeg
 from ..storage.media_store import FileSystemMediaStore
 from ..logging_utils import configure_logging
+from .cpu import CpuBudget, apply_cpu_budget
+from .frame_pool import FramePool
+from .latency import LatencyRecorder, is_sampled, trace_payload
+from .metrics import MetricsShard
 
 logger = logging.getLogger("processor.events")
 
@@ -52,181 +62,299 @@ def get_or_create_frame_asset(
         raise
 
 
-class PersonEventWriter(Process):
-    def __init__(self, queue: Queue, notification_queue: Queue, stop_event: Event, media_root: str):
-        super().__init__(daemon=True)
-        self.queue = queue
-        self.notification_queue = notification_queue
-        self.stop_event = stop_event
-        self.media_root = media_root
-        self.media_store = FileSystemMediaStore(media_root)
+def encode_crops(frame_pool: FramePool, frame: FrameRef, detections: Sequence[Detection]) -> List[bytes]:
+    """
+    JPEG crop of each detection. Detection leaves crops to the writers so only events that
+    are actually stored pay for encoding; the shared frame is decoded at most once.
+    """
+    image = None
+    crops = []
+    for detection in detections:
+        if detection.crop_bytes is None:
+            if image is None:
+                image = frame_pool.image(frame)
+            crops.append(encode_jpeg(crop(image, detection.bbox)))
+        else:
+            crops.append(detection.crop_bytes)
+    return crops
 
-    def run(self) -> None:
-        configure_logging(os.getenv("LOG_LEVEL"))
-        try:
-            engine.dispose()
-        except Exception:
-            pass
-        while not self.stop_event.is_set():
-            job = self.queue.get()
-            if isinstance(job, PoisonPill):
-                self._send_poison()
-                break
-            self._handle_job(job)
-        self._send_poison()
 
-    def _handle_job(self, job: PersonDetections) -> None:
-        if not job.persons:
-            return
-        logger.debug(
-            "Processing person detections",
-            extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "count": len(job.persons)}},
-        )
-        with get_session() as session:
-            try:
-                notification_jobs = []
-                with session.begin():
-                    frame_asset = get_or_create_frame_asset(
-                        session, self.media_store, job.frame_id, job.frame_bytes, job.camera, tag="_person"
-                    )
-                    for detection in job.persons:
-                        crop_path = self.media_store.save_person_crop(job.frame_id, detection.crop_bytes)
-                        crop_asset = MediaAsset(media_type=MediaType.person_crop, path=crop_path, attributes={"camera": job.camera})
-                        session.add(crop_asset)
-                        session.flush()
-
-                        person_event = PersonEvent(
-                            camera=job.camera,
-                            occurred_at=job.captured_at,
-                            frame_asset_id=frame_asset.id,
-                            crop_asset_id=crop_asset.id,
-                            score=int(detection.score) if detection.score else None,
-                        )
-                        session.add(person_event)
-                        session.add(
-                            JobRecord(
-                                job_type="person_event",
-                                status=JobStatus.finished,
-                                payload={"frame_id": str(job.frame_id), "camera": job.camera},
-                            )
-                        )
-                        notification_jobs.append(
-                            NotificationJob(
-                                event_type="person",
-                                camera=job.camera,
-                                occurred_at=job.captured_at,
-                                crop_path=crop_path,
-                                event_id=person_event.id,
-                            )
-                        )
-                for note in notification_jobs:
-                    self._enqueue_notification(note)
-            except IntegrityError as exc:
-                session.rollback()
-                logger.warning(
-                    "Duplicate media asset detected, skipping person event",
-                    extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "error": str(exc)}})
-            except Exception as exc:
-                session.rollback()
-                logger.exception(
-                    "Unexpected error in person writer",
-                    extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "error": str(exc)}})
+def detection_attributes(camera: str, detection: Detection) -> dict:
+    attributes = {"camera": camera}
+    if detection.track_id is not None:
+        attributes["track_id"] = detection.track_id
+        attributes["track_event"] = detection.track_event
+    return attributes
 
-    def _enqueue_notification(self, job: NotificationJob) -> None:
-        try:
-            self.notification_queue.put_nowait(job)
-        except Exception:
-            logger.warning("Notification queue full, dropping", extra={"extra_payload": {"camera": job.camera}})
 
-    def _send_poison(self) -> None:
-        try:
-            self.notification_queue.put_nowait(PoisonPill())
-        except Exception:
-            pass
+# Per detection kind: crop media type, event model, JobRecord job_type and notification event_type.
+EVENT_KINDS = {
+    "persons": (MediaType.person_crop, PersonEvent, "person_event", "person"),
+    "vehicles": (MediaType.vehicle_crop, VehicleEvent, "vehicle_event", "vehicle"),
+}
+
+# Tracks whose stored event the writer remembers, to update it with better crops.
+TRACK_EVENT_CACHE = 4096
+
+
+class EventWriter(Process):
+    """
+    Stores the people and vehicles detected in a frame. The frame is JPEG-encoded and
+    written once and every event of the frame, person or vehicle, links to that one
+    frame asset; crops and events are written in the same transaction. The frame's
+    latency trace is stamped at commit and passed on to its notifications; a
+    trace_sample_rate share of the traces is stored as "latency_trace" job records.
 
+    With tracking, a track's start is stored as its event and a later "best" detection
+    replaces that event's crop, frame and score in place (no new row, no notification);
+    keyframes are stored as events of their own.
+    """
 
-class VehicleEventWriter(Process):
-    def __init__(self, queue: Queue, notification_queue: Queue, stop_event: Event, media_root: str):
+    def __init__(
+        self,
+        queue: Queue,
+        notification_queue: Queue,
+        stop_event: Event,
+        frame_pool: FramePool,
+        media_root: str,
+        producers: int = 1,
+        cpu_budget: Optional[CpuBudget] = None,
+        metrics: Optional[MetricsShard] = None,
+        trace_sample_rate: float = 0.0,
+        stats_interval: float = 30.0,
+    ):
         super().__init__(daemon=True)
         self.queue = queue
         self.notification_queue = notification_queue
         self.stop_event = stop_event
+        self.frame_pool = frame_pool
         self.media_root = media_root
         self.media_store = FileSystemMediaStore(media_root)
+        self.producers = max(1, producers)
+        self.cpu_budget = cpu_budget
+        self.metrics = metrics or MetricsShard()
+        self.trace_sample_rate = trace_sample_rate
+        self.stats_interval = stats_interval
+        self.latency = LatencyRecorder()
+        self._last_stats = time.monotonic()
+        self._track_events: "OrderedDict[str, UUID]" = OrderedDict()
+        self._stale_media: List[str] = []
 
     def run(self) -> None:
         configure_logging(os.getenv("LOG_LEVEL"))
+        apply_cpu_budget(self.cpu_budget)
         try:
             engine.dispose()
         except Exception:
             pass
+        pills = 0
         while not self.stop_event.is_set():
             job = self.queue.get()
             if isinstance(job, PoisonPill):
-                self._send_poison()
-                break
-            self._handle_job(job)
+                # One pill per detection worker; keep draining until all of them are done.
+                pills += 1
+                if pills >= self.producers:
+                    break
+                continue
+            self.frame_pool.adopt(job.frame)
+            try:
+                self._handle_job(job)
+            finally:
+                self.frame_pool.release(job.frame)
+            self._maybe_log_latency()
         self._send_poison()
 
-    def _handle_job(self, job: VehicleDetections) -> None:
-        if not job.vehicles:
+    def _handle_job(self, job: FrameDetections) -> None:
+        kinds = [(kind, getattr(job, kind)) for kind in EVENT_KINDS if getattr(job, kind)]
+        if not kinds:
             return
         logger.debug(
-            "Processing vehicle detections",
-            extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "count": len(job.vehicles)}},
+            "Processing frame detections",
+            extra={
+                "extra_payload": {
+                    "camera": job.camera,
+                    "frame_id": str(job.frame_id),
+                    "persons": len(job.persons),
+                    "vehicles": len(job.vehicles),
+                }
+            },
         )
+        started = time.monotonic()
         with get_session() as session:
             try:
+                # All crops in one pass, so an encoded frame is decoded once for both kinds.
+                # Inside the guard: a frame that fails to encode is logged and skipped, and
+                # run() still releases its slot.
+                crops = encode_crops(self.frame_pool, job.frame, [det for _, detections in kinds for det in detections])
+                frame_bytes = self.frame_pool.jpeg(job.frame)
                 notification_jobs = []
                 with session.begin():
-                    frame_asset = get_or_create_frame_asset(
-                        session, self.media_store, job.frame_id, job.frame_bytes, job.camera, tag="_vehicle"
-                    )
-                    for detection in job.vehicles:
-                        crop_path = self.media_store.save_vehicle_crop(job.frame_id, detection.crop_bytes)
-                        crop_asset = MediaAsset(media_type=MediaType.vehicle_crop, path=crop_path, attributes={"camera": job.camera})
-                        session.add(crop_asset)
-                        session.flush()
-
-                        vehicle_event = VehicleEvent(
-                            camera=job.camera,
-                            occurred_at=job.captured_at,
-                            frame_asset_id=frame_asset.id,
-                            crop_asset_id=crop_asset.id,
-                            score=int(detection.score) if detection.score else None,
-                        )
-                        session.add(vehicle_event)
-                        session.add(
-                            JobRecord(
-                                job_type="vehicle_event",
-                                status=JobStatus.finished,
-                                payload={"frame_id": str(job.frame_id), "camera": job.camera},
-                            )
-                        )
-                        notification_jobs.append(
-                            NotificationJob(
-                                event_type="vehicle",
-                                camera=job.camera,
-                                occurred_at=job.captured_at,
-                                crop_path=crop_path,
-                                event_id=vehicle_event.id,
-                            )
-                        )
+                    frame_asset = get_or_create_frame_asset(session, self.media_store, job.frame_id, frame_bytes, job.camera)
+                    offset = 0
+                    for kind, detections in kinds:
+                        kind_crops = crops[offset : offset + len(detections)]
+                        offset += len(detections)
+                        notification_jobs += self._store_events(session, job, kind, detections, kind_crops, frame_asset)
+                trace = job.trace.mark("committed")
+                self._remove_stale_media()
+                self.metrics.observe("camtelligence_writer_transaction_seconds", time.monotonic() - started)
+                for kind, detections in kinds:
+                    self.metrics.inc("camtelligence_events_written_total", len(detections), label=EVENT_KINDS[kind][3])
+                trace_id = self._record_latency(session, job, trace)
                 for note in notification_jobs:
-                    self._enqueue_notification(note)
+                    self._enqueue_notification(replace(note, trace=trace, trace_id=trace_id))
             except IntegrityError as exc:
                 session.rollback()
+                self._stale_media.clear()
+                self.metrics.inc("camtelligence_writer_errors_total")
                 logger.warning(
-                    "Duplicate media asset detected, skipping vehicle event",
+                    "Duplicate media asset detected, skipping frame events",
                     extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "error": str(exc)}},
                 )
             except Exception as exc:
                 session.rollback()
+                self._stale_media.clear()
+                self.metrics.inc("camtelligence_writer_errors_total")
                 logger.exception(
-                    "Unexpected error in vehicle writer",
+                    "Unexpected error in event writer",
                     extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "error": str(exc)}},
                 )
 
+    def _store_events(
+        self,
+        session,
+        job: FrameDetections,
+        kind: str,
+        detections: Sequence[Detection],
+        crops: Sequence[bytes],
+        frame_asset: MediaAsset,
+    ) -> List[NotificationJob]:
+        crop_type, event_model, job_type, event_type = EVENT_KINDS[kind]
+        notification_jobs = []
+        for detection, crop_bytes in zip(detections, crops):
+            crop_path = self.media_store.save_crop(crop_type, job.frame_id, crop_bytes)
+            crop_asset = MediaAsset(
+                media_type=crop_type,
+                path=crop_path,
+                attributes=detection_attributes(job.camera, detection),
+            )
+            session.add(crop_asset)
+            session.flush()
+
+            payload = {"frame_id": str(job.frame_id), **detection_attributes(job.camera, detection)}
+            best = self._tracked_event(session, event_model, detection) if detection.track_event == TRACK_BEST else None
+            if best is not None:
+                # The track already has its event (and its notification); give it the better crop.
+                stale = session.get(MediaAsset, best.crop_asset_id) if best.crop_asset_id else None
+                stale_frame_id = best.frame_asset_id if best.frame_asset_id != frame_asset.id else None
+                best.crop_asset_id = crop_asset.id
+                best.frame_asset_id = frame_asset.id
+                best.score = int(detection.score) if detection.score else None
+                if stale is not None:
+                    self._stale_media.append(stale.path)
+                    session.delete(stale)
+                if stale_frame_id is not None:
+                    self._drop_unreferenced_frame(session, stale_frame_id)
+                session.add(
+                    JobRecord(
+                        job_type=job_type,
+                        status=JobStatus.finished,
+                        payload={**payload, "updated_event_id": str(best.id)},
+                    )
+                )
+                continue
+
+            event = event_model(
+                camera=job.camera,
+                occurred_at=job.captured_at,
+                frame_asset_id=frame_asset.id,
+                crop_asset_id=crop_asset.id,
+                score=int(detection.score) if detection.score else None,
+            )
+            session.add(event)
+            if detection.track_id is not None and detection.track_event in (TRACK_START, TRACK_BEST):
+                session.flush()
+                self._remember_track_event(detection.track_id, event.id)
+            session.add(JobRecord(job_type=job_type, status=JobStatus.finished, payload=payload))
+            notification_jobs.append(
+                NotificationJob(
+                    event_type=event_type,
+                    camera=job.camera,
+                    occurred_at=job.captured_at,
+                    crop_path=crop_path,
+                    event_id=event.id,
+                    frame_id=job.frame_id,
+                )
+            )
+        return notification_jobs
+
+    def _tracked_event(self, session, event_model, detection: Detection):
+        """The stored event of the detection's track, if this writer still knows it."""
+        event_id = self._track_events.get(detection.track_id)
+        if event_id is None:
+            return None
+        self._track_events.move_to_end(detection.track_id)
+        return session.get(event_model, event_id)
+
+    def _remember_track_event(self, track_id: str, event_id: UUID) -> None:
+        self._track_events[track_id] = event_id
+        self._track_events.move_to_end(track_id)
+        while len(self._track_events) > TRACK_EVENT_CACHE:
+            self._track_events.popitem(last=False)
+
+    def _drop_unreferenced_frame(self, session, frame_asset_id: UUID) -> None:
+        """Delete a frame asset a track's event no longer points to, unless another event still does."""
+        session.flush()
+        for model in (PersonEvent, VehicleEvent):
+            if session.scalar(select(func.count()).select_from(model).where(model.frame_asset_id == frame_asset_id)):
+                return
+        stale = session.get(MediaAsset, frame_asset_id)
+        if stale is not None:
+            self._stale_media.append(stale.path)
+            session.delete(stale)
+
+    def _remove_stale_media(self) -> None:
+        """Delete crop and frame files replaced by better ones, once the replacement is committed."""
+        for path in self._stale_media:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning("Failed to remove replaced media", extra={"extra_payload": {"path": path, "error": str(exc)}})
+        self._stale_media.clear()
+
+    def _record_latency(self, session, job: FrameDetections, trace: LatencyTrace) -> Optional[UUID]:
+        """Record the trace up to the commit; a sampled one is also stored, and its record id returned."""
+        captured = trace.at("captured")
+        if captured is not None:
+            self.metrics.observe("camtelligence_frame_latency_seconds", trace.at("committed") - captured, label="committed")
+        self.latency.record(job.camera, trace)
+        if not is_sampled(job.frame_id, self.trace_sample_rate):
+            return None
+        try:
+            with session.begin():
+                record = JobRecord(
+                    job_type="latency_trace",
+                    status=JobStatus.finished,
+                    payload={"frame_id": str(job.frame_id), "camera": job.camera, **trace_payload(trace)},
+                )
+                session.add(record)
+                session.flush()
+                return record.id
+        except Exception as exc:
+            session.rollback()
+            logger.warning(
+                "Failed to store latency trace",
+                extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id), "error": str(exc)}},
+            )
+
+    def _maybe_log_latency(self) -> None:
+        now = time.monotonic()
+        if now - self._last_stats < self.stats_interval:
+            return
+        self._last_stats = now
+        for camera, stages in self.latency.summary().items():
+            logger.info("Latency stats", extra={"extra_payload": {"camera": camera, "through": "committed", **stages}})
+
     def _enqueue_notification(self, job: NotificationJob) -> None:
         try:
             self.notification_queue.put_nowait(job)
@@ -0,0 +1,29 @@
+import time
+from multiprocessing import Array
+from typing import Dict, Sequence
+
+
+class MotionFeedback:
+    """
+    Detection -> ingestion feedback channel: last motion time per camera in a shared
+    array. Detection writes each camera's slot; ingestion only reads, so no lock is
+    needed for a single double per camera.
+    """
+
+    def __init__(self, cameras: Sequence[str]) -> None:
+        self._index: Dict[str, int] = {name: idx for idx, name in enumerate(cameras)}
+        self._last_motion = Array("d", max(1, len(self._index)), lock=False)
+
+    def report_motion(self, camera: str, when: float | None = None) -> None:
+        idx = self._index.get(camera)
+        if idx is not None:
+            self._last_motion[idx] = time.time() if when is None else when
+
+    def seconds_since_motion(self, camera: str) -> float:
+        idx = self._index.get(camera)
+        if idx is None:
+            return float("inf")
+        last = self._last_motion[idx]
+        if last <= 0.0:
+            return float("inf")
+        return max(0.0, time.time() - last)
@@ -0,0 +1,201 @@
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import re
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("processor.file_watcher")
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(frozen=True, order=True)
+class FileCursor:
+    """
+    Position in a directory ordered by (mtime_ns, name). The name breaks ties so
+    files sharing an mtime are neither skipped nor ingested twice.
+    """
+
+    mtime_ns: int = 0
+    name: str = ""
+
+
+class CursorStore:
+    """Persists one FileCursor per camera as a small JSON file, replaced atomically."""
+
+    def __init__(self, state_dir: str) -> None:
+        self.state_dir = Path(state_dir)
+
+    def load(self, camera: str) -> FileCursor:
+        path = self._path(camera)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return FileCursor(mtime_ns=int(data["mtime_ns"]), name=str(data["name"]))
+        except FileNotFoundError:
+            return FileCursor()
+        except Exception as exc:
+            logger.warning("Ignoring unreadable ingest cursor", extra={"extra_payload": {"camera": camera, "error": str(exc)}})
+            return FileCursor()
+
+    def save(self, camera: str, cursor: FileCursor) -> None:
+        path = self._path(camera)
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"mtime_ns": cursor.mtime_ns, "name": cursor.name}), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Failed to persist ingest cursor", extra={"extra_payload": {"camera": camera, "error": str(exc)}})
+
+    def _path(self, camera: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", camera)
+        return self.state_dir / f"{safe}.cursor.json"
+
+
+class _Inotify:
+    """Minimal non-blocking inotify binding via ctypes (Linux only)."""
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(fd, os.fsencode(str(directory)), _IN_CLOSE_WRITE | _IN_MOVED_TO)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+        self.fd = fd
+
+    def read_names(self) -> Tuple[List[str], bool]:
+        """Drain pending events; returns (file names, overflowed)."""
+        names: List[str] = []
+        overflowed = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                raw_name = buf[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    overflowed = True
+                elif raw_name:
+                    names.append(os.fsdecode(raw_name))
+        return names, overflowed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    Yields only new image files for one directory. Uses inotify close-write/moved-to
+    events when available; otherwise falls back to os.scandir, remembering the mtime of
+    each name at or behind the cursor so that only new names and files overwritten in
+    place (a camera reusing a snapshot name) are keyed against the cursor again. Either
+    way the first poll catches up from the cursor.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        cursor: FileCursor,
+        use_inotify: bool = True,
+        settle_seconds: float = 1.0,
+    ) -> None:
+        self.directory = directory
+        self.cursor = cursor
+        self.settle_seconds = settle_seconds
+        self._known: Dict[str, int] = {}
+        self._needs_scan = True
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(directory)
+            except OSError as exc:
+                logger.warning(
+                    "inotify unavailable, falling back to directory scans",
+                    extra={"extra_payload": {"directory": str(directory), "error": str(exc)}},
+                )
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def poll(self) -> List[Tuple[Path, FileCursor]]:
+        """New files ordered by cursor key. Advance self.cursor only for files actually ingested."""
+        if self._inotify is not None and not self._needs_scan:
+            names, overflowed = self._inotify.read_names()
+            if not overflowed:
+                return self._keyed(names)
+            logger.warning("inotify queue overflowed, rescanning", extra={"extra_payload": {"directory": str(self.directory)}})
+        if self._inotify is not None:
+            # Drain events that the catch-up scan below already covers.
+            self._inotify.read_names()
+        self._needs_scan = self._inotify is None
+        return self._scan()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _scan(self) -> List[Tuple[Path, FileCursor]]:
+        present: Dict[str, int] = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.lower().endswith(IMAGE_SUFFIXES):
+                    continue
+                try:
+                    present[name] = entry.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+        # Forget deleted and overwritten files so the known set tracks the directory, not its history.
+        self._known = {name: mtime_ns for name, mtime_ns in self._known.items() if present.get(name) == mtime_ns}
+        found: List[Tuple[Path, FileCursor]] = []
+        for name, mtime_ns in present.items():
+            if name in self._known:
+                continue
+            key = FileCursor(mtime_ns=mtime_ns, name=name)
+            if key <= self.cursor:
+                self._known[name] = mtime_ns
+                continue
+            found.append((self.directory / name, key))
+        found.sort(key=lambda item: item[1])
+        if self._inotify is None and self.settle_seconds > 0:
+            # Without close-write events, recently modified files may still be mid-upload.
+            cutoff_ns = time.time_ns() - int(self.settle_seconds * 1e9)
+            found = [item for item in found if item[1].mtime_ns <= cutoff_ns]
+        return found
+
+    def _keyed(self, names: Iterable[str]) -> List[Tuple[Path, FileCursor]]:
+        keyed: List[Tuple[Path, FileCursor]] = []
+        for name in names:
+            if not name.lower().endswith(IMAGE_SUFFIXES):
+                continue
+            path = self.directory / name
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            keyed.append((path, FileCursor(mtime_ns=mtime_ns, name=name)))
+        keyed.sort(key=lambda item: item[1])
+        return keyed
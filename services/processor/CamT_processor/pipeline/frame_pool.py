@@ -0,0 +1,200 @@
+import copy
+import logging
+from multiprocessing import Array, RawArray, Semaphore, Value, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..dto import FrameRef
+from ..image_ops import decode_image, encode_jpeg
+
+logger = logging.getLogger("processor.frame_pool")
+
+
+class FramePool:
+    """
+    Fixed set of shared-memory frame slots with per-slot reference counts.
+
+    The supervisor creates the pool; worker processes attach to the same segment by
+    name after spawn. Producers write a frame into a free slot and pass only the
+    FrameRef through queues. Every consumer that receives a ref owns one reference and
+    must release it; the slot becomes free again when the count drops to zero.
+
+    With holders > 0 the pool also counts, per slot, the references each process holds
+    (a handle from for_holder() records them): put() and retain() hold, a consumer
+    adopt()s a ref it takes off a queue and a producer disown()s one it has queued.
+    References sitting in queues belong to no process. When a process dies, reclaim()
+    drops the references it held, so a crash does not leak slots.
+    """
+
+    def __init__(self, slot_count: int, slot_size: int, holders: int = 0) -> None:
+        if slot_count <= 0 or slot_size <= 0:
+            raise ValueError("Frame pool needs a positive slot count and slot size")
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self._shm: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(
+            create=True, size=slot_count * slot_size
+        )
+        self.name = self._shm.name
+        self._owner = True
+        self._refcounts = Array("i", slot_count)
+        self._available = Semaphore(slot_count)
+        # Per slot, then per holder; guarded by the refcount lock.
+        self._holds = RawArray("i", slot_count * holders) if holders > 0 else None
+        self._holders = holders
+        self._holder: Optional[int] = None
+        self._freed = Value("q", 0, lock=False)  # slots returned to the free set, ever
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        state["_owner"] = False
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+    def for_holder(self, holder: int) -> "FramePool":
+        """A handle on the same pool whose references are recorded as held by holder."""
+        if not 0 <= holder < self._holders:
+            raise ValueError(f"Frame pool holder {holder} out of range (pool has {self._holders} holders)")
+        handle = copy.copy(self)
+        handle._owner = False
+        handle._holder = holder
+        return handle
+
+    @property
+    def _buffer(self) -> memoryview:
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+        return self._shm.buf
+
+    def put(
+        self,
+        data: bytes,
+        timeout: Optional[float] = None,
+        shape: Optional[Tuple[int, int, int]] = None,
+    ) -> Optional[FrameRef]:
+        """
+        Copy data into a free slot; returns None if no slot frees up within timeout.
+        Pass shape when data is a raw BGR array so consumers can view it without decoding.
+        """
+        payload = memoryview(data).cast("B")
+        size = payload.nbytes
+        if size > self.slot_size:
+            raise ValueError(f"Frame of {size} bytes exceeds frame pool slot size {self.slot_size}")
+        if not self._available.acquire(timeout=timeout):
+            return None
+        slot = self._claim_slot()
+        offset = slot * self.slot_size
+        self._buffer[offset : offset + size] = payload
+        return FrameRef(slot=slot, size=size, shape=shape)
+
+    def view(self, ref: FrameRef) -> memoryview:
+        offset = ref.slot * self.slot_size
+        return self._buffer[offset : offset + ref.size]
+
+    def read(self, ref: FrameRef) -> bytes:
+        return bytes(self.view(ref))
+
+    def image(self, ref: FrameRef) -> np.ndarray:
+        """BGR image for the slot: a read-only zero-copy view for raw frames, a decode otherwise."""
+        if ref.shape is None:
+            return decode_image(self.view(ref))
+        array = np.frombuffer(self.view(ref), dtype=np.uint8).reshape(ref.shape)
+        array.flags.writeable = False
+        return array
+
+    def jpeg(self, ref: FrameRef) -> bytes:
+        """JPEG bytes for the slot; raw frames are encoded on demand, encoded frames are returned as-is."""
+        if ref.shape is None:
+            return self.read(ref)
+        return encode_jpeg(self.image(ref))
+
+    def retain(self, ref: FrameRef, count: int = 1) -> None:
+        with self._refcounts.get_lock():
+            self._refcounts[ref.slot] += count
+            self._hold(ref.slot, count)
+
+    def release(self, ref: FrameRef) -> None:
+        with self._refcounts.get_lock():
+            remaining = self._refcounts[ref.slot] - 1
+            if remaining < 0:
+                logger.warning("Frame slot released more times than retained", extra={"extra_payload": {"slot": ref.slot}})
+                return
+            self._refcounts[ref.slot] = remaining
+            self._hold(ref.slot, -1)
+            if remaining == 0:
+                self._freed.value += 1
+        if remaining == 0:
+            self._available.release()
+
+    def adopt(self, ref: FrameRef) -> None:
+        """Record a reference taken off a queue as held by this handle's process."""
+        with self._refcounts.get_lock():
+            self._hold(ref.slot, 1)
+
+    def disown(self, ref: FrameRef) -> None:
+        """Record a held reference as handed to a queue; the receiver adopts it."""
+        with self._refcounts.get_lock():
+            self._hold(ref.slot, -1)
+
+    def reclaim(self, holder: int) -> int:
+        """Release every reference holder still holds (it died); returns how many there were."""
+        if self._holds is None:
+            return 0
+        reclaimed = freed = 0
+        with self._refcounts.get_lock():
+            for slot in range(self.slot_count):
+                index = slot * self._holders + holder
+                held = self._holds[index]
+                if held <= 0:
+                    continue
+                self._holds[index] = 0
+                reclaimed += held
+                remaining = max(0, self._refcounts[slot] - held)
+                if self._refcounts[slot] > 0 and remaining == 0:
+                    freed += 1
+                self._refcounts[slot] = remaining
+            self._freed.value += freed
+        for _ in range(freed):
+            self._available.release()
+        return reclaimed
+
+    def in_use(self) -> int:
+        with self._refcounts.get_lock():
+            return sum(1 for count in self._refcounts if count > 0)
+
+    def freed(self) -> int:
+        """How many times a slot has become free; stops moving when the pipeline stalls."""
+        with self._refcounts.get_lock():
+            return self._freed.value
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            # Outstanding memoryviews still reference the segment; it is released with the process.
+            pass
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def _claim_slot(self) -> int:
+        with self._refcounts.get_lock():
+            for slot in range(self.slot_count):
+                if self._refcounts[slot] == 0:
+                    self._refcounts[slot] = 1
+                    self._hold(slot, 1)
+                    return slot
+        # The semaphore guarantees a free slot; reaching this means counts were corrupted.
+        raise RuntimeError("Frame pool semaphore and slot counts are out of sync")
+
+    def _hold(self, slot: int, delta: int) -> None:
+        # Caller holds the refcount lock.
+        if self._holds is None or self._holder is None:
+            return
+        index = slot * self._holders + self._holder
+        self._holds[index] = max(0, self._holds[index] + delta)
@@ -0,0 +1,294 @@
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Condition, RawArray
+from queue import Empty, Full
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from ..dto import FrameJob, FrameRef, LatencyTrace, PoisonPill
+from .feedback import MotionFeedback
+from .frame_pool import FramePool
+
+POLICY_BLOCK = "block"
+POLICY_LATEST = "latest"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_MOTION = "motion"
+POLICIES = (POLICY_BLOCK, POLICY_LATEST, POLICY_DROP_OLDEST, POLICY_MOTION)
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Entry columns; seq 0 marks a free entry, otherwise it orders entries by arrival.
+# The last two are the frame's latency trace: capture and enqueue time, epoch microseconds.
+_SEQ, _CAMERA, _SLOT, _SIZE, _H, _W, _C, _ID_HI, _ID_LO, _CAPTURED_US, _TRACE_CAPTURED_US, _ENQUEUED_US = range(12)
+_FIELDS = 12
+# Per-camera counters.
+_DROPPED, _DEQUEUED, _AGE_SUM_MS, _AGE_MAX_MS = range(4)
+_COUNTERS = 4
+
+
+@dataclass
+class FrameQueueStats:
+    camera: str
+    pending: int
+    dropped: int
+    dequeued: int
+    avg_age_ms: float
+    max_age_ms: int
+
+
+class CameraFrameQueue:
+    """
+    Frame queue between ingestion and one detection worker, kept as per-camera entries
+    in shared memory rather than one FIFO, so that when detection falls behind the
+    queue can shed frames instead of stalling every camera behind stale ones:
+
+    - block: no shedding; put() waits for room (the camera is at per_camera, or the
+      queue at capacity), as a plain queue would. Nothing is lost.
+    - latest: each camera keeps only its newest per_camera frames (1 if unset); a new
+      frame replaces the camera's oldest pending one. put() never waits.
+    - drop_oldest: when full, the oldest pending frame is dropped, whichever camera it
+      is from. put() never waits.
+    - motion: like drop_oldest, but frames of cameras without motion in the last
+      motion_hold_seconds are dropped first, and get() serves cameras with recent
+      motion first.
+
+    get() picks cameras by weighted fair round-robin (stride scheduling): each camera
+    has a virtual time that advances by 1 / weight per frame served, and the pending
+    camera with the lowest one goes next; a camera that was idle joins at the current
+    virtual time rather than with banked credit. Within a camera, frames come out
+    oldest first. Every camera can also queue one frame even when the queue is full,
+    so a quiet camera waits at most about one round of the busy ones, however deep
+    their backlog. Dropped frames release their frame pool slot. Drop counts and the
+    frame age (captured_at to dequeue) are kept per camera for stats(). Frames come out
+    with their latency trace stamped enqueued (when put() stored them) and dequeued.
+    PoisonPills are delivered once the pending frames are drained, so a replay still
+    finishes every frame.
+    """
+
+    def __init__(
+        self,
+        cameras: Sequence[str],
+        frame_pool: FramePool,
+        capacity: int,
+        policy: str = POLICY_BLOCK,
+        per_camera: int = 0,
+        motion_feedback: Optional[MotionFeedback] = None,
+        motion_hold_seconds: float = 10.0,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown frame queue policy {policy!r}; expected one of {list(POLICIES)}")
+        self.cameras = list(cameras)
+        self._index: Dict[str, int] = {name: idx for idx, name in enumerate(self.cameras)}
+        self.frame_pool = frame_pool
+        self.capacity = max(1, capacity)
+        self.policy = policy
+        if per_camera <= 0:
+            per_camera = 1 if policy == POLICY_LATEST else self.capacity
+        self.per_camera = min(per_camera, self.capacity)
+        self.motion_feedback = motion_feedback
+        self.motion_hold_seconds = motion_hold_seconds
+        weights = weights or {}
+        self._strides = np.array([1.0 / weights.get(name, 1.0) for name in self.cameras] or [1.0])
+        # One reserved entry per camera on top of capacity.
+        self._entries_raw = RawArray("q", (self.capacity + len(self.cameras)) * _FIELDS)
+        self._counters_raw = RawArray("q", max(1, len(self.cameras)) * _COUNTERS + 2)  # + pills, last seq
+        self._vtime_raw = RawArray("d", max(1, len(self.cameras)) + 1)  # per camera, then the global one
+        self._cond = Condition()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_entries_view", None)
+        state.pop("_counters_view", None)
+        state.pop("_vtime_view", None)
+        return state
+
+    @property
+    def _entries(self) -> np.ndarray:
+        # numpy views over the shared arrays, rebuilt lazily in each process.
+        if self.__dict__.get("_entries_view") is None:
+            self._entries_view = np.frombuffer(self._entries_raw, dtype=np.int64).reshape(-1, _FIELDS)
+        return self._entries_view
+
+    @property
+    def _counters(self) -> np.ndarray:
+        if self.__dict__.get("_counters_view") is None:
+            self._counters_view = np.frombuffer(self._counters_raw, dtype=np.int64)
+        return self._counters_view
+
+    @property
+    def _vtime(self) -> np.ndarray:
+        if self.__dict__.get("_vtime_view") is None:
+            self._vtime_view = np.frombuffer(self._vtime_raw, dtype=np.float64)
+        return self._vtime_view
+
+    def put(self, item, timeout: Optional[float] = None) -> None:
+        if isinstance(item, PoisonPill):
+            with self._cond:
+                self._counters[-2] += 1
+                self._cond.notify_all()
+            return
+        camera = self._index.get(item.camera)
+        if camera is None:
+            raise ValueError(f"Camera {item.camera!r} is not served by this frame queue")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            entries = self._entries
+            while True:
+                used = entries[:, _SEQ] > 0
+                camera_used = used & (entries[:, _CAMERA] == camera)
+                pending = int(camera_used.sum())
+                if pending < self.per_camera and (pending == 0 or used.sum() < self.capacity):
+                    break
+                if self.policy != POLICY_BLOCK:
+                    self._drop(self._victim(used, camera_used))
+                    continue
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise Full
+                self._cond.wait(remaining)
+            free = int(np.flatnonzero(~used)[0])
+            if pending == 0:
+                self._vtime[camera] = max(self._vtime[camera], self._vtime[-1])
+            self._counters[-1] += 1
+            entries[free] = self._encode(item, camera, int(self._counters[-1]))
+            self._cond.notify_all()
+
+    def put_nowait(self, item) -> None:
+        self.put(item, timeout=0)
+
+    def get(self, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            entries = self._entries
+            while True:
+                used = entries[:, _SEQ] > 0
+                if used.any():
+                    break
+                if self._counters[-2] > 0:
+                    self._counters[-2] -= 1
+                    return PoisonPill()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise Empty
+                self._cond.wait(remaining)
+            candidates = used
+            if self.policy == POLICY_MOTION:
+                active = used & self._recent_motion(entries[:, _CAMERA])
+                if active.any():
+                    candidates = active
+            # Lowest virtual time first; between equals, the camera with the oldest frame.
+            heads = {}
+            for idx in np.flatnonzero(candidates)[np.argsort(entries[candidates, _SEQ])].tolist():
+                heads.setdefault(int(entries[idx, _CAMERA]), idx)
+            camera, idx = min(heads.items(), key=lambda head: self._vtime[head[0]])
+            self._vtime[-1] = self._vtime[camera]
+            self._vtime[camera] += self._strides[camera]
+            job = self._decode(entries[idx])
+            job = replace(job, trace=job.trace.mark("dequeued"))
+            entries[idx, _SEQ] = 0
+            age_ms = max(0, (time.time_ns() // 1000 - int(entries[idx, _CAPTURED_US])) // 1000)
+            counters = self._counters[camera * _COUNTERS : (camera + 1) * _COUNTERS]
+            counters[_DEQUEUED] += 1
+            counters[_AGE_SUM_MS] += age_ms
+            counters[_AGE_MAX_MS] = max(int(counters[_AGE_MAX_MS]), age_ms)
+            self._cond.notify_all()
+            return job
+
+    def qsize(self) -> int:
+        with self._cond:
+            return int((self._entries[:, _SEQ] > 0).sum())
+
+    def stats(self, reset_max: bool = True) -> List[FrameQueueStats]:
+        """Counters for every camera that has had frames through this queue; max age restarts per call."""
+        result = []
+        with self._cond:
+            pending = np.bincount(
+                self._entries[self._entries[:, _SEQ] > 0, _CAMERA], minlength=len(self.cameras)
+            )
+            for idx, camera in enumerate(self.cameras):
+                counters = self._counters[idx * _COUNTERS : (idx + 1) * _COUNTERS]
+                if not counters[_DROPPED] and not counters[_DEQUEUED]:
+                    continue
+                dequeued = int(counters[_DEQUEUED])
+                result.append(
+                    FrameQueueStats(
+                        camera=camera,
+                        pending=int(pending[idx]),
+                        dropped=int(counters[_DROPPED]),
+                        dequeued=dequeued,
+                        avg_age_ms=round(int(counters[_AGE_SUM_MS]) / dequeued, 1) if dequeued else 0.0,
+                        max_age_ms=int(counters[_AGE_MAX_MS]),
+                    )
+                )
+                if reset_max:
+                    counters[_AGE_MAX_MS] = 0
+        return result
+
+    def _victim(self, used: np.ndarray, camera_used: np.ndarray) -> int:
+        """Entry to drop to make room for a frame of the camera whose entries are camera_used."""
+        if camera_used.sum() >= self.per_camera or (self.policy == POLICY_LATEST and camera_used.any()):
+            return self._oldest(camera_used)
+        if self.policy == POLICY_MOTION:
+            idle = used & ~self._recent_motion(self._entries[:, _CAMERA])
+            if idle.any():
+                return self._oldest(idle)
+        return self._oldest(used)
+
+    def _drop(self, idx: int) -> None:
+        entry = self._entries[idx]
+        camera = int(entry[_CAMERA])
+        ref = self._decode(entry).frame
+        entry[_SEQ] = 0
+        self._counters[camera * _COUNTERS + _DROPPED] += 1
+        self.frame_pool.release(ref)
+
+    def _oldest(self, mask: np.ndarray) -> int:
+        seqs = np.where(mask, self._entries[:, _SEQ], np.iinfo(np.int64).max)
+        return int(seqs.argmin())
+
+    def _recent_motion(self, camera_column: np.ndarray) -> np.ndarray:
+        if self.motion_feedback is None:
+            return np.zeros(len(camera_column), dtype=bool)
+        recent = np.array(
+            [self.motion_feedback.seconds_since_motion(name) < self.motion_hold_seconds for name in self.cameras]
+            or [False]
+        )
+        return recent[camera_column]
+
+    @staticmethod
+    def _encode(job: FrameJob, camera: int, seq: int) -> List[int]:
+        captured_at = job.captured_at
+        if captured_at.tzinfo is not None:
+            captured_at = captured_at.astimezone(timezone.utc).replace(tzinfo=None)
+        shape = job.frame.shape or (-1, -1, -1)
+        id_bytes = job.frame_id.bytes
+        return [
+            seq,
+            camera,
+            job.frame.slot,
+            job.frame.size,
+            *shape,
+            int.from_bytes(id_bytes[:8], "big", signed=True),
+            int.from_bytes(id_bytes[8:], "big", signed=True),
+            (captured_at - _EPOCH) // timedelta(microseconds=1),
+            int((job.trace.at("captured") or 0.0) * 1_000_000),
+            time.time_ns() // 1000,
+        ]
+
+    def _decode(self, entry: np.ndarray) -> FrameJob:
+        values = entry.tolist()
+        shape = tuple(values[_H : _C + 1]) if values[_H] >= 0 else None
+        frame_id = UUID(
+            bytes=values[_ID_HI].to_bytes(8, "big", signed=True) + values[_ID_LO].to_bytes(8, "big", signed=True)
+        )
+        return FrameJob(
+            frame_id=frame_id,
+            camera=self.cameras[values[_CAMERA]],
+            captured_at=_EPOCH + timedelta(microseconds=values[_CAPTURED_US]),
+            frame=FrameRef(slot=values[_SLOT], size=values[_SIZE], shape=shape),
+            trace=LatencyTrace((values[_TRACE_CAPTURED_US] / 1_000_000, values[_ENQUEUED_US] / 1_000_000)),
+        )
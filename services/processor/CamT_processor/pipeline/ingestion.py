@@ -1,17 +1,24 @@
 import logging
 import os
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from multiprocessing import Event, Process, Queue
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-import cv2
-
-from ..dto import FrameJob, PoisonPill
+from ..dto import FrameJob, FrameRef, LatencyTrace, PoisonPill, utc_epoch
+from ..image_ops import encode_jpeg
 from ..logging_utils import configure_logging
+from .cpu import CpuBudget, apply_cpu_budget
+from .dedup import DedupStats, FrameDeduplicator
+from .feedback import MotionFeedback
+from .file_watcher import CursorStore, DirectoryWatcher, FileCursor
+from .frame_pool import FramePool
+from .metrics import MetricsShard
+from .scheduler import CameraScheduler
+from .stream_reader import StreamReader, StreamStats
 
 logger = logging.getLogger("processor.ingestion")
 
@@ -21,103 +28,297 @@ class CameraConfig:
     name: str
     source: str
     poll_interval: float
+    idle_interval: Optional[float] = None
+    weight: float = 1.0
 
 
 def parse_camera_sources(raw_sources: List[str], default_poll: float) -> List[CameraConfig]:
+    """
+    Parse `name=source` entries. Per-camera options follow the source after `|`,
+    e.g. `driveway=rtsp://cam/stream|poll=0.5|idle=5|weight=2`.
+    """
     configs: List[CameraConfig] = []
     for raw in raw_sources:
-        if "=" in raw:
-            name, source = raw.split("=", 1)
+        head, *options = raw.split("|")
+        if "=" in head:
+            name, source = head.split("=", 1)
         else:
-            name, source = raw, raw
-        configs.append(CameraConfig(name=name.strip(), source=source.strip(), poll_interval=default_poll))
+            name, source = head, head
+        config = CameraConfig(name=name.strip(), source=source.strip(), poll_interval=default_poll)
+        for option in options:
+            key, _, value = option.partition("=")
+            key = key.strip()
+            try:
+                if key == "poll":
+                    config.poll_interval = float(value)
+                elif key == "idle":
+                    config.idle_interval = float(value)
+                elif key == "weight":
+                    weight = float(value)
+                    if weight <= 0:
+                        raise ValueError("weight must be positive")
+                    config.weight = weight
+                else:
+                    raise ValueError("unknown option")
+            except ValueError as exc:
+                logger.warning(
+                    "Ignoring invalid camera option",
+                    extra={"extra_payload": {"camera": config.name, "option": option, "error": str(exc)}},
+                )
+        configs.append(config)
     return configs
 
 
+def is_stream_source(source: str) -> bool:
+    return source.startswith("rtsp") or source.startswith("http")
+
+
 class IngestionWorker(Process):
-    def __init__(self, queue: Queue, cameras: List[CameraConfig], stop_event: Event):
+    def __init__(
+        self,
+        queue: Queue,
+        cameras: List[CameraConfig],
+        stop_event: Event,
+        frame_pool: FramePool,
+        stream_backoff_initial: float = 1.0,
+        stream_backoff_max: float = 30.0,
+        stream_stale_seconds: float = 10.0,
+        stats_interval: float = 30.0,
+        state_dir: str = "/data/input/.camtelligence",
+        use_inotify: bool = True,
+        motion_feedback: Optional[MotionFeedback] = None,
+        idle_poll_interval: float = 2.0,
+        motion_hold_seconds: float = 10.0,
+        dedup_enabled: bool = True,
+        dedup_hamming_threshold: int = -1,
+        cpu_budget: Optional[CpuBudget] = None,
+        metrics: Optional[MetricsShard] = None,
+    ):
         super().__init__(daemon=True)
         self.queue = queue
         self.cameras = cameras
         self.stop_event = stop_event
-        self._file_cursors: Dict[str, float] = {}
+        self.cpu_budget = cpu_budget
+        self.metrics = metrics or MetricsShard()
+        self.frame_pool = frame_pool
+        self.stream_backoff_initial = stream_backoff_initial
+        self.stream_backoff_max = stream_backoff_max
+        self.stream_stale_seconds = stream_stale_seconds
+        self.stats_interval = stats_interval
+        self.cursor_store = CursorStore(state_dir)
+        self.use_inotify = use_inotify
+        self.motion_feedback = motion_feedback
+        self.idle_poll_interval = idle_poll_interval
+        self.motion_hold_seconds = motion_hold_seconds
+        self.deduplicator = FrameDeduplicator(dedup_hamming_threshold) if dedup_enabled else None
+        self._file_cursors: Dict[str, FileCursor] = {}
+        # Watchers hold inotify descriptors, so like stream readers they are created lazily in the child.
+        self._watchers: Dict[str, DirectoryWatcher] = {}
+        # Stream readers hold threads and open captures, so they are created in run() inside the child.
+        self._readers: Dict[str, StreamReader] = {}
+        self._stream_seq: Dict[str, int] = {}
+        self._last_stats = 0.0
+        self._scheduler: Optional[CameraScheduler] = None
 
     def run(self) -> None:
         configure_logging(os.getenv("LOG_LEVEL"))
+        apply_cpu_budget(self.cpu_budget)
         logger.info("Ingestion starting", extra={"extra_payload": {"cameras": [c.name for c in self.cameras]}})
-        while not self.stop_event.is_set():
-            for camera in self.cameras:
-                try:
-                    if camera.source.startswith("rtsp") or camera.source.startswith("http"):
-                        self._read_stream(camera)
-                    else:
-                        self._poll_files(camera)
-                except Exception as exc:  # pragma: no cover - defensive
-                    logger.exception("Ingestion error", extra={"extra_payload": {"camera": camera.name, "error": str(exc)}})
-                time.sleep(camera.poll_interval)
+        self._start_readers()
+        self._scheduler = CameraScheduler(self.cameras, self._poll_camera, interval_for=self._interval_for)
+        try:
+            self._scheduler.run(self.stop_event, on_tick=self._maybe_log_stats)
+        finally:
+            self._scheduler.shutdown()
+            self._stop_readers()
+            for watcher in self._watchers.values():
+                watcher.close()
         try:
             self.queue.put_nowait(PoisonPill())
         except Exception:
             pass
 
+    def _start_readers(self) -> None:
+        for camera in self.cameras:
+            if not is_stream_source(camera.source) or camera.name in self._readers:
+                continue
+            reader = StreamReader(
+                camera.name,
+                camera.source,
+                backoff_initial=self.stream_backoff_initial,
+                backoff_max=self.stream_backoff_max,
+                stale_seconds=self.stream_stale_seconds,
+            )
+            reader.start()
+            self._readers[camera.name] = reader
+
+    def _stop_readers(self) -> None:
+        for reader in self._readers.values():
+            reader.stop()
+        for reader in self._readers.values():
+            reader.join(timeout=2)
+        self._readers.clear()
+
+    def _interval_for(self, camera: CameraConfig) -> float:
+        """Poll at the camera's normal rate around motion, and at the idle rate otherwise."""
+        if self.motion_feedback is None:
+            return camera.poll_interval
+        if self.motion_feedback.seconds_since_motion(camera.name) < self.motion_hold_seconds:
+            return camera.poll_interval
+        idle = camera.idle_interval if camera.idle_interval is not None else self.idle_poll_interval
+        return max(camera.poll_interval, idle)
+
+    def _poll_camera(self, camera: CameraConfig) -> None:
+        if is_stream_source(camera.source):
+            self._read_stream(camera)
+        else:
+            self._poll_files(camera)
+
+    def stream_stats(self) -> Dict[str, StreamStats]:
+        return {name: reader.stats() for name, reader in self._readers.items()}
+
+    def dedup_stats(self) -> Dict[str, DedupStats]:
+        return self.deduplicator.stats() if self.deduplicator is not None else {}
+
+    def _maybe_log_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._last_stats < self.stats_interval:
+            return
+        self._last_stats = now
+        for stats in self.stream_stats().values():
+            stale = stats.last_frame_age is None or stats.last_frame_age > self.stream_stale_seconds
+            log = logger.warning if stale else logger.info
+            log("Stream stats", extra={"extra_payload": asdict(stats)})
+        for dedup in self.dedup_stats().values():
+            logger.info("Duplicate frame stats", extra={"extra_payload": asdict(dedup)})
+        if self._scheduler is None:
+            return
+        for schedule in self._scheduler.stats():
+            log = logger.warning if schedule.missed else logger.info
+            log("Poll schedule stats", extra={"extra_payload": asdict(schedule)})
+
     def _poll_files(self, camera: CameraConfig) -> None:
         path = Path(camera.source)
+        cursor = self._file_cursors.get(camera.name)
+        if cursor is None:
+            cursor = self.cursor_store.load(camera.name)
+            self._file_cursors[camera.name] = cursor
         if path.is_dir():
-            images = sorted(path.glob("*.jpg")) + sorted(path.glob("*.png"))
+            watcher = self._watcher_for(camera.name, path, cursor)
+            images = watcher.poll()
+        elif path.exists():
+            key = FileCursor(mtime_ns=path.stat().st_mtime_ns, name=path.name)
+            images = [(path, key)] if key > cursor else []
         else:
-            images = [path] if path.exists() else []
-        last_ts = self._file_cursors.get(camera.name, 0.0)
+            images = []
         new_count = 0
-        for img_path in images:
-            stat = img_path.stat()
-            if stat.st_mtime <= last_ts:
+        for img_path, key in images:
+            try:
+                data = img_path.read_bytes()
+            except FileNotFoundError:
                 continue
-            data = img_path.read_bytes()
-            job = FrameJob(
-                frame_id=uuid4(),
-                camera=camera.name,
-                captured_at=datetime.utcnow(),
-                image_bytes=data
-            )
-            self._enqueue(job)
-            new_count += 1
-            last_ts = stat.st_mtime
-        self._file_cursors[camera.name] = last_ts
+            if self._enqueue_frame(camera.name, datetime.utcnow(), data):
+                new_count += 1
+            elif self.stop_event.is_set():
+                # Not enqueued; leave the cursor so the file is picked up after restart.
+                break
+            cursor = max(cursor, key)
+        if cursor != self._file_cursors[camera.name]:
+            self._file_cursors[camera.name] = cursor
+            if camera.name in self._watchers:
+                self._watchers[camera.name].cursor = cursor
+            self.cursor_store.save(camera.name, cursor)
         if new_count:
             logger.debug(
                 "Ingested files",
                 extra={"extra_payload": {"camera": camera.name, "count": new_count, "source": str(path)}},
             )
 
-    def _read_stream(self, camera: CameraConfig) -> None:
-        cap = cv2.VideoCapture(camera.source)
-        ok, frame = cap.read()
-        cap.release()
-        if not ok:
-            logger.warning(
-                "Failed to read frame from stream",
-                extra={"extra_payload": {"camera": camera.name, "source": camera.source}},
+    def _watcher_for(self, camera: str, path: Path, cursor: FileCursor) -> DirectoryWatcher:
+        watcher = self._watchers.get(camera)
+        if watcher is None:
+            watcher = DirectoryWatcher(path, cursor, use_inotify=self.use_inotify)
+            self._watchers[camera] = watcher
+            logger.info(
+                "Watching input directory",
+                extra={"extra_payload": {"camera": camera, "source": str(path), "inotify": watcher.uses_inotify}},
             )
+        return watcher
+
+    def _read_stream(self, camera: CameraConfig) -> None:
+        reader = self._readers.get(camera.name)
+        if reader is None:
             return
-        success, buffer = cv2.imencode(".jpg", frame)
-        if not success:
-            logger.warning(
-                "Failed to encode frame",
-                extra={"extra_payload": {"camera": camera.name, "source": camera.source}},
-            )
+        latest = reader.latest(self._stream_seq.get(camera.name, 0))
+        if latest is None:
+            # No new frame since the last poll (stream slower than polling, or reconnecting).
+            return
+        seq, frame, captured_at = latest
+        self._stream_seq[camera.name] = seq
+        if frame.nbytes <= self.frame_pool.slot_size:
+            # Raw BGR goes straight to detection; JPEG encoding happens only for frames that become events.
+            enqueued = self._enqueue_frame(camera.name, captured_at, frame, shape=frame.shape)
+        else:
+            try:
+                encoded = encode_jpeg(frame)
+            except ValueError:
+                logger.warning(
+                    "Failed to encode frame",
+                    extra={"extra_payload": {"camera": camera.name, "source": camera.source}},
+                )
+                return
+            enqueued = self._enqueue_frame(camera.name, captured_at, encoded)
+        if not enqueued:
             return
-        self._enqueue(FrameJob(
-            frame_id=uuid4(),
-            camera=camera.name,
-            captured_at=datetime.utcnow(),
-            image_bytes=buffer.tobytes()
-        ))
         logger.debug(
             "Enqueued stream frame",
             extra={"extra_payload": {"camera": camera.name, "source": camera.source}},
         )
 
-    def _enqueue(self, job: FrameJob) -> None:
+    def _enqueue_frame(
+        self,
+        camera: str,
+        captured_at: datetime,
+        data,
+        shape: Optional[Tuple[int, int, int]] = None,
+    ) -> bool:
+        """Copy frame data into the shared frame pool and enqueue a FrameJob referencing the slot."""
+        if self.deduplicator is not None:
+            duplicate = self.deduplicator.check(camera, data, shape)
+            if duplicate is not None:
+                logger.debug("Dropping duplicate frame", extra={"extra_payload": {"camera": camera, "match": duplicate}})
+                self.metrics.inc("camtelligence_frames_dropped_total", label="duplicate")
+                return False
+        try:
+            ref = self._acquire_slot(data, shape)
+        except ValueError as exc:
+            logger.warning("Dropping frame that does not fit the frame pool", extra={"extra_payload": {"camera": camera, "error": str(exc)}})
+            self.metrics.inc("camtelligence_frames_dropped_total", label="too_large")
+            return False
+        if ref is None:
+            return False
+        trace = LatencyTrace().mark("captured", self._capture_stamp(captured_at))
+        job = FrameJob(frame_id=uuid4(), camera=camera, captured_at=captured_at, frame=ref, trace=trace)
+        if not self._enqueue(job):
+            self.frame_pool.release(ref)
+            return False
+        self.frame_pool.disown(ref)
+        self.metrics.inc("camtelligence_frames_ingested_total")
+        return True
+
+    def _capture_stamp(self, captured_at: datetime) -> float:
+        """Epoch seconds the latency trace starts from."""
+        return utc_epoch(captured_at)
+
+    def _acquire_slot(self, data, shape: Optional[Tuple[int, int, int]] = None) -> Optional[FrameRef]:
+        # Blocks while every slot is in flight, which is the pipeline's backpressure point.
+        while not self.stop_event.is_set():
+            ref = self.frame_pool.put(data, timeout=0.5, shape=shape)
+            if ref is not None:
+                return ref
+        return None
+
+    def _enqueue(self, job: FrameJob) -> bool:
         while not self.stop_event.is_set():
             try:
                 self.queue.put(job, timeout=0.5)
@@ -125,9 +326,10 @@ class IngestionWorker(Process):
                     "Frame enqueued",
                     extra={"extra_payload": {"camera": job.camera, "frame_id": str(job.frame_id)}},
                 )
-                return
+                return True
             except Exception:
                 time.sleep(0.1)
+        return False
 
 
 def main() -> None:
@@ -158,6 +360,18 @@ def main() -> None:
         default=int(os.getenv("QUEUE_SIZE", "512")),
         help="Multiprocessing queue max size (default: env QUEUE_SIZE or 512).",
     )
+    parser.add_argument(
+        "--pool-slots",
+        type=int,
+        default=int(os.getenv("FRAME_POOL_SLOTS", "32")),
+        help="Shared-memory frame slots (default: env FRAME_POOL_SLOTS or 32).",
+    )
+    parser.add_argument(
+        "--pool-slot-bytes",
+        type=int,
+        default=int(os.getenv("FRAME_POOL_SLOT_BYTES", str(8 * 1024 * 1024))),
+        help="Bytes per frame slot (default: env FRAME_POOL_SLOT_BYTES or 8 MiB).",
+    )
     args = parser.parse_args()
 
     sources = args.camera
@@ -180,8 +394,15 @@ def main() -> None:
 
     stop_event = Event()
     queue: Queue = Queue(maxsize=args.queue_size)
+    frame_pool = FramePool(slot_count=args.pool_slots, slot_size=args.pool_slot_bytes)
     cameras = parse_camera_sources(sources, default_poll=args.poll_interval)
-    worker = IngestionWorker(queue=queue, cameras=cameras, stop_event=stop_event)
+    worker = IngestionWorker(
+        queue=queue,
+        cameras=cameras,
+        stop_event=stop_event,
+        frame_pool=frame_pool,
+        state_dir=os.getenv("INGEST_STATE_DIR", "/data/input/.camtelligence"),
+    )
 
     def _handle_shutdown(*_args) -> None:
         stop_event.set()
@@ -211,13 +432,16 @@ def main() -> None:
                         "extra_payload": {
                             "camera": item.camera,
                             "frame_id": str(item.frame_id),
-                            "bytes": len(item.image_bytes),
+                            "bytes": item.frame.size,
+                            "slot": item.frame.slot,
                         }
                     },
                 )
+                frame_pool.release(item.frame)
     finally:
         stop_event.set()
         worker.join(timeout=2)
+        frame_pool.close()
 
 
 if __name__ == "__main__":
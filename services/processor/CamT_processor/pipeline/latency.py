@@ -0,0 +1,55 @@
+from collections import deque
+from typing import Deque, Dict
+from uuid import UUID
+
+import numpy as np
+
+from ..dto import TRACE_STAGES, LatencyTrace
+
+PERCENTILES = (50, 90, 99)
+
+
+def is_sampled(frame_id: UUID, rate: float) -> bool:
+    """Whether a frame's trace is kept in full. Decided from the frame id, so every stage agrees."""
+    return rate > 0 and frame_id.int % 10_000 < rate * 10_000
+
+
+def trace_payload(trace: LatencyTrace) -> dict:
+    """JSON form of a trace: the epoch time of each reached stage and the per-stage milliseconds."""
+    return {
+        "stamps": {stage: trace.at(stage) for stage in TRACE_STAGES if trace.at(stage) is not None},
+        "stage_ms": trace.stage_ms(),
+    }
+
+
+class LatencyRecorder:
+    """
+    Per-camera latency percentiles of each pipeline stage (see LatencyTrace.stage_ms),
+    over the last `window` traces that reached the stage since the previous summary.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self.window = max(1, window)
+        self._samples: Dict[str, Dict[str, Deque[float]]] = {}
+
+    def record(self, camera: str, trace: LatencyTrace) -> None:
+        stages = self._samples.setdefault(camera, {})
+        for stage, ms in trace.stage_ms().items():
+            stages.setdefault(stage, deque(maxlen=self.window)).append(ms)
+
+    def summary(self, reset: bool = True) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{camera: {stage: {"count", "p50_ms", "p90_ms", "p99_ms"}}}"""
+        result = {}
+        for camera, stages in self._samples.items():
+            result[camera] = {}
+            for stage, samples in stages.items():
+                if not samples:
+                    continue
+                values = np.percentile(np.fromiter(samples, dtype=np.float64), PERCENTILES)
+                result[camera][stage] = {
+                    "count": len(samples),
+                    **{f"p{pct}_ms": round(float(value), 1) for pct, value in zip(PERCENTILES, values)},
+                }
+        if reset:
+            self._samples.clear()
+        return result
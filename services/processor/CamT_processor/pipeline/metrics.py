@@ -0,0 +1,234 @@
+import logging
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import RawArray
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("processor.metrics")
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+GAUGE = "gauge"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    name: str
+    kind: str
+    help: str
+    label: str = ""
+    values: Tuple[str, ...] = ()  # label values; one series each
+    buckets: Tuple[float, ...] = ()
+
+    @property
+    def series_width(self) -> int:
+        # Histograms: one count per bucket plus +Inf, then sum and count.
+        return len(self.buckets) + 3 if self.kind == HISTOGRAM else 1
+
+    @property
+    def width(self) -> int:
+        return max(1, len(self.values)) * self.series_width
+
+
+METRICS = (
+    MetricSpec("camtelligence_frames_ingested_total", COUNTER, "Frames handed to detection by ingestion."),
+    MetricSpec(
+        "camtelligence_frames_dropped_total",
+        COUNTER,
+        "Frames dropped by ingestion before detection.",
+        "reason",
+        ("duplicate", "too_large"),
+    ),
+    MetricSpec("camtelligence_frames_motion_skipped_total", COUNTER, "Frames without motion, never sent to YOLO."),
+    MetricSpec("camtelligence_frames_track_skipped_total", COUNTER, "Motion frames explained by tracks, not sent to YOLO."),
+    MetricSpec("camtelligence_frames_inferred_total", COUNTER, "Frames run through YOLO."),
+    MetricSpec("camtelligence_yolo_batch_seconds", HISTOGRAM, "YOLO inference time per batch.", buckets=LATENCY_BUCKETS),
+    MetricSpec(
+        "camtelligence_events_written_total", COUNTER, "Person and vehicle events stored.", "kind", ("person", "vehicle")
+    ),
+    MetricSpec(
+        "camtelligence_writer_transaction_seconds",
+        HISTOGRAM,
+        "Event writer time per frame: files and the DB transaction.",
+        buckets=LATENCY_BUCKETS,
+    ),
+    MetricSpec("camtelligence_writer_errors_total", COUNTER, "Frames the event writer failed to store."),
+    MetricSpec(
+        "camtelligence_frame_latency_seconds",
+        HISTOGRAM,
+        "Time from frame capture to its events' commit and to its notification.",
+        "stage",
+        ("committed", "notified"),
+        buckets=LATENCY_BUCKETS,
+    ),
+    MetricSpec(
+        "camtelligence_notifications_total",
+        COUNTER,
+        "Notifications by outcome.",
+        "status",
+        ("sent", "failed", "debounced"),
+    ),
+)
+
+
+def _layout() -> Tuple[Dict[str, Tuple[MetricSpec, int]], int]:
+    """Offset of each metric in a shard, and the shard width."""
+    layout, offset = {}, 0
+    for spec in METRICS:
+        layout[spec.name] = (spec, offset)
+        offset += spec.width
+    return layout, offset
+
+
+_LAYOUT, SHARD_WIDTH = _layout()
+
+
+def _series_offset(name: str, label: Optional[str]) -> Tuple[MetricSpec, int]:
+    spec, base = _LAYOUT[name]
+    index = spec.values.index(label) if spec.values else 0
+    return spec, base + index * spec.series_width
+
+
+class MetricsShard:
+    """
+    One process's slice of the pipeline metrics, in shared memory. Only that process
+    writes it, so no cross-process lock or message is needed on the per-frame path; a
+    thread lock, uncontended unless the process updates from several threads (ingestion's
+    camera readers), keeps each read-modify-write whole. The supervisor sums the shards
+    when /metrics is scraped.
+    """
+
+    def __init__(self, values=None) -> None:
+        # Without a shared array (tests, standalone workers) updates go to a private one.
+        self._values = values if values is not None else [0.0] * SHARD_WIDTH
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # Locks do not pickle; each process gets its own when the shard is handed over.
+        return {"values": self._values}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["values"])
+
+    def inc(self, name: str, amount: float = 1.0, label: Optional[str] = None) -> None:
+        _, offset = _series_offset(name, label)
+        with self._lock:
+            self._values[offset] += amount
+
+    def observe(self, name: str, value: float, label: Optional[str] = None) -> None:
+        spec, offset = _series_offset(name, label)
+        buckets = len(spec.buckets)
+        with self._lock:
+            self._values[offset + bisect_left(spec.buckets, value)] += 1
+            self._values[offset + buckets + 1] += value
+            self._values[offset + buckets + 2] += 1
+
+    def snapshot(self) -> List[float]:
+        return list(self._values)
+
+
+class PipelineMetrics:
+    """A MetricsShard per pipeline process, and the Prometheus text rendering of their sum."""
+
+    def __init__(self, processes: Sequence[str]) -> None:
+        self._shards = {name: RawArray("d", SHARD_WIDTH) for name in processes}
+
+    def shard(self, process: str) -> MetricsShard:
+        return MetricsShard(self._shards[process])
+
+    def totals(self) -> List[float]:
+        totals = [0.0] * SHARD_WIDTH
+        for values in self._shards.values():
+            for idx, value in enumerate(values):
+                totals[idx] += value
+        return totals
+
+    def render(self) -> List[str]:
+        totals = self.totals()
+        lines: List[str] = []
+        for spec in METRICS:
+            lines += [f"# HELP {spec.name} {spec.help}", f"# TYPE {spec.name} {spec.kind}"]
+            for label in spec.values or (None,):
+                _, offset = _series_offset(spec.name, label)
+                labels = {spec.label: label} if label is not None else {}
+                if spec.kind == HISTOGRAM:
+                    lines += _histogram_lines(spec, totals[offset : offset + spec.series_width], labels)
+                else:
+                    lines.append(f"{spec.name}{_labels(labels)} {_number(totals[offset])}")
+        return lines
+
+
+def gauge_lines(name: str, help_text: str, samples: Sequence[Tuple[Dict[str, str], float]], kind: str = GAUGE) -> List[str]:
+    """Prometheus text for a metric read at scrape time (queue depths, process liveness)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples]
+    return lines
+
+
+def _histogram_lines(spec: MetricSpec, values: Sequence[float], labels: Dict[str, str]) -> List[str]:
+    lines = []
+    cumulative = 0.0
+    for bound, count in zip((*spec.buckets, float("inf")), values):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{spec.name}_bucket{_labels({**labels, 'le': le})} {_number(cumulative)}")
+    lines.append(f"{spec.name}_sum{_labels(labels)} {_number(values[-2])}")
+    lines.append(f"{spec.name}_count{_labels(labels)} {_number(values[-1])}")
+    return lines
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsServer:
+    """
+    Serves /metrics (Prometheus text format) and /healthz (200 when healthy, else 503)
+    from a daemon thread in the supervisor process.
+    """
+
+    def __init__(self, host: str, port: int, render: Callable[[], str], healthy: Callable[[], bool]) -> None:
+        render_metrics, is_healthy = render, healthy
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    status, body, content_type = 200, render_metrics(), "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/healthz":
+                    ok = is_healthy()
+                    status, body, content_type = (200 if ok else 503), ("ok\n" if ok else "unhealthy\n"), "text/plain"
+                else:
+                    status, body, content_type = 404, "not found\n", "text/plain"
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *_args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info("Metrics endpoint listening", extra={"extra_payload": {"port": self.port}})
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
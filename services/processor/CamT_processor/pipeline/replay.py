@@ -0,0 +1,149 @@
+import logging
+import os
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from multiprocessing import Event, Queue, Value
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..dto import PoisonPill
+from ..image_ops import encode_jpeg
+from ..logging_utils import configure_logging
+from .cpu import CpuBudget, apply_cpu_budget
+from .file_watcher import IMAGE_SUFFIXES
+from .frame_pool import FramePool
+from .metrics import MetricsShard
+from .ingestion import CameraConfig, IngestionWorker
+
+logger = logging.getLogger("processor.replay")
+
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".avi", ".mov")
+
+
+class ReplayProgress:
+    """Counters shared between the replay worker and the process reporting on it."""
+
+    def __init__(self) -> None:
+        # Single writer (the replay worker), so no lock is needed.
+        self.frames_read = Value("Q", 0, lock=False)
+        self.frames_enqueued = Value("Q", 0, lock=False)
+
+
+def collect_sources(paths: List[str]) -> List[Path]:
+    """Images and videos under paths, oldest first (mtime, then name)."""
+    found: List[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        candidates = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for candidate in candidates:
+            if candidate.suffix.lower() in IMAGE_SUFFIXES + VIDEO_SUFFIXES:
+                found.append(candidate)
+    return sorted(found, key=lambda p: (p.stat().st_mtime_ns, p.name))
+
+
+class ReplayWorker(IngestionWorker):
+    """
+    Feeds recorded footage into the pipeline as fast as detection accepts it: no poll
+    interval, only frame-pool and queue backpressure. captured_at comes from the
+    recording rather than the wall clock: file mtime for images, and for videos the
+    frame PTS offset from the recording start (mtime minus duration, since NVRs write
+    the file as they record). Sends a PoisonPill when the footage is exhausted so the
+    pipeline drains and exits.
+    """
+
+    def __init__(
+        self,
+        queue: Queue,
+        camera: str,
+        sources: List[str],
+        stop_event: Event,
+        frame_pool: FramePool,
+        progress: ReplayProgress,
+        sample_fps: float = 0.0,
+        dedup_enabled: bool = True,
+        dedup_hamming_threshold: int = -1,
+        cpu_budget: Optional[CpuBudget] = None,
+        metrics: Optional[MetricsShard] = None,
+    ):
+        super().__init__(
+            queue,
+            cameras=[CameraConfig(name=camera, source=",".join(sources), poll_interval=0.0)],
+            stop_event=stop_event,
+            frame_pool=frame_pool,
+            dedup_enabled=dedup_enabled,
+            dedup_hamming_threshold=dedup_hamming_threshold,
+            cpu_budget=cpu_budget,
+            metrics=metrics,
+        )
+        self.camera = camera
+        self.sources = sources
+        self.progress = progress
+        self.sample_fps = sample_fps
+
+    def run(self) -> None:
+        configure_logging(os.getenv("LOG_LEVEL"))
+        apply_cpu_budget(self.cpu_budget)
+        files = collect_sources(self.sources)
+        logger.info("Replay starting", extra={"extra_payload": {"camera": self.camera, "files": len(files)}})
+        try:
+            for path in files:
+                if self.stop_event.is_set():
+                    break
+                try:
+                    frames = self._video_frames(path) if path.suffix.lower() in VIDEO_SUFFIXES else self._image_frame(path)
+                    for captured_at, data, shape in frames:
+                        self.progress.frames_read.value += 1
+                        if self._enqueue_frame(self.camera, captured_at, data, shape=shape):
+                            self.progress.frames_enqueued.value += 1
+                        elif self.stop_event.is_set():
+                            break
+                except Exception as exc:
+                    logger.exception("Replay of file failed", extra={"extra_payload": {"path": str(path), "error": str(exc)}})
+        finally:
+            for dedup in self.dedup_stats().values():
+                logger.info("Duplicate frame stats", extra={"extra_payload": asdict(dedup)})
+            try:
+                self.queue.put(PoisonPill(reason="replay finished"), timeout=5)
+            except Exception:
+                pass
+
+    def _capture_stamp(self, captured_at: datetime) -> float:
+        # captured_at is when the footage was recorded; latency is measured from reading it.
+        return time.time()
+
+    def _image_frame(self, path: Path) -> Iterator[Tuple[datetime, bytes, None]]:
+        yield datetime.utcfromtimestamp(path.stat().st_mtime), path.read_bytes(), None
+
+    def _video_frames(self, path: Path) -> Iterator[Tuple[datetime, object, object]]:
+        cap = cv2.VideoCapture(str(path))
+        if not cap.isOpened():
+            logger.warning("Could not open video", extra={"extra_payload": {"path": str(path)}})
+            return
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+            duration = count / fps if fps > 0 else 0.0
+            start = datetime.utcfromtimestamp(path.stat().st_mtime) - timedelta(seconds=duration)
+            min_gap_ms = 1000.0 / self.sample_fps if self.sample_fps > 0 else 0.0
+            last_ms = None
+            while not self.stop_event.is_set():
+                if not cap.grab():
+                    break
+                pts_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+                if last_ms is not None and pts_ms - last_ms < min_gap_ms:
+                    continue  # grab() without retrieve() skips the colour conversion for sampled-out frames
+                ok, frame = cap.retrieve()
+                if not ok or frame is None:
+                    continue
+                last_ms = pts_ms
+                captured_at = start + timedelta(milliseconds=pts_ms)
+                if frame.nbytes <= self.frame_pool.slot_size:
+                    yield captured_at, np.ascontiguousarray(frame), frame.shape
+                else:
+                    yield captured_at, encode_jpeg(frame), None
+        finally:
+            cap.release()
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("processor.scheduler")
+
+
+@dataclass
+class ScheduleStats:
+    camera: str
+    interval: float
+    runs: int = 0
+    missed: int = 0
+    last_slip: float = 0.0
+    max_slip: float = 0.0
+
+
+class CameraScheduler:
+    """
+    Polls each camera on its own deadline from a thread pool with one thread per camera,
+    so a slow or hung source only delays itself. A deadline is "missed" when the previous
+    poll of that camera is still running or the scheduler fell a whole interval behind;
+    slip is how late a poll actually started relative to its deadline.
+    """
+
+    MIN_INTERVAL = 0.01
+
+    def __init__(
+        self,
+        cameras: Sequence,
+        poll: Callable[[object], None],
+        interval_for: Optional[Callable[[object], float]] = None,
+    ) -> None:
+        self.cameras = list(cameras)
+        self.poll = poll
+        self.interval_for = interval_for or (lambda camera: camera.poll_interval)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.cameras)), thread_name_prefix="poll")
+        self._inflight: Dict[str, Future] = {}
+        self._stats: Dict[str, ScheduleStats] = {
+            camera.name: ScheduleStats(camera=camera.name, interval=self._interval(camera)) for camera in self.cameras
+        }
+        self._lock = threading.Lock()
+
+    def run(self, stop_event, on_tick: Optional[Callable[[], None]] = None, max_wait: float = 0.1) -> None:
+        now = time.monotonic()
+        # Anchor = deadline of the last dispatched poll. Intervals are re-read every pass,
+        # so a camera whose interval shrinks (e.g. motion burst) is rescheduled right away.
+        anchors: List[float] = [now - self._interval(camera) for camera in self.cameras]
+        while self.cameras and not stop_event.is_set():
+            now = time.monotonic()
+            next_due = float("inf")
+            for idx, camera in enumerate(self.cameras):
+                interval = self._interval(camera)
+                due = anchors[idx] + interval
+                if due <= now:
+                    anchors[idx] = self._dispatch(camera, due, interval, now)
+                    due = anchors[idx] + interval
+                next_due = min(next_due, due)
+            wait = next_due - time.monotonic()
+            if wait > 0:
+                stop_event.wait(min(wait, max_wait))
+            if on_tick is not None:
+                on_tick()
+
+    def stats(self) -> List[ScheduleStats]:
+        with self._lock:
+            return [ScheduleStats(**vars(stats)) for stats in self._stats.values()]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _interval(self, camera) -> float:
+        return max(self.MIN_INTERVAL, self.interval_for(camera))
+
+    def _dispatch(self, camera, deadline: float, interval: float, now: float) -> float:
+        """Start a poll for camera if it is idle; returns the new anchor deadline."""
+        stats = self._stats[camera.name]
+        previous = self._inflight.get(camera.name)
+        with self._lock:
+            rate_changed = stats.interval != interval
+            stats.interval = interval
+            if previous is not None and not previous.done():
+                stats.missed += 1
+            else:
+                slip = now - deadline
+                stats.runs += 1
+                stats.last_slip = slip
+                stats.max_slip = max(stats.max_slip, slip)
+                self._inflight[camera.name] = self._executor.submit(self._run_poll, camera)
+            if now - deadline >= interval:
+                # Fell at least one whole interval behind: re-anchor, and count the skipped
+                # ticks unless the lag only comes from the interval having just shrunk.
+                if not rate_changed:
+                    stats.missed += int((now - deadline) // interval)
+                return now
+        return deadline
+
+    def _run_poll(self, camera) -> None:
+        try:
+            self.poll(camera)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception("Ingestion error", extra={"extra_payload": {"camera": camera.name, "error": str(exc)}})
@@ -0,0 +1,58 @@
+import hashlib
+from multiprocessing import Array, Queue
+from typing import List, Optional
+
+from ..dto import PoisonPill
+
+
+def _score(key: bytes, index: int) -> bytes:
+    # Needs a well-mixed hash: with a linear one like CRC32 the per-worker scores for a
+    # camera are correlated and cameras pile onto a few workers.
+    return hashlib.blake2b(key + b"\0" + str(index).encode("ascii"), digest_size=8).digest()
+
+
+class FrameRouter:
+    """
+    Queue-like front for a pool of detection workers, one queue per worker. Frames are
+    routed by camera with rendezvous hashing over the workers currently marked live, so
+    each camera's MovementDetector state stays in one process, and a worker going down
+    or coming back only moves the cameras it owns. PoisonPills go to every worker.
+
+    Liveness lives in a shared array: a worker marks itself live once it is ready to
+    take frames, and the supervisor marks it down when the process dies.
+    """
+
+    def __init__(self, queues: List[Queue]) -> None:
+        if not queues:
+            raise ValueError("FrameRouter needs at least one queue")
+        self.queues = queues
+        self._live = Array("b", len(queues), lock=False)
+
+    def mark(self, index: int, live: bool) -> None:
+        self._live[index] = 1 if live else 0
+
+    def live_workers(self) -> List[int]:
+        return [idx for idx in range(len(self.queues)) if self._live[idx]]
+
+    def index_for(self, camera: str) -> int:
+        # Before any worker is ready (startup), hash over all of them so frames still queue up.
+        candidates = self.live_workers() or range(len(self.queues))
+        key = camera.encode("utf-8")
+        return max(candidates, key=lambda idx: _score(key, idx))
+
+    def put(self, item, timeout: Optional[float] = None) -> None:
+        if isinstance(item, PoisonPill):
+            for queue in self.queues:
+                queue.put(item, timeout=timeout)
+            return
+        self.queues[self.index_for(item.camera)].put(item, timeout=timeout)
+
+    def put_nowait(self, item) -> None:
+        if isinstance(item, PoisonPill):
+            for queue in self.queues:
+                try:
+                    queue.put_nowait(item)
+                except Exception:
+                    pass
+            return
+        self.queues[self.index_for(item.camera)].put_nowait(item)
@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("processor.stream")
+
+
+@dataclass(frozen=True)
+class StreamStats:
+    camera: str
+    connected: bool
+    fps: float
+    frames: int
+    reconnects: int
+    last_frame_age: Optional[float]
+
+
+class StreamReader(threading.Thread):
+    """
+    Long-lived reader for one RTSP/HTTP camera. Keeps the capture open, decodes
+    continuously and retains only the latest frame; reconnects with exponential
+    backoff when the stream fails or stalls. captured_at follows the stream's
+    presentation timestamps (PTS) where it has them, so decode and buffering delay
+    count towards a frame's latency rather than being hidden by the read time.
+    """
+
+    def __init__(
+        self,
+        camera: str,
+        source: str,
+        backoff_initial: float = 1.0,
+        backoff_max: float = 30.0,
+        stale_seconds: float = 10.0,
+    ) -> None:
+        super().__init__(name=f"stream-{camera}", daemon=True)
+        self.camera = camera
+        self.source = source
+        self.backoff_initial = max(0.1, backoff_initial)
+        self.backoff_max = max(self.backoff_initial, backoff_max)
+        self.stale_seconds = stale_seconds
+        self._stop_requested = threading.Event()
+        self._lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._captured_at: Optional[datetime] = None
+        self._seq = 0
+        self._last_frame_at: Optional[float] = None
+        self._connected = False
+        self._reconnects = 0
+        self._fps = 0.0
+        self._pts_anchor: Optional[datetime] = None
+        self._last_pts = 0.0
+
+    def stop(self) -> None:
+        self._stop_requested.set()
+
+    def latest(self, after_seq: int = 0) -> Optional[Tuple[int, np.ndarray, datetime]]:
+        """Return (seq, frame, captured_at) if a frame newer than after_seq is available."""
+        with self._lock:
+            if self._frame is None or self._seq <= after_seq:
+                return None
+            return self._seq, self._frame, self._captured_at  # type: ignore[return-value]
+
+    def stats(self) -> StreamStats:
+        with self._lock:
+            age = time.monotonic() - self._last_frame_at if self._last_frame_at is not None else None
+            return StreamStats(
+                camera=self.camera,
+                connected=self._connected,
+                fps=round(self._fps, 2),
+                frames=self._seq,
+                reconnects=self._reconnects,
+                last_frame_age=round(age, 3) if age is not None else None,
+            )
+
+    def run(self) -> None:
+        backoff = self.backoff_initial
+        attempt = 0
+        while not self._stop_requested.is_set():
+            if attempt:
+                with self._lock:
+                    self._reconnects += 1
+            attempt += 1
+            cap = self._open()
+            if cap is None:
+                logger.warning(
+                    "Failed to open stream, retrying",
+                    extra={"extra_payload": {"camera": self.camera, "source": self.source, "backoff": backoff}},
+                )
+                self._stop_requested.wait(backoff)
+                backoff = min(backoff * 2, self.backoff_max)
+                continue
+            logger.info("Stream connected", extra={"extra_payload": {"camera": self.camera, "source": self.source}})
+            try:
+                if self._read_until_failure(cap):
+                    # At least one frame arrived, so the next failure starts a fresh backoff series.
+                    backoff = self.backoff_initial
+            finally:
+                cap.release()
+                with self._lock:
+                    self._connected = False
+            if self._stop_requested.is_set():
+                break
+            logger.warning(
+                "Stream lost, reconnecting",
+                extra={"extra_payload": {"camera": self.camera, "source": self.source, "backoff": backoff}},
+            )
+            self._stop_requested.wait(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        timeout_ms = int(self.stale_seconds * 1000)
+        try:
+            cap = cv2.VideoCapture(
+                self.source,
+                cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms],
+            )
+        except Exception:
+            cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._pts_anchor = None
+        with self._lock:
+            self._connected = True
+        return cap
+
+    def capture_time(self, pts_ms: float, received_at: datetime) -> datetime:
+        """
+        Capture time of a frame from its PTS: the first frame after (re)connecting anchors
+        the PTS to the wall clock, later frames are placed by their PTS offset. Falls back
+        to re-anchoring on the receive time when the stream has no usable PTS (missing or
+        not increasing), or when the PTS runs ahead of the wall clock or more than
+        stale_seconds behind it (camera clock drift, PTS reset).
+        """
+        pts_ms = pts_ms if pts_ms == pts_ms and pts_ms > 0 else 0.0  # NaN or unset
+        if self._pts_anchor is not None and pts_ms > self._last_pts:
+            captured_at = self._pts_anchor + timedelta(milliseconds=pts_ms)
+            if received_at - timedelta(seconds=self.stale_seconds) <= captured_at <= received_at:
+                self._last_pts = pts_ms
+                return captured_at
+        self._pts_anchor = received_at - timedelta(milliseconds=pts_ms)
+        self._last_pts = pts_ms
+        return received_at
+
+    def _read_until_failure(self, cap: cv2.VideoCapture) -> bool:
+        got_frame = False
+        while not self._stop_requested.is_set():
+            ok, frame = cap.read()
+            now = time.monotonic()
+            if not ok or frame is None:
+                return got_frame
+            got_frame = True
+            captured_at = self.capture_time(cap.get(cv2.CAP_PROP_POS_MSEC), datetime.utcnow())
+            with self._lock:
+                if self._last_frame_at is not None:
+                    interval = now - self._last_frame_at
+                    if interval > 0:
+                        # Exponential moving average keeps fps stable across jittery frame arrival.
+                        self._fps = (1.0 / interval) if self._fps == 0.0 else 0.9 * self._fps + 0.1 / interval
+                self._frame = frame
+                self._captured_at = captured_at
+                self._seq += 1
+                self._last_frame_at = now
+        return got_frame
@@ -3,28 +3,62 @@ import os
 import signal
 import time
 from multiprocessing import Event, Queue, set_start_method
-from typing import List
+from typing import Dict, List, Optional
+
+from ct_core import get_session
+from ct_core.models import Setting
 
 from ..config.settings import ProcessorSettings
+from ..detector.masks import CameraMask, parse_camera_masks
 from ..dto import PoisonPill
 from ..logging_utils import configure_logging
 from ..notifications.telegram import NotificationWorker, TelegramSettings
+from .cpu import ROLES, CpuBudget, parse_cpu_list, plan_cpu_budgets
 from .detection import DetectionWorker
-from .event_writer import PersonEventWriter, VehicleEventWriter
-from .ingestion import IngestionWorker, parse_camera_sources
+from .event_writer import EventWriter
+from .feedback import MotionFeedback
+from .frame_pool import FramePool
+from .frame_queue import POLICY_BLOCK, CameraFrameQueue
+from .metrics import MetricsServer, MetricsShard, PipelineMetrics, gauge_lines
+from .ingestion import IngestionWorker, is_stream_source, parse_camera_sources
+from .replay import ReplayProgress, ReplayWorker
+from .sharding import FrameRouter
 
 logger = logging.getLogger("processor.supervisor")
 
+CAMERA_MASKS_SETTING = "camera_masks"
+
 
 class Supervisor:
     def __init__(self, settings: ProcessorSettings) -> None:
         self.settings = settings
         self.stop_event = Event()
         self.processes: dict = {}
-        self.frame_queue = Queue(maxsize=settings.queue_size)
-        self.person_queue = Queue(maxsize=settings.queue_size)
-        self.vehicle_queue = Queue(maxsize=settings.queue_size)
+        self.detection_workers = max(1, settings.detection_workers)
+        # One frame queue per detection worker, built once the cameras are known; the
+        # router keeps each camera on one worker.
+        self.frame_queues: List[CameraFrameQueue] = []
+        self.frame_router: Optional[FrameRouter] = None
+        self.detections_queue = Queue(maxsize=settings.queue_size)
         self.notification_queue = Queue(maxsize=settings.queue_size)
+        # Processes that hold frame slots, so the slots of one that dies can be reclaimed.
+        self.pool_holders = {
+            name: idx
+            for idx, name in enumerate(
+                ["ingestion", *(f"detection-{idx}" for idx in range(self.detection_workers)), "event_writer"]
+            )
+        }
+        self.frame_pool = FramePool(
+            slot_count=settings.frame_pool_slots,
+            slot_size=settings.frame_pool_slot_bytes,
+            holders=len(self.pool_holders),
+        )
+        # Only the monitor thread updates these; /healthz reads the flag.
+        self._pool_progress = (0, time.monotonic())  # (slots freed so far, when that last changed)
+        self._pool_stalled = False
+        self.cpu_budgets: Dict[str, CpuBudget] = {}
+        self.metrics: Optional[PipelineMetrics] = None
+        self.metrics_server: Optional[MetricsServer] = None
 
     def start(self) -> None:
         try:
@@ -33,68 +67,379 @@ class Supervisor:
             pass
         configure_logging(os.getenv("LOG_LEVEL"))
         cameras = parse_camera_sources(self.settings.camera_sources, self.settings.frame_poll_interval)
-        telegram_settings = None
+        self.cpu_budgets = self._plan_cpu_budgets(sum(is_stream_source(camera.source) for camera in cameras))
+        motion_feedback = MotionFeedback([camera.name for camera in cameras])
+        self._build_frame_queues(
+            [camera.name for camera in cameras],
+            self.settings.frame_queue_policy,
+            motion_feedback,
+            weights={camera.name: camera.weight for camera in cameras},
+        )
+
+        factories = {
+            "ingestion": lambda: IngestionWorker(
+                self.frame_router,
+                cameras=cameras,
+                stop_event=self.stop_event,
+                frame_pool=self._pool_for("ingestion"),
+                stream_backoff_initial=self.settings.stream_reconnect_initial,
+                stream_backoff_max=self.settings.stream_reconnect_max,
+                stream_stale_seconds=self.settings.stream_stale_seconds,
+                stats_interval=self.settings.heartbeat_interval,
+                state_dir=self.settings.ingest_state_dir,
+                use_inotify=self.settings.ingest_use_inotify,
+                motion_feedback=motion_feedback if self.settings.adaptive_poll_enabled else None,
+                idle_poll_interval=self.settings.adaptive_idle_poll_interval,
+                motion_hold_seconds=self.settings.adaptive_motion_hold_seconds,
+                dedup_enabled=self.settings.dedup_enabled,
+                dedup_hamming_threshold=self.settings.dedup_hamming_threshold,
+                cpu_budget=self.cpu_budgets.get("ingestion"),
+                metrics=self._metrics_shard("ingestion"),
+            ),
+            **self._pipeline_factories(motion_feedback, self._telegram_settings()),
+        }
+
+        self.metrics = PipelineMetrics(list(factories))
+        self.processes = {name: factory() for name, factory in factories.items()}
+        for proc in self.processes.values():
+            proc.start()
+        self._start_metrics_server()
+        signal.signal(signal.SIGTERM, self._shutdown)
+        signal.signal(signal.SIGINT, self._shutdown)
+        self._monitor(factories)
+
+    def replay(
+        self,
+        camera: str,
+        sources: List[str],
+        progress: ReplayProgress,
+        sample_fps: float = 0.0,
+        notify: bool = False,
+    ) -> float:
+        """
+        Run the pipeline over recorded footage instead of live cameras and return the
+        wall time until every worker has drained. Workers are not restarted here: they
+        exit in order as the replay worker's PoisonPill propagates.
+        """
+        try:
+            set_start_method("spawn")
+        except RuntimeError:
+            pass
+        configure_logging(os.getenv("LOG_LEVEL"))
+        # Replay decodes one recording at a time, as fast as it can.
+        self.cpu_budgets = self._plan_cpu_budgets(stream_cameras=1)
+        motion_feedback = MotionFeedback([camera])
+        # Backfill wants every frame, so replay never sheds.
+        self._build_frame_queues([camera], POLICY_BLOCK, motion_feedback)
+        factories = {
+            "ingestion": lambda: ReplayWorker(
+                self.frame_router,
+                camera=camera,
+                sources=sources,
+                stop_event=self.stop_event,
+                frame_pool=self._pool_for("ingestion"),
+                progress=progress,
+                sample_fps=sample_fps,
+                dedup_enabled=self.settings.dedup_enabled,
+                dedup_hamming_threshold=self.settings.dedup_hamming_threshold,
+                cpu_budget=self.cpu_budgets.get("ingestion"),
+                metrics=self._metrics_shard("ingestion"),
+            ),
+            # Backfilled footage is history; only alert on it when explicitly asked to.
+            **self._pipeline_factories(motion_feedback, self._telegram_settings() if notify else None),
+        }
+
+        started = time.monotonic()
+        self.metrics = PipelineMetrics(list(factories))
+        self.processes = {name: factory() for name, factory in factories.items()}
+        for proc in self.processes.values():
+            proc.start()
+        signal.signal(signal.SIGTERM, self._shutdown)
+        signal.signal(signal.SIGINT, self._shutdown)
+        last_report = started
+        for name, proc in self.processes.items():
+            while proc.is_alive():
+                proc.join(timeout=1)
+                now = time.monotonic()
+                if now - last_report >= self.settings.heartbeat_interval:
+                    last_report = now
+                    logger.info(
+                        "Replay progress",
+                        extra={
+                            "extra_payload": {
+                                "frames_read": progress.frames_read.value,
+                                "frames_enqueued": progress.frames_enqueued.value,
+                                "frames_per_second": round(progress.frames_enqueued.value / (now - started), 2),
+                                "waiting_on": name,
+                            }
+                        },
+                    )
+        elapsed = time.monotonic() - started
+        self.frame_pool.close()
+        return elapsed
+
+    def _build_frame_queues(
+        self,
+        cameras: List[str],
+        policy: str,
+        motion_feedback: MotionFeedback,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        capacity = self.settings.queue_size
+        if policy != POLICY_BLOCK:
+            # Shed in the queue, not in the frame pool: queued frames may hold at most half
+            # the pool slots, so ingestion does not end up waiting on a slot instead.
+            capacity = min(capacity, max(1, self.settings.frame_pool_slots // (2 * self.detection_workers)))
+        self.frame_queues = [
+            CameraFrameQueue(
+                cameras,
+                self.frame_pool,
+                capacity=capacity,
+                policy=policy,
+                per_camera=self.settings.frame_queue_per_camera,
+                motion_feedback=motion_feedback,
+                motion_hold_seconds=self.settings.adaptive_motion_hold_seconds,
+                weights=weights,
+            )
+            for _ in range(self.detection_workers)
+        ]
+        self.frame_router = FrameRouter(self.frame_queues)
+
+    def _telegram_settings(self) -> Optional[TelegramSettings]:
         if self.settings.notifications_enabled and self.settings.telegram_bot_token and self.settings.telegram_chat_id:
-            telegram_settings = TelegramSettings(
+            return TelegramSettings(
                 token=self.settings.telegram_bot_token,
                 chat_id=self.settings.telegram_chat_id,
                 debounce_seconds=self.settings.notification_debounce_seconds,
             )
+        return None
 
-        factories = {
-            "ingestion": lambda: IngestionWorker(self.frame_queue, cameras=cameras, stop_event=self.stop_event),
-            "detection": lambda: DetectionWorker(
-                self.frame_queue,
-                self.person_queue,
-                self.vehicle_queue,
-                self.stop_event,
-                motion_history=self.settings.motion_history,
-                motion_kernel_size=self.settings.motion_kernel_size,
-                motion_min_area=self.settings.motion_min_area,
-                motion_debug_dir=self.settings.motion_debug_dir,
-                motion_max_foreground_ratio=self.settings.motion_max_foreground_ratio,
-            ),
-            "person_writer": lambda: PersonEventWriter(
-                self.person_queue,
+    def _pipeline_factories(self, motion_feedback: MotionFeedback, telegram_settings: Optional[TelegramSettings]) -> dict:
+        """Factories for everything downstream of ingestion, shared by live and replay runs."""
+        return {
+            **{
+                f"detection-{idx}": (lambda idx=idx: self._detection_worker(idx, motion_feedback))
+                for idx in range(self.detection_workers)
+            },
+            "event_writer": lambda: EventWriter(
+                self.detections_queue,
                 self.notification_queue,
                 self.stop_event,
+                frame_pool=self._pool_for("event_writer"),
                 media_root=self.settings.media_root,
+                producers=self.detection_workers,
+                cpu_budget=self.cpu_budgets.get("event_writer"),
+                metrics=self._metrics_shard("event_writer"),
+                trace_sample_rate=self.settings.trace_sample_rate,
+                stats_interval=self.settings.heartbeat_interval,
             ),
-            "vehicle_writer": lambda: VehicleEventWriter(
-                self.vehicle_queue,
+            "notifier": lambda: NotificationWorker(
                 self.notification_queue,
                 self.stop_event,
-                media_root=self.settings.media_root,
+                settings=telegram_settings,
+                producers=1,
+                cpu_budget=self.cpu_budgets.get("notifier"),
+                metrics=self._metrics_shard("notifier"),
+                trace_sample_rate=self.settings.trace_sample_rate,
+                stats_interval=self.settings.heartbeat_interval,
             ),
-            "notifier": lambda: NotificationWorker(self.notification_queue, self.stop_event, settings=telegram_settings),
         }
 
-        self.processes = {name: factory() for name, factory in factories.items()}
-        for proc in self.processes.values():
-            proc.start()
-        signal.signal(signal.SIGTERM, self._shutdown)
-        signal.signal(signal.SIGINT, self._shutdown)
-        self._monitor(factories)
+    def _detection_worker(self, idx: int, motion_feedback: MotionFeedback) -> DetectionWorker:
+        return DetectionWorker(
+            self.frame_queues[idx],
+            self.detections_queue,
+            self.stop_event,
+            frame_pool=self._pool_for(f"detection-{idx}"),
+            motion_history=self.settings.motion_history,
+            motion_kernel_size=self.settings.motion_kernel_size,
+            motion_min_area=self.settings.motion_min_area,
+            motion_debug_dir=self.settings.motion_debug_dir,
+            motion_max_foreground_ratio=self.settings.motion_max_foreground_ratio,
+            motion_feedback=motion_feedback,
+            motion_max_width=self.settings.motion_max_width,
+            motion_static_ratio=self.settings.motion_static_ratio,
+            motion_decode_reduction=self.settings.motion_decode_reduction,
+            router=self.frame_router,
+            worker_index=idx,
+            batch_size=self.settings.detection_batch_size,
+            batch_wait_ms=self.settings.detection_batch_wait_ms,
+            stats_interval=self.settings.heartbeat_interval,
+            detector_backend=self.settings.detector_backend,
+            detector_imgsz=self.settings.detector_imgsz,
+            roi_enabled=self.settings.detection_roi_enabled,
+            roi_padding=self.settings.detection_roi_padding,
+            roi_min_size=self.settings.detection_roi_min_size,
+            roi_max_coverage=self.settings.detection_roi_max_coverage,
+            tracking_enabled=self.settings.tracking_enabled,
+            track_iou_threshold=self.settings.track_iou_threshold,
+            track_max_age=self.settings.track_max_age_seconds,
+            track_min_hits=self.settings.track_min_hits,
+            track_keyframe_seconds=self.settings.track_keyframe_seconds,
+            track_best_margin=self.settings.track_best_margin,
+            skip_enabled=self.settings.detection_skip_enabled,
+            skip_max_interval=self.settings.detection_skip_max_interval,
+            startup_budget_seconds=self.settings.detection_startup_budget_seconds,
+            camera_masks=self._camera_masks(),
+            screen_model_path=self.settings.detector_screen_model_path,
+            screen_low=self.settings.detector_screen_low,
+            screen_high=self.settings.detector_screen_high,
+            cpu_budget=self.cpu_budgets.get(f"detection-{idx}"),
+            metrics=self._metrics_shard(f"detection-{idx}"),
+        )
+
+    def _pool_for(self, process: str) -> FramePool:
+        return self.frame_pool.for_holder(self.pool_holders[process])
+
+    def _plan_cpu_budgets(self, stream_cameras: int = 0) -> Dict[str, CpuBudget]:
+        """Thread counts and affinity per process, from the core count and streams unless overridden per role."""
+        affinity = {}
+        for role in ROLES:
+            raw = getattr(self.settings, f"cpu_affinity_{role}")
+            try:
+                affinity[role] = parse_cpu_list(raw)
+            except ValueError as exc:
+                logger.warning("Ignoring invalid CPU affinity", extra={"extra_payload": {"role": role, "error": str(exc)}})
+        budgets = plan_cpu_budgets(
+            self.detection_workers,
+            threads={role: getattr(self.settings, f"cpu_threads_{role}") for role in ROLES},
+            affinity=affinity,
+            stream_cameras=stream_cameras,
+        )
+        logger.info(
+            "CPU budgets",
+            extra={"extra_payload": {name: budget.summary() for name, budget in budgets.items()}},
+        )
+        return budgets
+
+    def _camera_masks(self) -> dict[str, CameraMask]:
+        """
+        CAMERA_MASKS overlaid with the `camera_masks` row of the settings table (the table
+        wins per camera). Read whenever a detection worker is created, so a worker restart
+        picks up masks edited through the API.
+        """
+        masks = parse_camera_masks(self.settings.camera_masks_raw)
+        try:
+            with get_session() as session:
+                row = session.query(Setting).filter(Setting.key == CAMERA_MASKS_SETTING).first()
+                stored = row.value if row is not None else None
+        except Exception as exc:
+            logger.warning("Could not read camera masks from settings", extra={"extra_payload": {"error": str(exc)}})
+            stored = None
+        masks.update(parse_camera_masks(stored))
+        return masks
+
+    def _metrics_shard(self, process: str) -> Optional[MetricsShard]:
+        return self.metrics.shard(process) if self.metrics is not None else None
+
+    def _start_metrics_server(self) -> None:
+        if not self.settings.metrics_port:
+            return
+        try:
+            self.metrics_server = MetricsServer(
+                self.settings.metrics_host, self.settings.metrics_port, self.render_metrics, self.healthy
+            )
+        except OSError as exc:
+            logger.warning("Could not start the metrics endpoint", extra={"extra_payload": {"error": str(exc)}})
+            return
+        self.metrics_server.start()
+
+    def healthy(self) -> bool:
+        """
+        Every pipeline process is running (the monitor restarts dead ones within a second)
+        and frames are moving: the frame pool has not sat full, with no slot freed, for
+        FRAME_POOL_STALL_SECONDS.
+        """
+        if not self.processes or not all(proc.is_alive() for proc in self.processes.values()):
+            return False
+        return not self._pool_stalled
+
+    def _check_pool(self) -> None:
+        """Track frame pool progress and flag a stall; called from the monitor thread only."""
+        if self.settings.frame_pool_stall_seconds <= 0:
+            return
+        freed, since = self._pool_progress
+        now = time.monotonic()
+        if self.frame_pool.freed() != freed or self.frame_pool.in_use() < self.frame_pool.slot_count:
+            self._pool_progress = (self.frame_pool.freed(), now)
+            stalled = False
+        else:
+            stalled = now - since > self.settings.frame_pool_stall_seconds
+        if stalled and not self._pool_stalled:
+            logger.warning(
+                "Frame pool stalled",
+                extra={"extra_payload": {"slots": self.frame_pool.slot_count, "seconds": self.settings.frame_pool_stall_seconds}},
+            )
+        self._pool_stalled = stalled
+
+    def render_metrics(self) -> str:
+        """Worker counters summed over processes, plus queue depths and liveness read now."""
+        lines = self.metrics.render() if self.metrics is not None else []
+        frame_queue_stats = [(idx, queue.stats(reset_max=False)) for idx, queue in enumerate(self.frame_queues)]
+        lines += gauge_lines(
+            "camtelligence_queue_depth",
+            "Items waiting in each pipeline queue.",
+            [({"queue": "frames", "worker": str(idx)}, queue.qsize()) for idx, queue in enumerate(self.frame_queues)]
+            + [
+                ({"queue": "detections"}, _qsize(self.detections_queue)),
+                ({"queue": "notifications"}, _qsize(self.notification_queue)),
+            ],
+        )
+        lines += gauge_lines(
+            "camtelligence_frame_queue_dropped_total",
+            "Frames shed by the frame queue policy.",
+            [({"worker": str(idx)}, sum(entry.dropped for entry in stats)) for idx, stats in frame_queue_stats],
+            kind="counter",
+        )
+        lines += gauge_lines(
+            "camtelligence_frame_pool_slots_in_use", "Shared-memory frame slots in flight.", [({}, self.frame_pool.in_use())]
+        )
+        lines += gauge_lines(
+            "camtelligence_process_up",
+            "1 while the pipeline process is running.",
+            [({"process": name}, int(proc.is_alive())) for name, proc in self.processes.items()],
+        )
+        return "\n".join(lines) + "\n"
 
     def _monitor(self, factories) -> None:
         while not self.stop_event.is_set():
             for name, proc in list(self.processes.items()):
                 if not proc.is_alive():
-                    logger.warning("Process died, restarting", extra={"extra_payload": {"process": name}})
+                    # Frames the dead process was holding (a pending batch, the writer's job) would
+                    # otherwise keep their slots forever.
+                    reclaimed = self.frame_pool.reclaim(self.pool_holders[name]) if name in self.pool_holders else 0
+                    logger.warning(
+                        "Process died, restarting",
+                        extra={"extra_payload": {"process": name, "frame_refs_reclaimed": reclaimed}},
+                    )
+                    if isinstance(proc, DetectionWorker):
+                        # A crashed worker cannot unmark itself; move its cameras until the replacement is ready.
+                        self.frame_router.mark(proc.worker_index, False)
                     replacement = factories[name]()
                     replacement.start()
                     self.processes[name] = replacement
+            self._check_pool()
             time.sleep(1)
 
     def _shutdown(self, *_args) -> None:
         self.stop_event.set()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
         try:
-            self.frame_queue.put_nowait(PoisonPill())
-            self.person_queue.put_nowait(PoisonPill())
-            self.vehicle_queue.put_nowait(PoisonPill())
+            if self.frame_router is not None:
+                self.frame_router.put_nowait(PoisonPill())
+            self.detections_queue.put_nowait(PoisonPill())
             self.notification_queue.put_nowait(PoisonPill())
         except Exception:
             pass
         for proc in self.processes.values():
             if proc.is_alive():
                 proc.join(timeout=2)
+        self.frame_pool.close()
+
+
+def _qsize(queue) -> int:
+    try:
+        return queue.qsize()
+    except NotImplementedError:  # macOS multiprocessing queues
+        return 0
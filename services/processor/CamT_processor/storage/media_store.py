@@ -19,6 +19,9 @@ class FileSystemMediaStore:
     def save_vehicle_crop(self, frame_id: UUID, image_bytes: bytes) -> str:
         return self._write(MediaType.vehicle_crop, frame_id, image_bytes, unique=True)
 
+    def save_crop(self, media_type: MediaType, frame_id: UUID, image_bytes: bytes) -> str:
+        return self._write(media_type, frame_id, image_bytes, unique=True)
+
     def _write(self, media_type: MediaType, frame_id: UUID, data: bytes, tag: str = "", unique: bool = False) -> str:
         folder = self.root / media_type.value
         folder.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,45 @@
+"""
+YOLO latency and throughput per batch size and inference backend.
+
+Runs CocoYoloDetector.predict_batch on synthetic 720p frames for each batch size and
+reports wall time per batch, per frame, and frames per second. Use the model the
+processor runs (YOLO_MODEL_PATH); an architecture yaml such as yolov8n.yaml works
+offline with random weights, which is enough for timing.
+
+    python services/processor/benchmarks/bench_batching.py [--backend onnxruntime] [--model yolov8s.onnx] [--sizes 1,2,4,8]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from bench_frame_path import synthetic_frame  # noqa: E402
+from CamT_processor.detector.yolo_detector import CocoYoloDetector  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Model path (default: env YOLO_MODEL_PATH or bundled yolov8s.pt).")
+    parser.add_argument("--backend", default=None, help="ultralytics, onnxruntime or openvino (default: env DETECTOR_BACKEND).")
+    parser.add_argument("--sizes", default="1,2,4,8")
+    parser.add_argument("--batches", type=int, default=5)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    detector = CocoYoloDetector(model_path=args.model, backend=args.backend)
+    frames = [synthetic_frame(1280, 720, seed=idx) for idx in range(max(sizes))]
+    detector.predict_batch(frames[:1])  # model fuse and first-call allocations
+
+    print(f"{'batch':>5} {'ms/batch':>9} {'ms/frame':>9} {'frames/s':>9}")
+    for size in sizes:
+        start = time.perf_counter()
+        for _ in range(args.batches):
+            detector.predict_batch(frames[:size])
+        per_batch = (time.perf_counter() - start) / args.batches
+        print(f"{size:>5} {per_batch * 1000:>9.1f} {per_batch / size * 1000:>9.1f} {size / per_batch:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-frame CPU cost of handing a decoded stream frame to detection.
+
+Compares the old path (JPEG encode in ingestion, decode in detection) with the raw
+path (copy into a FramePool slot, zero-copy view in detection).
+
+    python services/processor/benchmarks/bench_frame_path.py [--iterations 50]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.image_ops import decode_image, encode_jpeg  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Camera-like frame: smooth gradients, some shapes and mild sensor noise."""
+    rng = np.random.default_rng(seed)
+    xs = np.linspace(0, 255, width, dtype=np.float32)
+    ys = np.linspace(0, 255, height, dtype=np.float32)
+    base = (xs[None, :] * 0.6 + ys[:, None] * 0.4).astype(np.uint8)
+    frame = cv2.merge([base, np.flipud(base), np.fliplr(base)])
+    for _ in range(40):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(frame, (x, y), (x + int(rng.integers(20, 200)), y + int(rng.integers(20, 200))), color, -1)
+    noise = rng.normal(0, 4, frame.shape).astype(np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def cpu_per_frame(fn, iterations: int) -> float:
+    fn()  # warm caches and lazy allocations
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    pool = FramePool(slot_count=2, slot_size=1920 * 1080 * 3)
+    try:
+        print(f"{'resolution':<10} {'jpeg round trip ms':>20} {'raw pool ms':>12} {'saved ms':>10}")
+        for label, (width, height) in RESOLUTIONS.items():
+            frame = synthetic_frame(width, height)
+
+            def jpeg_round_trip() -> None:
+                ref = pool.put(encode_jpeg(frame))
+                decode_image(pool.view(ref))
+                pool.release(ref)
+
+            def raw_path() -> None:
+                ref = pool.put(frame, shape=frame.shape)
+                pool.image(ref)
+                pool.release(ref)
+
+            jpeg_ms = cpu_per_frame(jpeg_round_trip, args.iterations)
+            raw_ms = cpu_per_frame(raw_path, args.iterations)
+            print(f"{label:<10} {jpeg_ms:>20.2f} {raw_ms:>12.2f} {jpeg_ms - raw_ms:>10.2f}")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
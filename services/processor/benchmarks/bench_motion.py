@@ -0,0 +1,110 @@
+"""
+CPU per frame and motion recall of MovementDetector configurations.
+
+Replays a synthetic 1080p sequence (static scene with sensor noise, a walking-speed
+object, a static gap, then a slow-moving object) through each configuration, for
+both JPEG input (file-drop cameras) and raw BGR input (streams).
+
+    python services/processor/benchmarks/bench_motion.py [--frames 240]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from bench_frame_path import synthetic_frame  # noqa: E402
+from CamT_processor.detector.movement_detector import MovementDetector  # noqa: E402
+from CamT_processor.image_ops import decode_image, encode_jpeg  # noqa: E402
+
+WIDTH, HEIGHT = 1920, 1080
+OBJECT_W, OBJECT_H = 120, 260
+
+CONFIGS = {
+    "current (full res)": ({}, 1),
+    "downscaled 640": ({"max_width": 640}, 2),
+    "downscaled + static precheck": ({"max_width": 640, "static_ratio": 0.001}, 2),
+}
+
+
+def object_box(idx: int, frames: int):
+    """Ground-truth box or None. Quarter 2 moves fast, quarter 4 moves slowly."""
+    quarter = frames // 4
+    if quarter <= idx < 2 * quarter:
+        x = 100 + (idx - quarter) * 15
+    elif 3 * quarter <= idx < frames:
+        x = 300 + (idx - 3 * quarter) * 3
+    else:
+        return None
+    return (x, 500, OBJECT_W, OBJECT_H)
+
+
+def render(background: np.ndarray, box, rng) -> np.ndarray:
+    frame = background.copy()
+    if box is not None:
+        x, y, w, h = box
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (235, 235, 235), -1)
+        cv2.circle(frame, (x + w // 2, y - 30), 30, (20, 20, 20), -1)
+    noise = rng.normal(0, 3, frame.shape[:2]).astype(np.int16)[..., None]
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def overlaps(a, b) -> bool:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=240)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    rng = np.random.default_rng(1)
+    background = synthetic_frame(WIDTH, HEIGHT, seed=3)
+    frames = []
+    for idx in range(args.frames):
+        box = object_box(idx, args.frames)
+        raw = render(background, box, rng)
+        frames.append((box, raw, encode_jpeg(raw)))
+
+    print(f"{'configuration':<30} {'input':<5} {'cpu ms/frame':>12} {'recall':>7} {'static fp':>9} {'skipped':>7}")
+    for label, (kwargs, reduction) in CONFIGS.items():
+        for source in ("jpeg", "raw"):
+            detector = MovementDetector(**kwargs)
+            cpu = 0.0
+            motion_frames = hits = static_frames = false_positive = 0
+            for idx, (box, raw, encoded) in enumerate(frames):
+                start = time.process_time()
+                if source == "jpeg":
+                    if reduction > 1:
+                        image = decode_image(encoded, reduction=reduction, grayscale=True)
+                    else:
+                        image = decode_image(encoded)
+                    boxes = detector.detect(image, input_scale=float(reduction))
+                else:
+                    boxes = detector.detect(raw)
+                cpu += time.process_time() - start
+                if idx < 20:
+                    continue  # background model still settling
+                if box is None:
+                    static_frames += 1
+                    false_positive += int(bool(boxes))
+                else:
+                    motion_frames += 1
+                    hits += int(any(overlaps(b, box) for b in boxes))
+            recall = hits / motion_frames if motion_frames else 0.0
+            fp_rate = false_positive / static_frames if static_frames else 0.0
+            print(
+                f"{label:<30} {source:<5} {cpu / len(frames) * 1000:>12.2f} {recall:>7.2%} {fp_rate:>9.2%} "
+                f"{detector.static_skipped:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+CPU cost of turning YOLO output into the detections that reach the writers, on crowded
+scenes.
+
+Compares the old per-box path (Python loop over boxes, a JPEG crop for every person and
+vehicle, then a Python box-vs-motion-box loop) with the array path (split_detections,
+the motion_overlap intersection matrix, and crops encoded only for the survivors, as the
+writers now do). About half of the boxes lie outside the motion boxes. The last column
+is the share left in the detection worker once encoding has moved to the writers.
+
+    python services/processor/benchmarks/bench_postprocess.py [--boxes 30,60,120] [--iterations 50]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from bench_frame_path import cpu_per_frame, synthetic_frame  # noqa: E402
+from CamT_processor.detector.roi import motion_overlap  # noqa: E402
+from CamT_processor.detector.yolo_detector import PERSON_CLASS_ID, VEHICLE_CLASS_IDS, split_detections  # noqa: E402
+from CamT_processor.image_ops import crop, encode_jpeg  # noqa: E402
+
+WIDTH, HEIGHT = 1920, 1080
+MIN_VEHICLE_CONF = 0.3
+OVERLAP_THRESHOLD = 0.1
+# Motion on the left half of the frame only.
+MOTION_BOXES = [(0, 0, 480, 540), (480, 0, 480, 540), (0, 540, 960, 540)]
+
+
+def crowded_rows(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    x1 = rng.uniform(0, WIDTH - 200, count)
+    y1 = rng.uniform(0, HEIGHT - 300, count)
+    w = rng.uniform(40, 200, count)
+    h = rng.uniform(80, 300, count)
+    score = rng.uniform(0.4, 0.95, count)
+    cls = rng.choice([0, 0, 0, 2, 2, 7], count)
+    return np.stack([x1, y1, x1 + w, y1 + h, score, cls], axis=1).astype(np.float32)
+
+
+def legacy(rows: np.ndarray, image: np.ndarray) -> list:
+    kept = []
+    for x1, y1, x2, y2, conf, cls in rows.tolist():
+        cls_id = int(cls)
+        if cls_id != PERSON_CLASS_ID and (cls_id not in VEHICLE_CLASS_IDS or conf < MIN_VEHICLE_CONF):
+            continue
+        w, h = x2 - x1, y2 - y1
+        cropped = crop(image, (x1, y1, w, h))
+        if cropped.size == 0:
+            continue
+        bbox, crop_bytes = (int(x1), int(y1), int(w), int(h)), encode_jpeg(cropped)
+        bx, by, bw, bh = bbox
+        for mx, my, mw, mh in MOTION_BOXES:
+            inter_w = min(bx + bw, mx + mw) - max(bx, mx)
+            inter_h = min(by + bh, my + mh) - max(by, my)
+            if inter_w > 0 and inter_h > 0 and inter_w * inter_h >= bw * bh * OVERLAP_THRESHOLD:
+                kept.append((bbox, crop_bytes))
+                break
+    return kept
+
+
+def vectorised(rows: np.ndarray, image: np.ndarray, encode: bool = True) -> list:
+    detections = split_detections(rows, image.shape, MIN_VEHICLE_CONF)
+    kept = []
+    for found in detections.values():
+        keep = motion_overlap([det.bbox for det in found], MOTION_BOXES, OVERLAP_THRESHOLD)
+        kept.extend(
+            (det.bbox, encode_jpeg(crop(image, det.bbox)) if encode else None)
+            for det, ok in zip(found, keep.tolist())
+            if ok
+        )
+    return kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boxes", default="30,60,120")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    image = synthetic_frame(WIDTH, HEIGHT)
+    print(f"{'boxes':>5} {'kept':>5} {'per-box ms':>11} {'vectorised ms':>14} {'speedup':>8} {'detection-side ms':>18}")
+    for count in (int(value) for value in args.boxes.split(",")):
+        rows = crowded_rows(count)
+        old, new = legacy(rows, image), vectorised(rows, image)
+        assert sorted(bbox for bbox, _ in old) == sorted(bbox for bbox, _ in new)
+        old_ms = cpu_per_frame(lambda: legacy(rows, image), args.iterations)
+        new_ms = cpu_per_frame(lambda: vectorised(rows, image), args.iterations)
+        worker_ms = cpu_per_frame(lambda: vectorised(rows, image, encode=False), args.iterations)
+        print(f"{count:>5} {len(new):>5} {old_ms:>11.2f} {new_ms:>14.2f} {old_ms / new_ms:>7.1f}x {worker_ms:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
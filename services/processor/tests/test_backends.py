@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.detector.backends import create_backend  # noqa: E402
+from CamT_processor.detector.backends.base import postprocess, preprocess  # noqa: E402
+from CamT_processor.detector.yolo_detector import split_detections  # noqa: E402
+
+
+def _head(boxes, num_classes=8):
+    """Raw YOLOv8 output for one image: rows of (cx, cy, w, h, class_id, score)."""
+    pred = np.zeros((4 + num_classes, len(boxes)), dtype=np.float32)
+    for idx, (cx, cy, w, h, cls, score) in enumerate(boxes):
+        pred[:4, idx] = (cx, cy, w, h)
+        pred[4 + cls, idx] = score
+    return pred[None]
+
+
+def test_preprocess_pads_dynamic_models_to_stride_only():
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    square, _ = preprocess([frame], 640)
+    blob, metas = preprocess([frame], 640, stride=32)
+    assert square.shape == (1, 3, 640, 640)
+    assert blob.shape == (1, 3, 384, 640)
+    assert metas[0][0] == pytest.approx(0.5)
+
+
+def test_postprocess_undoes_letterbox_and_runs_class_aware_nms():
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    _, metas = preprocess([frame], 640)  # 640x360 image padded by 140 rows top and bottom
+    output = _head(
+        [
+            (100, 240, 40, 80, 0, 0.9),  # person
+            (102, 242, 40, 80, 0, 0.6),  # same person, suppressed
+            (101, 241, 40, 80, 2, 0.8),  # car in the same place, kept (other class)
+            (300, 300, 20, 20, 0, 0.2),  # below confidence
+            (400, 300, 20, 20, 4, 0.9),  # class not requested
+        ]
+    )
+    (rows,) = postprocess(output, metas, [(720, 1280)], 0.4, 0.45, classes=[0, 1, 2, 3, 5, 6, 7])
+    rows = rows[np.argsort(-rows[:, 4])]
+    assert rows[:, 5].tolist() == [0, 2]
+    assert rows[0, :4] == pytest.approx([160, 120, 240, 280])
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("tensorrt", "model.onnx", 0.4, 0.45)
+
+
+def test_split_detections_filters_classes_confidence_and_empty_boxes():
+    rows = np.array(
+        [
+            [10, 10, 50, 90, 0.9, 0],  # person
+            [100, 100, 300, 200, 0.5, 2],  # car
+            [100, 100, 300, 200, 0.2, 7],  # truck below vehicle confidence
+            [10, 10, 50, 90, 0.9, 15],  # not a tracked class
+            [1280, 10, 1300, 50, 0.9, 0],  # entirely right of the frame
+        ],
+        dtype=np.float32,
+    )
+    detections = split_detections(rows, (720, 1280, 3), min_vehicle_confidence=0.3)
+    assert [d.bbox for d in detections["persons"]] == [(10, 10, 40, 80)]
+    assert [d.bbox for d in detections["vehicles"]] == [(100, 100, 200, 100)]
+    assert detections["persons"][0].crop_bytes is None
+
+
+def test_static_batch_exports_get_split_and_padded_batches():
+    from CamT_processor.detector.backends.onnx_backend import OnnxRuntimeBackend
+
+    class _Session:
+        def __init__(self):
+            self.batches = []
+
+        def run(self, _outputs, feeds):
+            blob = feeds["images"]
+            self.batches.append(blob.shape[0])
+            # One person per image, its box width encoding the image's fill value.
+            return [np.concatenate([_head([(320, 320, 10 + blob[i, 0, 320, 320] * 255, 20, 0, 0.9)]) for i in range(len(blob))])]
+
+    backend = OnnxRuntimeBackend.__new__(OnnxRuntimeBackend)
+    backend.session, backend.input_name = _Session(), "images"
+    backend.fixed_batch, backend.dynamic_shape, backend.imgsz = 4, False, 640
+    backend.conf_threshold, backend.iou_threshold, backend.classes = 0.4, 0.45, None
+    images = [np.full((640, 640, 3), value, dtype=np.uint8) for value in range(6)]
+    results = backend.predict(images)
+    assert backend.session.batches == [4, 4]
+    assert len(results) == 6
+    assert [round(float(rows[0, 2] - rows[0, 0])) for rows in results] == [10 + value for value in range(6)]
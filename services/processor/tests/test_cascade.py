@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.detector import yolo_detector  # noqa: E402
+from CamT_processor.detector.yolo_detector import CocoYoloDetector  # noqa: E402
+
+
+class _ScoreBackend:
+    """Returns one person box per image, scored by the image's first pixel (x 0.01)."""
+
+    def __init__(self, model_path: str) -> None:
+        self.model_path = model_path
+        self.calls = 0
+
+    def predict(self, images, size=None):
+        self.calls += len(images)
+        rows = []
+        for image in images:
+            score = image[0, 0, 0] / 100.0
+            rows.append(np.array([[10, 10, 50, 90, score, 0]], dtype=np.float32) if score else np.zeros((0, 6), np.float32))
+        return rows
+
+
+def _detector(monkeypatch) -> CocoYoloDetector:
+    monkeypatch.setattr(yolo_detector, "create_backend", lambda name, model_path, *args, **kwargs: _ScoreBackend(model_path))
+    return CocoYoloDetector(
+        model_path="large", conf_threshold=0.35, screen_model_path="nano", screen_low=0.2, screen_high=0.6
+    )
+
+
+def _image(score_pct: int) -> np.ndarray:
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    image[0, 0, 0] = score_pct
+    return image
+
+
+def test_only_frames_in_the_uncertain_band_reach_the_large_model(monkeypatch):
+    detector = _detector(monkeypatch)
+    assert detector.screen_backend.model_path == "nano" and detector.backend.model_path == "large"
+    results = detector.predict_batch([_image(0), _image(10), _image(40), _image(80)])
+
+    assert detector.screen_backend.calls == 4
+    assert detector.backend.calls == 1  # only the 0.4 frame
+    # Screening candidates below conf_threshold are dropped, confident ones kept.
+    assert [len(result["persons"]) for result in results] == [0, 0, 1, 1]
+    assert detector.cascade_stats.summary() == {
+        "frames": 4,
+        "escalated": 1,
+        "screen_confident": 1,
+        "screen_empty": 2,
+        "escalation_rate": 0.25,
+    }
+
+
+def test_without_a_screening_model_every_frame_uses_the_main_model(monkeypatch):
+    monkeypatch.setattr(yolo_detector, "create_backend", lambda name, model_path, *args, **kwargs: _ScoreBackend(model_path))
+    detector = CocoYoloDetector(model_path="large", conf_threshold=0.35, screen_model_path="")
+    detector.predict_batch([_image(10), _image(80)])
+    assert detector.screen_backend is None and detector.backend.calls == 2
+    assert detector.cascade_stats.frames == 0
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from CamT_processor.pipeline.cpu import CpuBudget, parse_cpu_list, plan_cpu_budgets  # noqa: E402
+
+
+def test_detection_workers_get_disjoint_cores_and_the_rest_share_one():
+    budgets = plan_cpu_budgets(2, cpus=range(8))
+    assert budgets["detection-0"] == CpuBudget(threads=4, cpus=(1, 2, 3, 4))
+    assert budgets["detection-1"] == CpuBudget(threads=3, cpus=(5, 6, 7))
+    for name in ("ingestion", "event_writer", "notifier"):
+        assert budgets[name] == CpuBudget(threads=1, cpus=(0,))
+
+
+def test_small_boxes_are_not_pinned_and_overrides_win():
+    budgets = plan_cpu_budgets(2, cpus=range(3))
+    assert budgets["detection-0"] == CpuBudget(threads=1, cpus=None)
+    assert budgets["ingestion"].cpus is None
+
+    budgets = plan_cpu_budgets(
+        2, cpus=range(8), threads={"detection": 2, "writer": 0}, affinity={"detection": parse_cpu_list("4-7")}
+    )
+    assert [budgets[f"detection-{idx}"] for idx in range(2)] == [CpuBudget(2, (4, 5)), CpuBudget(2, (6, 7))]
+    assert budgets["event_writer"] == CpuBudget(threads=1, cpus=(0,))
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-2, 6") == (0, 1, 2, 6)
+    assert parse_cpu_list(" ") is None
+    with pytest.raises(ValueError):
+        parse_cpu_list("a-b")
+
+
+def test_budget_is_applied_to_the_calling_process():
+    code = (
+        "import os, cv2; from CamT_processor.pipeline.cpu import CpuBudget, apply_cpu_budget; "
+        "cpu = min(os.sched_getaffinity(0)); apply_cpu_budget(CpuBudget(threads=2, cpus=(cpu,))); "
+        "print(cv2.getNumThreads(), os.environ['OMP_NUM_THREADS'], os.sched_getaffinity(0) == {cpu})"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["2", "2", "True"]
+
+
+def test_stream_cameras_widen_the_shared_set_for_decoding():
+    budgets = plan_cpu_budgets(2, cpus=range(8), stream_cameras=12)
+    assert budgets["ingestion"] == CpuBudget(threads=1, cpus=(0, 1, 2, 3))
+    assert budgets["detection-0"].cpus == (4, 5) and budgets["detection-1"].cpus == (6, 7)
+    # Detection keeps a core per worker however many streams there are.
+    budgets = plan_cpu_budgets(2, cpus=range(4), stream_cameras=40)
+    assert budgets["ingestion"].cpus == (0, 1)
+    assert [budgets[f"detection-{idx}"].cpus for idx in range(2)] == [(2,), (3,)]
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.image_ops import encode_jpeg  # noqa: E402
+from CamT_processor.pipeline.dedup import FrameDeduplicator  # noqa: E402
+
+
+def _scene(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (18, 32, 3), dtype=np.uint8)
+    return cv2.resize(small, (640, 360), interpolation=cv2.INTER_CUBIC)
+
+
+def test_exact_duplicates_are_dropped_per_camera():
+    dedup = FrameDeduplicator()
+    encoded = encode_jpeg(_scene())
+    assert dedup.check("front", encoded) is None
+    assert dedup.check("front", encoded) == "exact"
+    assert dedup.check("back", encoded) is None
+    stats = dedup.stats()
+    assert (stats["front"].frames, stats["front"].exact_dropped) == (2, 1)
+
+
+def test_near_duplicates_dropped_but_changes_pass():
+    dedup = FrameDeduplicator(hamming_threshold=1)
+    frame = _scene()
+    noisy = np.clip(frame.astype(np.int16) + 1, 0, 255).astype(np.uint8)
+    assert dedup.check("front", frame, shape=frame.shape) is None
+    assert dedup.check("front", noisy, shape=noisy.shape) == "near"
+
+    changed = frame.copy()
+    cv2.rectangle(changed, (200, 100), (320, 300), (255, 255, 255), -1)
+    assert dedup.check("front", changed, shape=changed.shape) is None
+    assert dedup.stats()["front"].near_dropped == 1
+
+
+def test_negative_threshold_only_drops_exact_copies():
+    dedup = FrameDeduplicator(hamming_threshold=-1)
+    frame = _scene()
+    noisy = np.clip(frame.astype(np.int16) + 1, 0, 255).astype(np.uint8)
+    assert dedup.check("front", frame, shape=frame.shape) is None
+    assert dedup.check("front", noisy, shape=noisy.shape) is None
+    assert dedup.check("front", noisy.copy(), shape=noisy.shape) == "exact"
+
+
+def test_small_object_moving_on_static_scene_is_never_dropped_by_default():
+    background = cv2.resize(_scene(), (1920, 1080), interpolation=cv2.INTER_CUBIC)
+    dedup = FrameDeduplicator()
+    for step in range(60):
+        frame = background.copy()
+        x = 200 + step * 20
+        cv2.rectangle(frame, (x, 600), (x + 30, 670), (40, 40, 40), -1)
+        assert dedup.check("drive", frame, shape=frame.shape) is None
+    assert dedup.stats()["drive"].near_dropped == 0
+
+
+def test_near_drops_in_a_row_are_capped():
+    dedup = FrameDeduplicator(hamming_threshold=256, max_near_drops=2)
+    frame = _scene()
+    results = []
+    for step in range(6):
+        noisy = np.clip(frame.astype(np.int16) + step + 1, 0, 255).astype(np.uint8)
+        results.append(dedup.check("front", noisy, shape=noisy.shape))
+    assert results == [None, "near", "near", None, "near", "near"]
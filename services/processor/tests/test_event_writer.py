@@ -0,0 +1,217 @@
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from queue import Queue
+from threading import Event
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT.parent / "core"))
+
+from ct_core.models import Base, JobRecord, MediaAsset, MediaType, PersonEvent, VehicleEvent  # noqa: E402
+
+from CamT_processor.detector.tracker import TRACK_BEST, TRACK_START  # noqa: E402
+from CamT_processor.dto import Detection, FrameDetections, LatencyTrace, PoisonPill  # noqa: E402
+from CamT_processor.notifications import telegram  # noqa: E402
+from CamT_processor.pipeline import event_writer  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+
+
+def test_frame_with_people_and_vehicles_is_stored_once(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def _session():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(event_writer, "get_session", _session)
+    pool = FramePool(slot_count=2, slot_size=240 * 320 * 3)
+    try:
+        image = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        frame = pool.put(image.tobytes(), shape=image.shape)
+        notifications = Queue()
+        writer = event_writer.EventWriter(
+            None, notifications, None, frame_pool=pool, media_root=str(tmp_path), trace_sample_rate=1.0
+        )
+        writer._handle_job(
+            FrameDetections(
+                frame_id=uuid4(),
+                camera="drive",
+                captured_at=datetime(2026, 1, 1),
+                frame=frame,
+                persons=[Detection(bbox=(10, 10, 40, 80), score=0.8)],
+                vehicles=[Detection(bbox=(100, 50, 120, 60), score=0.7), Detection(bbox=(200, 120, 90, 50), score=0.6)],
+                trace=LatencyTrace().mark("captured", 1000.0).mark("inferred", 1000.2),
+            )
+        )
+    finally:
+        pool.close()
+
+    session = Session()
+    frames = session.query(MediaAsset).filter(MediaAsset.media_type == MediaType.frame).all()
+    assert len(frames) == 1 and len(list((tmp_path / MediaType.frame.value).iterdir())) == 1
+    events = session.query(PersonEvent).all() + session.query(VehicleEvent).all()
+    assert len(events) == 3 and {event.frame_asset_id for event in events} == {frames[0].id}
+    notes = [notifications.get_nowait() for _ in range(3)]
+    assert sorted(note.event_type for note in notes) == ["person", "vehicle", "vehicle"]
+    assert all(note.trace.at("committed") and note.trace.at("inferred") == 1000.2 for note in notes)
+    traces = session.query(JobRecord).filter(JobRecord.job_type == "latency_trace").all()
+    assert len(traces) == 1 and set(traces[0].payload["stamps"]) == {"captured", "inferred", "committed"}
+    assert {note.trace_id for note in notes} == {traces[0].id}
+    session.close()
+
+    # The notifier completes the stored trace with the first notification of the frame.
+    monkeypatch.setattr(telegram, "get_session", _session)
+    notifier = telegram.NotificationWorker(None, None, None, trace_sample_rate=1.0)
+    for note in notes:
+        notifier._record_latency(note)
+    (trace,) = Session().query(JobRecord).filter(JobRecord.job_type == "latency_trace").all()
+    assert set(trace.payload["stamps"]) == {"captured", "inferred", "committed", "notified"}
+    assert trace.payload["stage_ms"]["notified"] >= 0 and "total" in trace.payload["stage_ms"]
+
+
+def test_best_crop_of_a_track_updates_its_event(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def _session():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(event_writer, "get_session", _session)
+    pool = FramePool(slot_count=2, slot_size=240 * 320 * 3)
+    notifications = Queue()
+    writer = event_writer.EventWriter(None, notifications, None, frame_pool=pool, media_root=str(tmp_path))
+    try:
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        for score, track_event in ((1.5, TRACK_START), (3.5, TRACK_BEST)):
+            frame = pool.put(image.tobytes(), shape=image.shape)
+            writer._handle_job(
+                FrameDetections(
+                    frame_id=uuid4(),
+                    camera="drive",
+                    captured_at=datetime(2026, 1, 1),
+                    frame=frame,
+                    persons=[Detection(bbox=(10, 10, 40, 80), score=score, track_id="t1", track_event=track_event)],
+                )
+            )
+            pool.release(frame)
+    finally:
+        pool.close()
+
+    session = Session()
+    (event,) = session.query(PersonEvent).all()
+    crops = session.query(MediaAsset).filter(MediaAsset.media_type == MediaType.person_crop).all()
+    assert event.score == 3 and [crop.id for crop in crops] == [event.crop_asset_id]
+    assert len(list((tmp_path / MediaType.person_crop.value).iterdir())) == 1
+    frames = session.query(MediaAsset).filter(MediaAsset.media_type == MediaType.frame).all()
+    assert [frame.id for frame in frames] == [event.frame_asset_id]
+    assert len(list((tmp_path / MediaType.frame.value).iterdir())) == 1
+    assert notifications.qsize() == 1
+
+
+def test_replaced_frame_is_kept_while_another_event_uses_it(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def _session():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(event_writer, "get_session", _session)
+    pool = FramePool(slot_count=2, slot_size=240 * 320 * 3)
+    writer = event_writer.EventWriter(None, Queue(), None, frame_pool=pool, media_root=str(tmp_path))
+    frames = [
+        [("t1", 1.5, TRACK_START), ("t2", 1.5, TRACK_START)],
+        [("t1", 3.5, TRACK_BEST)],
+        [("t2", 3.5, TRACK_BEST)],
+    ]
+    try:
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        for persons in frames:
+            frame = pool.put(image.tobytes(), shape=image.shape)
+            writer._handle_job(
+                FrameDetections(
+                    frame_id=uuid4(),
+                    camera="drive",
+                    captured_at=datetime(2026, 1, 1),
+                    frame=frame,
+                    persons=[
+                        Detection(bbox=(10, 10, 40, 80), score=score, track_id=track_id, track_event=track_event)
+                        for track_id, score, track_event in persons
+                    ],
+                )
+            )
+            pool.release(frame)
+    finally:
+        pool.close()
+
+    # The first frame outlived t1's upgrade because t2 still pointed at it, then went with t2's.
+    session = Session()
+    events = session.query(PersonEvent).all()
+    stored = session.query(MediaAsset).filter(MediaAsset.media_type == MediaType.frame).all()
+    assert len(events) == 2 and {frame.id for frame in stored} == {event.frame_asset_id for event in events}
+    assert len(stored) == 2 and len(list((tmp_path / MediaType.frame.value).iterdir())) == 2
+
+
+def test_frame_that_fails_to_encode_is_skipped_and_released(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def _session():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(event_writer, "get_session", _session)
+    pool = FramePool(slot_count=2, slot_size=240 * 320 * 3)
+    jobs = Queue()
+    try:
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        broken = pool.put(b"not a jpeg")
+        frame = pool.put(image.tobytes(), shape=image.shape)
+        for ref in (broken, frame):
+            jobs.put(
+                FrameDetections(
+                    frame_id=uuid4(),
+                    camera="drive",
+                    captured_at=datetime(2026, 1, 1),
+                    frame=ref,
+                    persons=[Detection(bbox=(1, 1, 2, 2), score=0.8)],
+                )
+            )
+        jobs.put(PoisonPill())
+        writer = event_writer.EventWriter(jobs, Queue(), Event(), frame_pool=pool, media_root=str(tmp_path))
+        writer.run()
+        assert pool.in_use() == 0
+    finally:
+        pool.close()
+
+    session = Session()
+    assert len(session.query(PersonEvent).all()) == 1
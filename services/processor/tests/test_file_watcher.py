@@ -0,0 +1,65 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.pipeline.file_watcher import CursorStore, DirectoryWatcher, FileCursor  # noqa: E402
+
+
+def _touch(path: Path, mtime_ns: int) -> None:
+    path.write_bytes(b"frame")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_scan_keeps_files_sharing_an_mtime(tmp_path):
+    _touch(tmp_path / "a.jpg", 1_000)
+    watcher = DirectoryWatcher(tmp_path, FileCursor(), use_inotify=False, settle_seconds=0)
+    first = watcher.poll()
+    assert [p.name for p, _ in first] == ["a.jpg"]
+    watcher.cursor = first[-1][1]
+
+    # Arrives later but with the same (coarse) mtime; the old float cursor dropped it.
+    _touch(tmp_path / "b.jpg", 1_000)
+    _touch(tmp_path / "notes.txt", 2_000)
+    second = watcher.poll()
+    assert [p.name for p, _ in second] == ["b.jpg"]
+
+
+def test_scan_picks_up_a_snapshot_overwritten_in_place(tmp_path):
+    _touch(tmp_path / "snapshot.jpg", 1_000)
+    watcher = DirectoryWatcher(tmp_path, FileCursor(), use_inotify=False, settle_seconds=0)
+    first = watcher.poll()
+    watcher.cursor = first[-1][1]
+    assert watcher.poll() == []
+
+    # FTP cameras often re-upload the same name; the new mtime puts it after the cursor.
+    _touch(tmp_path / "snapshot.jpg", 2_000)
+    second = watcher.poll()
+    assert [(p.name, key.mtime_ns) for p, key in second] == [("snapshot.jpg", 2_000)]
+    watcher.cursor = second[-1][1]
+    assert watcher.poll() == []
+
+
+def test_cursor_survives_restart(tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for idx in range(3):
+        _touch(input_dir / f"{idx}.png", 1_000 + idx)
+    store = CursorStore(str(tmp_path / "state"))
+    store.save("front door", FileCursor(mtime_ns=1_001, name="1.png"))
+
+    watcher = DirectoryWatcher(input_dir, store.load("front door"), use_inotify=False, settle_seconds=0)
+    assert [p.name for p, _ in watcher.poll()] == ["2.png"]
+
+
+def test_inotify_reports_only_new_files(tmp_path):
+    _touch(tmp_path / "old.jpg", 1_000)
+    watcher = DirectoryWatcher(tmp_path, FileCursor(mtime_ns=1_000, name="old.jpg"))
+    try:
+        assert watcher.poll() == []
+        (tmp_path / "new.jpg").write_bytes(b"frame")
+        assert [p.name for p, _ in watcher.poll()] == ["new.jpg"]
+        assert watcher.poll() == []
+    finally:
+        watcher.close()
@@ -0,0 +1,66 @@
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT.parent / "core"))
+
+from CamT_processor.config.settings import ProcessorSettings  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+from CamT_processor.pipeline.supervisor import Supervisor  # noqa: E402
+
+INGESTION, DETECTION, WRITER = range(3)
+
+
+def test_reclaim_frees_only_the_dead_holders_references():
+    pool = FramePool(slot_count=2, slot_size=16, holders=3)
+    try:
+        ingestion, detection, writer = (pool.for_holder(holder) for holder in (INGESTION, DETECTION, WRITER))
+        first = ingestion.put(b"a" * 16)
+        second = ingestion.put(b"b" * 16)
+        ingestion.disown(first)
+        ingestion.disown(second)  # both queued for detection
+        assert ingestion.put(b"c" * 16, timeout=0) is None
+
+        detection.adopt(first)
+        detection.retain(first)  # a message for the writer
+        detection.disown(first)
+        writer.adopt(first)
+        detection.adopt(second)
+
+        # Detection dies holding both frames; the writer still holds its message.
+        assert pool.reclaim(DETECTION) == 2
+        assert pool.in_use() == 1 and pool.freed() == 1
+        third = ingestion.put(b"c" * 16, timeout=0)
+        assert third is not None and third.slot == second.slot
+
+        writer.release(first)
+        assert pool.reclaim(WRITER) == 0 and pool.in_use() == 1 and pool.freed() == 2
+    finally:
+        pool.close()
+
+
+class _Alive:
+    def is_alive(self) -> bool:
+        return True
+
+
+def test_health_checks_do_not_reset_the_stall_timer():
+    supervisor = Supervisor(ProcessorSettings(frame_pool_slots=1, frame_pool_slot_bytes=16, frame_pool_stall_seconds=60))
+    supervisor.processes = {"ingestion": _Alive()}
+    pool = supervisor.frame_pool
+    try:
+        ref = pool.put(b"a" * 16)
+        supervisor._pool_progress = (pool.freed(), time.monotonic() - 61)
+        supervisor._check_pool()
+        # /healthz only reads the monitor's verdict, however often it is polled.
+        assert [supervisor.healthy() for _ in range(3)] == [False, False, False]
+        supervisor._check_pool()
+        assert not supervisor.healthy()
+
+        pool.release(ref)
+        supervisor._check_pool()
+        assert supervisor.healthy()
+    finally:
+        pool.close()
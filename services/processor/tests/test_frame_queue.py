@@ -0,0 +1,117 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from queue import Empty, Full
+from uuid import uuid4
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.dto import FrameJob, PoisonPill  # noqa: E402
+from CamT_processor.pipeline.feedback import MotionFeedback  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+from CamT_processor.pipeline.frame_queue import CameraFrameQueue  # noqa: E402
+
+CAMERAS = ["drive", "yard", "porch"]
+
+
+@pytest.fixture
+def pool():
+    pool = FramePool(slot_count=16, slot_size=64)
+    yield pool
+    pool.close()
+
+
+def _job(pool: FramePool, camera: str, age: float = 0.0) -> FrameJob:
+    ref = pool.put(b"\0" * 48, shape=(4, 4, 3))
+    return FrameJob(frame_id=uuid4(), camera=camera, captured_at=datetime.utcnow() - timedelta(seconds=age), frame=ref)
+
+
+def _drain(queue: CameraFrameQueue) -> list:
+    jobs = []
+    while True:
+        try:
+            jobs.append(queue.get(timeout=0))
+        except Empty:
+            return jobs
+
+
+def test_jobs_round_trip_and_pills_come_after_pending_frames(pool):
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=4)
+    sent = [_job(pool, "yard"), _job(pool, "drive")]
+    for job in sent:
+        queue.put(job)
+    queue.put(PoisonPill())
+    assert _drain(queue) == [*sent, PoisonPill()]
+    with pytest.raises(Full):
+        for _ in range(5):
+            queue.put(_job(pool, "porch"), timeout=0)
+
+
+def test_latest_keeps_the_newest_frame_per_camera(pool):
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=8, policy="latest")
+    jobs = [_job(pool, camera) for camera in ("drive", "yard", "drive", "drive")]
+    for job in jobs:
+        queue.put(job)
+    assert _drain(queue) == [jobs[1], jobs[3]]
+    assert pool.in_use() == 2  # dropped frames gave their slots back
+    stats = {s.camera: s for s in queue.stats()}
+    assert (stats["drive"].dropped, stats["drive"].dequeued, stats["yard"].dropped) == (2, 1, 0)
+
+
+def test_drop_oldest_and_motion_priority(pool):
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=2, policy="drop_oldest")
+    jobs = [_job(pool, camera) for camera in ("yard", "drive", "drive")]
+    for job in jobs:
+        queue.put(job)
+    assert _drain(queue) == jobs[1:]
+
+    feedback = MotionFeedback(CAMERAS)
+    feedback.report_motion("porch")
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=2, policy="motion", motion_feedback=feedback)
+    first, drive, second = _job(pool, "porch"), _job(pool, "drive"), _job(pool, "porch")
+    for job in (first, drive, second):
+        queue.put(job)
+    # The idle camera's frame is dropped first, and the camera with motion is served first.
+    assert _drain(queue) == [first, second]
+    drive, porch = _job(pool, "drive"), _job(pool, "porch")
+    queue.put(drive)
+    queue.put(porch)
+    assert _drain(queue) == [porch, drive]
+
+
+def test_quiet_cameras_are_not_starved_by_a_backlog(pool):
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=8)
+    for _ in range(8):
+        queue.put(_job(pool, "drive"))
+    quiet = _job(pool, "yard")
+    queue.put(quiet, timeout=0)  # the queue is full, but yard has nothing pending
+    assert [queue.get().camera for _ in range(2)] == ["drive", "yard"]
+    _drain(queue)
+
+
+def test_weights_set_each_cameras_share(pool):
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=12, weights={"drive": 2.0})
+    for _ in range(6):
+        queue.put(_job(pool, "drive"))
+        queue.put(_job(pool, "yard"))
+    served = [queue.get().camera for _ in range(6)]
+    assert served.count("drive") == 4 and served.count("yard") == 2
+    _drain(queue)
+
+
+def test_frame_age_is_measured_at_dequeue(pool):
+    queue = CameraFrameQueue(CAMERAS, pool, capacity=4)
+    queue.put(_job(pool, "drive", age=2.0))
+    queue.get()
+    (stats,) = queue.stats()
+    assert 2000 <= stats.max_age_ms < 3000 and stats.avg_age_ms == stats.max_age_ms
+    assert queue.stats()[0].max_age_ms == 0
+
+
+def test_camera_weight_option():
+    from CamT_processor.pipeline.ingestion import parse_camera_sources
+
+    drive, yard = parse_camera_sources(["drive=rtsp://cam/a|weight=3", "yard=rtsp://cam/b|weight=0"], 1.0)
+    assert (drive.weight, yard.weight) == (3.0, 1.0)
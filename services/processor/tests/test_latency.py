@@ -0,0 +1,85 @@
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.dto import FrameJob, LatencyTrace, utc_epoch  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+from CamT_processor.pipeline.frame_queue import CameraFrameQueue  # noqa: E402
+from CamT_processor.pipeline.latency import LatencyRecorder, is_sampled, trace_payload  # noqa: E402
+from CamT_processor.pipeline.stream_reader import StreamReader  # noqa: E402
+
+
+def test_trace_stage_spans_skip_unreached_stages():
+    trace = LatencyTrace().mark("captured", 100.0).mark("dequeued", 100.25).mark("inferred", 100.3)
+    assert trace.at("enqueued") is None and trace.at("inferred") == 100.3
+    assert trace.stage_ms() == {"dequeued": 250.0, "inferred": 50.0, "total": 300.0}
+    assert trace_payload(trace)["stamps"] == {"captured": 100.0, "dequeued": 100.25, "inferred": 100.3}
+
+
+def test_recorder_reports_percentiles_per_camera_and_stage():
+    recorder = LatencyRecorder(window=100)
+    for ms in range(1, 101):
+        recorder.record("drive", LatencyTrace().mark("captured", 1.0).mark("committed", 1 + ms / 1000))
+    recorder.record("yard", LatencyTrace().mark("captured", 5.0).mark("enqueued", 5.002))
+    summary = recorder.summary()
+    assert summary["drive"]["committed"]["count"] == 100
+    assert summary["drive"]["committed"]["p50_ms"] == 50.5 and summary["drive"]["total"]["p99_ms"] == 99.0
+    assert summary["yard"]["enqueued"]["p90_ms"] == 2.0
+    assert recorder.summary() == {}
+
+
+def test_sampling_is_decided_by_frame_id():
+    ids = [uuid4() for _ in range(2000)]
+    sampled = [frame_id for frame_id in ids if is_sampled(frame_id, 0.1)]
+    assert 100 < len(sampled) < 300
+    assert all(is_sampled(frame_id, 0.1) for frame_id in sampled)
+    assert not any(is_sampled(frame_id, 0.0) for frame_id in ids) and all(is_sampled(frame_id, 1.0) for frame_id in ids)
+
+
+def test_frame_queue_stamps_enqueue_and_dequeue():
+    pool = FramePool(slot_count=2, slot_size=64)
+    try:
+        queue = CameraFrameQueue(["drive"], pool, capacity=2)
+        captured = time.time() - 0.5
+        ref = pool.put(b"\0" * 48, shape=(4, 4, 3))
+        queue.put(
+            FrameJob(
+                frame_id=uuid4(),
+                camera="drive",
+                captured_at=datetime.utcnow(),
+                frame=ref,
+                trace=LatencyTrace().mark("captured", captured),
+            )
+        )
+        trace = queue.get(timeout=0).trace
+    finally:
+        pool.close()
+    assert abs(trace.at("captured") - captured) < 1e-5
+    assert captured < trace.at("enqueued") <= trace.at("dequeued") <= time.time()
+
+
+def test_stream_capture_time_follows_pts_and_falls_back_to_receive_time():
+    reader = StreamReader("drive", "rtsp://camera", stale_seconds=5.0)
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    assert reader.capture_time(1000.0, start) == start
+    # Frame decoded 300 ms after it was presented: the PTS keeps the earlier time.
+    assert reader.capture_time(1200.0, start + timedelta(milliseconds=500)) == start + timedelta(milliseconds=200)
+    # No PTS, a PTS that goes backwards or drifts past stale_seconds: use the receive time.
+    assert reader.capture_time(0.0, start + timedelta(seconds=1)) == start + timedelta(seconds=1)
+    assert reader.capture_time(0.0, start + timedelta(seconds=2)) == start + timedelta(seconds=2)
+    assert reader.capture_time(500.0, start + timedelta(seconds=30)) == start + timedelta(seconds=30)
+    assert reader.capture_time(540.0, start + timedelta(seconds=40)) == start + timedelta(seconds=40)
+
+
+def test_capture_times_are_read_as_utc_whatever_the_local_zone(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        assert utc_epoch(datetime(2026, 1, 1)) == 1767225600.0
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.detector.masks import CameraMask, parse_camera_masks  # noqa: E402
+from CamT_processor.detector.movement_detector import MovementDetector  # noqa: E402
+
+LEFT_HALF = [[0, 0], [0.5, 0], [0.5, 1], [0, 1]]
+
+
+def _moving_square(x: int, frame_idx: int) -> np.ndarray:
+    frame = np.full((240, 320), 60, dtype=np.uint8)
+    frame[100:160, x + frame_idx * 4 : x + frame_idx * 4 + 50] = 230
+    return frame
+
+
+def test_raster_and_boxes_follow_include_and_exclude_polygons():
+    mask = CameraMask(exclude=[LEFT_HALF])
+    raster = mask.raster(100, 200)
+    assert raster[:, :99].max() == 0 and raster[:, 101:].min() == 255
+    assert mask.raster(100, 200) is raster  # rasterised once per size
+    # Judged by the bottom-centre point.
+    assert mask.allows([(10, 10, 20, 40), (90, 10, 40, 40)], (100, 200)).tolist() == [False, True]
+    assert CameraMask(include=[LEFT_HALF]).allows([(10, 10, 20, 40)], (100, 200)).tolist() == [True]
+
+
+def test_invalid_masks_are_ignored_per_camera():
+    masks = parse_camera_masks('{"drive": {"exclude": [[[0, 0], [1, 0], [1, 1]]]}, "bad": {"exclude": [[[0, 0], [2, 0]]]}}')
+    assert set(masks) == {"drive"}
+    assert parse_camera_masks("not json") == {}
+
+
+def test_motion_in_excluded_area_never_reaches_detection():
+    masked = MovementDetector(min_area=200, area_threshold=500, warmup=3, mask=CameraMask(exclude=[LEFT_HALF]))
+    unmasked = MovementDetector(min_area=200, area_threshold=500, warmup=3)
+    masked_boxes, unmasked_boxes = [], []
+    for idx in range(15):
+        frame = _moving_square(20, idx) if idx >= 8 else np.full((240, 320), 60, dtype=np.uint8)
+        masked_boxes += masked.detect(frame)
+        unmasked_boxes += unmasked.detect(frame)
+    assert unmasked_boxes and not masked_boxes
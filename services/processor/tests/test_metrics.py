@@ -0,0 +1,64 @@
+import copy
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.pipeline.metrics import MetricsServer, PipelineMetrics  # noqa: E402
+
+
+def test_shards_are_summed_into_prometheus_text():
+    metrics = PipelineMetrics(["detection-0", "detection-1", "event_writer"])
+    for process in ("detection-0", "detection-1"):
+        shard = metrics.shard(process)
+        shard.inc("camtelligence_frames_inferred_total", 3)
+        shard.observe("camtelligence_yolo_batch_seconds", 0.04)
+    metrics.shard("detection-1").observe("camtelligence_yolo_batch_seconds", 20.0)
+    metrics.shard("event_writer").inc("camtelligence_events_written_total", label="vehicle")
+
+    lines = set(metrics.render())
+    assert "camtelligence_frames_inferred_total 6" in lines
+    assert 'camtelligence_events_written_total{kind="vehicle"} 1' in lines
+    assert 'camtelligence_events_written_total{kind="person"} 0' in lines
+    assert 'camtelligence_yolo_batch_seconds_bucket{le="0.025"} 0' in lines
+    assert 'camtelligence_yolo_batch_seconds_bucket{le="0.05"} 2' in lines
+    assert 'camtelligence_yolo_batch_seconds_bucket{le="+Inf"} 3' in lines
+    assert "camtelligence_yolo_batch_seconds_count 3" in lines
+
+
+def test_shard_updates_from_several_threads_are_not_lost():
+    metrics = PipelineMetrics(["ingestion"])
+    # As handed to a spawned process: the shared array survives, the lock is remade.
+    shard = copy.copy(metrics.shard("ingestion"))
+
+    def _count():
+        for _ in range(20_000):
+            shard.inc("camtelligence_frames_ingested_total")
+
+    threads = [threading.Thread(target=_count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert "camtelligence_frames_ingested_total 80000" in set(metrics.render())
+
+
+def test_server_serves_metrics_and_health():
+    state = {"healthy": True}
+    server = MetricsServer("127.0.0.1", 0, lambda: "camtelligence_up 1\n", lambda: state["healthy"])
+    server.start()
+    try:
+        base = f"http://127.0.0.1:{server.port}"
+        assert urllib.request.urlopen(f"{base}/metrics", timeout=5).read() == b"camtelligence_up 1\n"
+        assert urllib.request.urlopen(f"{base}/healthz", timeout=5).status == 200
+        state["healthy"] = False
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(f"{base}/healthz", timeout=5)
+        assert exc.value.code == 503
+    finally:
+        server.stop()
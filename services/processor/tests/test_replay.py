@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Event
+from pathlib import Path
+from queue import Queue
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.dto import FrameJob, PoisonPill  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+from CamT_processor.pipeline.replay import ReplayProgress, ReplayWorker  # noqa: E402
+
+RECORDED = 1_767_225_600  # 2026-01-01 00:00:00 UTC
+
+
+def _replay(tmp_path: Path, sources, slots: int = 16):
+    queue = Queue()
+    progress = ReplayProgress()
+    pool = FramePool(slot_count=slots, slot_size=64 * 48 * 3)
+    worker = ReplayWorker(queue, "archive", [str(source) for source in sources], Event(), pool, progress, dedup_enabled=False)
+    started = time.monotonic()
+    try:
+        worker.run()
+    finally:
+        pool.close()
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items, progress, time.monotonic() - started
+
+
+def _set_mtime(path: Path, seconds: int) -> None:
+    os.utime(path, ns=(seconds * 10**9, seconds * 10**9))
+
+
+def test_image_frames_are_stamped_with_the_file_mtime(tmp_path):
+    for idx in range(2):
+        path = tmp_path / f"{idx}.png"
+        cv2.imwrite(str(path), np.full((48, 64, 3), idx * 100, dtype=np.uint8))
+        _set_mtime(path, RECORDED + 60 * idx)
+
+    items, _, _ = _replay(tmp_path, [tmp_path])
+    jobs = [item for item in items if isinstance(item, FrameJob)]
+    assert [job.captured_at for job in jobs] == [datetime(2026, 1, 1), datetime(2026, 1, 1, 0, 1)]
+
+
+def test_video_frames_are_stamped_from_the_recording_start_plus_pts(tmp_path):
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10.0, (64, 48))
+    for idx in range(5):
+        writer.write(np.full((48, 64, 3), idx * 40, dtype=np.uint8))
+    writer.release()
+    _set_mtime(path, RECORDED)
+
+    items, progress, _ = _replay(tmp_path, [path])
+    jobs = [item for item in items if isinstance(item, FrameJob)]
+    # The file was finished at its mtime, so the 0.5 s recording started half a second earlier.
+    start = datetime(2026, 1, 1) - timedelta(seconds=0.5)
+    assert [job.captured_at for job in jobs] == [start + timedelta(milliseconds=100 * idx) for idx in range(5)]
+    assert progress.frames_read.value == progress.frames_enqueued.value == 5
+
+
+def test_replay_drains_the_footage_and_signals_the_end(tmp_path):
+    for idx in range(12):
+        cv2.imwrite(str(tmp_path / f"{idx:02d}.jpg"), np.full((48, 64, 3), idx * 20, dtype=np.uint8))
+
+    items, progress, elapsed = _replay(tmp_path, [tmp_path])
+    assert [type(item) for item in items] == [FrameJob] * 12 + [PoisonPill]
+    assert progress.frames_read.value == progress.frames_enqueued.value == 12
+    # No poll interval between files: only pool and queue backpressure pace replay.
+    assert elapsed < 2.0
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.detector.roi import motion_overlap, plan_regions  # noqa: E402
+
+FRAME_4K = (2160, 3840, 3)
+
+
+def test_small_motion_gets_a_padded_region_inside_the_frame():
+    regions = plan_regions([(3800, 100, 30, 60)], FRAME_4K, padding=0.25, min_size=256, max_coverage=0.4)
+    assert regions is not None and len(regions) == 1
+    x, y, w, h = regions[0]
+    assert (w, h) == (256, 256)
+    assert x + w == 3840 and x <= 3800 and y <= 100 <= y + h
+
+
+def test_overlapping_regions_merge_and_distant_ones_stay_apart():
+    boxes = [(1000, 1000, 100, 200), (1150, 1050, 100, 200), (3000, 200, 80, 80)]
+    regions = plan_regions(boxes, FRAME_4K, padding=0.25, min_size=256, max_coverage=0.4)
+    assert regions is not None and len(regions) == 2
+    merged = max(regions, key=lambda r: r[2] * r[3])
+    assert merged[0] <= 1000 and merged[0] + merged[2] >= 1250
+
+
+def test_large_motion_falls_back_to_full_frame():
+    assert plan_regions([(0, 0, 3000, 1500)], FRAME_4K, padding=0.25, min_size=256, max_coverage=0.4) is None
+    assert plan_regions([], FRAME_4K, padding=0.25, min_size=256, max_coverage=0.4) is None
+
+
+def test_motion_overlap_needs_one_motion_box_to_cover_the_threshold():
+    motion = [(0, 0, 100, 100), (500, 500, 0, 50)]
+    boxes = [(50, 50, 100, 100), (95, 95, 100, 100), (600, 600, 10, 10), (10, 10, 0, 10)]
+    assert motion_overlap(boxes, motion, 0.1).tolist() == [True, False, False, False]
+    assert motion_overlap([], motion, 0.1).tolist() == []
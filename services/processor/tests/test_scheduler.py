@@ -0,0 +1,166 @@
+import sys
+import threading
+import time
+from multiprocessing import Event
+from pathlib import Path
+from queue import Queue
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.pipeline.feedback import MotionFeedback  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+from CamT_processor.pipeline.ingestion import CameraConfig, IngestionWorker, parse_camera_sources  # noqa: E402
+from CamT_processor.pipeline.scheduler import CameraScheduler  # noqa: E402
+
+
+def _run_for(scheduler: CameraScheduler, seconds: float) -> None:
+    stop = threading.Event()
+    runner = threading.Thread(target=scheduler.run, args=(stop,), kwargs={"max_wait": 0.01})
+    runner.start()
+    time.sleep(seconds)
+    stop.set()
+    runner.join(timeout=2)
+    assert not runner.is_alive()
+
+
+def test_hung_camera_only_delays_itself():
+    release = threading.Event()
+    runs = {"fast": 0, "hung": 0}
+
+    def poll(camera):
+        runs[camera.name] += 1
+        if camera.name == "hung":
+            release.wait(5)
+
+    cameras = [CameraConfig(name="fast", source="a", poll_interval=0.05), CameraConfig(name="hung", source="b", poll_interval=0.05)]
+    scheduler = CameraScheduler(cameras, poll)
+    try:
+        _run_for(scheduler, 0.6)
+    finally:
+        release.set()
+        scheduler.shutdown()
+
+    stats = {entry.camera: entry for entry in scheduler.stats()}
+    # Runs count dispatched polls; shutdown may cancel the last one before it starts.
+    assert runs["fast"] >= 8 and stats["fast"].runs - runs["fast"] in (0, 1) and stats["fast"].missed == 0
+    # Every deadline of the hung camera while its first poll was stuck counts as missed.
+    assert runs["hung"] == 1 and stats["hung"].runs == 1 and stats["hung"].missed >= 8
+    assert 0 <= stats["fast"].last_slip <= stats["fast"].max_slip < 0.5
+
+
+def test_missed_deadlines_and_slip_are_counted():
+    def poll(camera):
+        time.sleep(0.25)
+
+    scheduler = CameraScheduler([CameraConfig(name="slow", source="a", poll_interval=0.05)], poll)
+    try:
+        _run_for(scheduler, 0.6)
+    finally:
+        scheduler.shutdown()
+    (stats,) = scheduler.stats()
+    # A poll every ~0.25 s; the deadlines it overran are missed, the next one starts on time.
+    assert 2 <= stats.runs <= 4 and stats.missed >= 6 and stats.max_slip < 0.05
+
+    # The dispatch loop itself stalling (here in on_tick) makes polls start late.
+    scheduler = CameraScheduler([CameraConfig(name="lagged", source="a", poll_interval=0.05)], lambda cam: None)
+    stop = threading.Event()
+    runner = threading.Thread(target=scheduler.run, args=(stop,), kwargs={"on_tick": lambda: time.sleep(0.12)})
+    runner.start()
+    time.sleep(0.6)
+    stop.set()
+    runner.join(timeout=2)
+    scheduler.shutdown()
+    (stats,) = scheduler.stats()
+    assert stats.max_slip >= 0.05 and stats.max_slip >= stats.last_slip > 0
+    assert stats.missed >= 2
+
+
+def test_interval_for_overrides_the_configured_interval():
+    runs = []
+    interval = {"seconds": 60.0}
+    camera = CameraConfig(name="door", source="a", poll_interval=0.01)
+    scheduler = CameraScheduler([camera], lambda cam: runs.append(time.monotonic()), interval_for=lambda cam: interval["seconds"])
+    stop = threading.Event()
+    runner = threading.Thread(target=scheduler.run, args=(stop,), kwargs={"max_wait": 0.01})
+    runner.start()
+    try:
+        time.sleep(0.3)
+        # Polled once on start, then held to the 60 s override despite poll_interval.
+        assert len(runs) == 1 and scheduler.stats()[0].interval == 60.0
+        interval["seconds"] = 0.05
+        time.sleep(0.3)
+    finally:
+        stop.set()
+        runner.join(timeout=2)
+        scheduler.shutdown()
+    # A shorter interval takes effect on the next pass, without waiting out the old one.
+    assert len(runs) >= 4 and scheduler.stats()[0].interval == 0.05
+
+
+def test_shutdown_stops_polling_and_its_threads():
+    runs = []
+    cameras = [CameraConfig(name=f"cam{idx}", source="a", poll_interval=0.02) for idx in range(3)]
+    scheduler = CameraScheduler(cameras, lambda cam: runs.append(cam.name))
+    _run_for(scheduler, 0.2)
+    scheduler.shutdown()
+
+    pollers = [thread for thread in threading.enumerate() if thread.name.startswith("poll")]
+    for thread in pollers:
+        thread.join(timeout=2)
+    assert runs and not any(thread.is_alive() for thread in pollers)
+    count = len(runs)
+    time.sleep(0.1)
+    assert len(runs) == count
+
+
+def test_camera_options_are_parsed():
+    default, tuned, bad = parse_camera_sources(
+        [
+            "door=/data/input/door",
+            "driveway=rtsp://cam/stream?user=a|poll=0.5|idle=5|weight=2",
+            "yard=http://cam/snap|weight=0|poll=fast|zoom=2|idle=3",
+        ],
+        default_poll=1.0,
+    )
+    assert default == CameraConfig(name="door", source="/data/input/door", poll_interval=1.0)
+    assert tuned == CameraConfig(
+        name="driveway", source="rtsp://cam/stream?user=a", poll_interval=0.5, idle_interval=5.0, weight=2.0
+    )
+    # Invalid options are skipped one by one; the valid ones still apply.
+    assert bad == CameraConfig(name="yard", source="http://cam/snap", poll_interval=1.0, idle_interval=3.0)
+
+
+def test_adaptive_interval_follows_motion_feedback(tmp_path):
+    cameras = [
+        CameraConfig(name="porch", source="/in/porch", poll_interval=0.5),
+        CameraConfig(name="garage", source="/in/garage", poll_interval=0.5, idle_interval=8.0),
+        CameraConfig(name="street", source="/in/street", poll_interval=5.0),
+    ]
+    feedback = MotionFeedback([camera.name for camera in cameras])
+    pool = FramePool(slot_count=1, slot_size=16)
+    worker = IngestionWorker(
+        Queue(),
+        cameras,
+        Event(),
+        pool,
+        state_dir=str(tmp_path),
+        motion_feedback=feedback,
+        idle_poll_interval=2.0,
+        motion_hold_seconds=10.0,
+    )
+    try:
+        porch, garage, street = cameras
+        # No motion seen yet: idle rate, the camera's own idle= over the global one, never faster than poll=.
+        assert [worker._interval_for(camera) for camera in cameras] == [2.0, 8.0, 5.0]
+
+        now = time.time()
+        feedback.report_motion("porch", now - 3)
+        feedback.report_motion("garage", now - 9.5)
+        feedback.report_motion("street", now)
+        assert [worker._interval_for(camera) for camera in (porch, garage, street)] == [0.5, 0.5, 5.0]
+
+        # Past motion_hold_seconds the camera drops back to its idle rate.
+        feedback.report_motion("garage", now - 10.5)
+        assert worker._interval_for(garage) == 8.0
+    finally:
+        pool.close()
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+from queue import Queue
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.dto import PoisonPill  # noqa: E402
+from CamT_processor.pipeline.sharding import FrameRouter  # noqa: E402
+
+CAMERAS = [f"cam-{idx}" for idx in range(40)]
+
+
+def _router(workers: int) -> FrameRouter:
+    router = FrameRouter([Queue() for _ in range(workers)])
+    for idx in range(workers):
+        router.mark(idx, True)
+    return router
+
+
+def test_cameras_spread_across_workers_and_stay_put():
+    router = _router(4)
+    owners = {camera: router.index_for(camera) for camera in CAMERAS}
+    assert set(owners.values()) == {0, 1, 2, 3}
+    assert owners == {camera: router.index_for(camera) for camera in CAMERAS}
+
+
+def test_dead_worker_only_moves_its_own_cameras():
+    router = _router(4)
+    before = {camera: router.index_for(camera) for camera in CAMERAS}
+    router.mark(2, False)
+    after = {camera: router.index_for(camera) for camera in CAMERAS}
+    for camera in CAMERAS:
+        if before[camera] == 2:
+            assert after[camera] != 2
+        else:
+            assert after[camera] == before[camera]
+
+    router.mark(2, True)
+    assert {camera: router.index_for(camera) for camera in CAMERAS} == before
+
+
+def test_poison_pill_reaches_every_worker():
+    router = _router(3)
+    router.put_nowait(PoisonPill())
+    assert all(isinstance(queue.get_nowait(), PoisonPill) for queue in router.queues)
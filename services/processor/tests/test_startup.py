@@ -0,0 +1,104 @@
+import multiprocessing
+import subprocess
+import sys
+import time
+from pathlib import Path
+from queue import Empty
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from CamT_processor.dto import PoisonPill  # noqa: E402
+from CamT_processor.pipeline.detection import DetectionWorker  # noqa: E402
+from CamT_processor.pipeline.frame_pool import FramePool  # noqa: E402
+from CamT_processor.pipeline.frame_queue import CameraFrameQueue  # noqa: E402
+
+# Spawn, imports, model load and warm-up inference of a tiny model; the real weights add
+# their own load time on top, which the worker logs as model_load_seconds.
+STARTUP_TARGET_SECONDS = 15.0
+
+
+def _tiny_yolo_onnx(path: Path, num_classes: int = 80) -> None:
+    """A YOLOv8-shaped ONNX model: (batch, 4 + classes, anchors) from one stride-32 conv."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = np.random.default_rng(0).normal(0, 0.01, (4 + num_classes, 3, 32, 32)).astype(np.float32)
+    graph = helper.make_graph(
+        [
+            helper.make_node("Conv", ["images", "weights"], ["grid"], strides=[32, 32]),
+            helper.make_node("Reshape", ["grid", "shape"], ["output0"]),
+        ],
+        "tiny_yolo",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, "height", "width"])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 4 + num_classes, "anchors"])],
+        initializer=[
+            numpy_helper.from_array(weights, "weights"),
+            numpy_helper.from_array(np.array([0, 4 + num_classes, -1], dtype=np.int64), "shape"),
+        ],
+    )
+    # IR 8 loads in every onnxruntime the backend supports.
+    onnx.save(helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8), str(path))
+
+
+def test_importing_detection_does_not_import_the_model_runtimes():
+    code = (
+        "import sys; import CamT_processor.pipeline.detection; "
+        "print(sorted(m for m in ('torch', 'ultralytics', 'onnxruntime', 'openvino') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_spawned_worker_reaches_first_inference_within_the_startup_target(monkeypatch, tmp_path):
+    """
+    Times a real (re)start: spawn the worker, load an ONNX model through the onnxruntime
+    backend and run the warm-up inference. The worker only takes frames after that, so
+    the PoisonPill it forwards marks the end of startup. Skipped without onnx/onnxruntime
+    (requirements-export.txt).
+    """
+    pytest.importorskip("onnxruntime")
+    model = tmp_path / "tiny_yolo.onnx"
+    _tiny_yolo_onnx(model)
+    monkeypatch.setenv("YOLO_MODEL_PATH", str(model))
+
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method("spawn", force=True)
+    pool = FramePool(slot_count=1, slot_size=64)
+    try:
+        frames = CameraFrameQueue(["drive"], pool, capacity=1)
+        frames.put(PoisonPill())
+        detections = multiprocessing.Queue()
+        worker = DetectionWorker(
+            frames,
+            detections,
+            multiprocessing.Event(),
+            pool,
+            200,
+            5,
+            1500,
+            str(tmp_path),
+            0.1,
+            detector_backend="onnxruntime",
+            detector_imgsz=160,
+        )
+        assert worker.yolo is None
+        started = time.monotonic()
+        worker.start()
+        while True:
+            try:
+                item = detections.get(timeout=0.5)
+                break
+            except Empty:
+                assert worker.is_alive(), f"worker exited with {worker.exitcode} before its first inference"
+        elapsed = time.monotonic() - started
+        assert isinstance(item, PoisonPill)
+        worker.join(timeout=10)
+    finally:
+        pool.close()
+        multiprocessing.set_start_method(previous, force=True)
+    assert worker.exitcode == 0
+    assert elapsed < STARTUP_TARGET_SECONDS
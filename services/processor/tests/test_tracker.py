@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from CamT_processor.detector.tracker import TRACK_BEST, TRACK_KEYFRAME, TRACK_START, Tracker  # noqa: E402
+
+
+def test_person_in_view_for_a_minute_is_one_track_with_few_events():
+    tracker = Tracker(keyframe_seconds=30.0)
+    events = []
+    ids = set()
+    for second in range(60):
+        box = (100 + 40 * second, 200, 60, 160)  # walking right, further than its width per frame
+        (track_id, event), = tracker.update([box], [0.7], float(second))
+        ids.add(track_id)
+        if event:
+            events.append(event)
+    assert len(ids) == 1
+    assert events == [TRACK_START, TRACK_KEYFRAME]
+
+
+def test_objects_keep_their_ids_and_better_scores_are_sent():
+    tracker = Tracker()
+    first = tracker.update([(0, 0, 50, 100), (400, 0, 50, 100)], [0.5, 0.6], 0.0)
+    second = tracker.update([(405, 2, 50, 100), (3, 1, 50, 100)], [0.55, 0.75], 1.0)
+    assert [tid for tid, _ in first] == [second[1][0], second[0][0]]
+    assert [event for _, event in first] == [TRACK_START, TRACK_START]
+    assert [event for _, event in second] == [None, TRACK_BEST]
+
+
+def test_ineligible_detections_keep_the_track_but_are_not_sent():
+    tracker = Tracker(max_age=5.0)
+    (track_id, event), = tracker.update([(0, 0, 50, 100)], [0.9], 0.0, eligible=[False])
+    assert event is None
+    (same_id, event), = tracker.update([(0, 0, 50, 100)], [0.9], 1.0, eligible=[True])
+    assert (same_id, event) == (track_id, TRACK_START)
+    (new_id, event), = tracker.update([(0, 0, 50, 100)], [0.9], 20.0)
+    assert new_id != track_id and event == TRACK_START
+
+
+def test_motion_boxes_propagate_tracks_between_yolo_runs():
+    tracker = Tracker()
+    tracker.update([(100, 100, 60, 160)], [0.8], 0.0)
+    tracker.update([(130, 100, 60, 160)], [0.8], 1.0)
+    # Person keeps walking; only motion boxes for two frames.
+    for second, x in ((2.0, 160), (3.0, 190)):
+        assert tracker.coverage([(x + 5, 110, 50, 140)], second).min() > 0.9
+        tracker.propagate([(x + 5, 110, 50, 140)], second)
+    (track_id, _), = tracker.update([(220, 100, 60, 160)], [0.8], 4.0)
+    assert track_id == tracker.tracks[0].track_id and len(tracker.tracks) == 1 and tracker.stable
+    # Motion far from every track is not explained.
+    assert tracker.coverage([(900, 500, 60, 60)], 5.0).tolist() == [0.0]